@@ -0,0 +1,7 @@
+"""
+benchmarks — offline timing suite for the pipeline's hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks.run --scale small medium --output bench/results.json
+"""
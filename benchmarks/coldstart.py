@@ -0,0 +1,96 @@
+"""
+Cold-start budget check for the command-line entry points.
+
+Each check starts a fresh interpreter, so it measures what a user (or a
+worker process of a parallel run) pays before any work happens. A check
+fails when its best wall time is over the budget or when one of the
+heavy dependencies got imported:
+
+    python -m benchmarks.coldstart                # exit code 1 on failure
+    python -m benchmarks.coldstart --budget 0.2 --repeat 10
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+HEAVY = ("pandas", "numpy", "selenium", "moexalgo", "matplotlib", "seaborn", "openai", "scipy")
+
+COMMANDS = ["parse", "label", "market", "pipeline", "live", "queue"]
+
+CHECKS = {
+    "finam --help": ["-m", "finam", "--help"],
+    **{f"finam {c} --help": ["-m", "finam", c, "--help"] for c in COMMANDS},
+    **{
+        f"import {p}": ["-c", f"import {p}"]
+        for p in ("newsparser", "chatgpt_news_label", "market_data_loader",
+                  "portfolio_backtest", "orchestrator", "dataset_io")
+    },
+}
+
+# runs the check's arguments, then reports which heavy modules it loaded
+_PROBE = """
+import sys, runpy
+args = sys.argv[1:]
+sys.argv = ["probe", *args[2:]] if args[0] == "-m" else ["probe"]
+try:
+    if args[0] == "-m":
+        runpy.run_module(args[1], run_name="__main__", alter_sys=True)
+    else:
+        exec(args[1])
+except SystemExit:
+    pass
+print(",".join(m for m in {heavy!r} if m in sys.modules), file=sys.stderr)
+"""
+
+
+def _env() -> dict:
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    path = os.environ.get("PYTHONPATH")
+    return {**os.environ, "PYTHONPATH": src + (os.pathsep + path if path else "")}
+
+
+def wall_time(args: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *args], env=_env(), capture_output=True, check=False)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def heavy_imports(args: list[str]) -> list[str]:
+    probe = _PROBE.format(heavy=HEAVY)
+    out = subprocess.run(
+        [sys.executable, "-c", probe, *args],
+        env=_env(), capture_output=True, text=True, check=False,
+    )
+    last = out.stderr.strip().splitlines()[-1:] or [""]
+    return [m for m in last[0].split(",") if m]
+
+
+def check(budget: float, repeat: int) -> bool:
+    ok = True
+    for name, args in CHECKS.items():
+        seconds = wall_time(args, repeat)
+        heavy = heavy_imports(args)
+        passed = seconds <= budget and not heavy
+        ok &= passed
+        note = f"  imports {', '.join(heavy)}" if heavy else ""
+        print(f"{'ok  ' if passed else 'FAIL'} {name:<32} {seconds:.3f}s{note}")
+    return ok
+
+
+def main():
+    p = argparse.ArgumentParser(description="Check cold start of the CLIs against a budget")
+    p.add_argument("--budget", type=float, default=0.3,
+                   help="Max best-of-N wall time per check, seconds")
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+    if not check(args.budget, args.repeat):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Offline stand-ins for `moexalgo` and the LLM backend.
+"""
+import sys
+import types
+import asyncio
+
+import pandas as pd
+
+from . import synthetic
+
+
+class _Instrument:
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+
+    def candles(self, start, end, period=1):
+        days = pd.bdate_range(start=start, end=end)
+        if period == 24:
+            return pd.DataFrame({"begin": days})
+        return synthetic.minute_bars(self.ticker, days)
+
+
+class Ticker(_Instrument):
+    pass
+
+
+class Index(_Instrument):
+    pass
+
+
+class Market:
+    def __init__(self, market: str = "shares", n_tickers: int = 50):
+        self.n_tickers = n_tickers
+
+    def tickers(self) -> pd.DataFrame:
+        names = synthetic.tickers(self.n_tickers)
+        return pd.DataFrame({
+            "ticker": names,
+            "shortname": [f"Компания {t}" for t in names],
+        })
+
+
+def install_moexalgo():
+    """
+    Register the fake `moexalgo` module; must run before the pipeline
+    packages import it.
+    """
+    module = types.ModuleType("moexalgo")
+    module.Ticker = Ticker
+    module.Index = Index
+    module.Market = Market
+    sys.modules["moexalgo"] = module
+    return module
+
+
+def make_llm_backend(latency: float = 0.0):
+    """
+    LLM backend that answers instantly (or after `latency` seconds).
+    """
+    from chatgpt_news_label.backends import LLMBackend
+
+    class FakeBackend(LLMBackend):
+        name = "fake"
+
+        async def complete(self, prompt, model=None, response_format=None):
+            if latency:
+                await asyncio.sleep(latency)
+            if response_format:
+                return '{"signal": "ВВЕРХ"}'
+            return "ВВЕРХ. Новости позитивны для компании."
+
+    return FakeBackend()
@@ -0,0 +1,201 @@
+"""
+Time the pipeline's hot paths on synthetic data at several scales and
+save the results as JSON, optionally comparing against an earlier run.
+Everything runs offline: `moexalgo` and the LLM are replaced by fakes.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+import statistics
+from datetime import datetime
+
+from . import synthetic, fakes
+
+# tickers, trading days, news per day
+SCALES = {
+    "small":  (5, 20, 3),
+    "medium": (20, 60, 5),
+    "large":  (50, 250, 10),
+}
+
+
+def bench(name: str, scale: str, fn, repeat: int, **params) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    result = {
+        "name": name,
+        "scale": scale,
+        "params": params,
+        "repeat": repeat,
+        "best_s": min(timings),
+        "median_s": statistics.median(timings),
+    }
+    print(f"{scale:>7} {name:<32} best {result['best_s']:9.4f}s  median {result['median_s']:9.4f}s")
+    return result
+
+
+def run_scale(scale: str, workdir: str, repeat: int) -> list[dict]:
+    import pandas as pd
+    from portfolio_backtest import db as backtest_db, PortfolioReturn, fetch_daily, event_study
+    from market_data_loader import db as loader_db, fetcher
+    from chatgpt_news_label.chatgpt_label import create_prompt, parse_signal, _run_all
+
+    n_tickers, n_days, per_day = SCALES[scale]
+    db_path = os.path.join(workdir, f"market_{scale}.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    summary = synthetic.build_market_db(db_path, n_tickers, n_days)
+    backtest_db.DB_PATH = db_path
+    print(f"{scale:>7} synthetic market_data.db: {summary}")
+
+    days = synthetic.trading_days(n_days)
+    news = synthetic.make_news(n_tickers, n_days, per_day)
+    labeled = synthetic.make_labeled(news)
+    pr = PortfolioReturn(str(days[0].date()), str(days[-1].date() + pd.Timedelta(days=7)))
+    results = []
+
+    rng = random.Random(0)
+    pairs = [(rng.choice(synthetic.tickers(n_tickers)), rng.choice(days)) for _ in range(50)]
+    results.append(bench(
+        "fetch_daily", scale,
+        lambda: [
+            fetch_daily(t, d.replace(hour=10, minute=1), d.replace(hour=18, minute=39))
+            for t, d in pairs
+        ],
+        repeat, calls=len(pairs),
+    ))
+
+    results.append(bench(
+        "PortfolioReturn.separate", scale,
+        lambda: pr.separate(news.copy()),
+        repeat, rows=len(news),
+    ))
+
+    results.append(bench(
+        "calculate_return", scale,
+        lambda: pr.calculate_return(labeled),
+        repeat, rows=len(labeled),
+    ))
+
+    results.append(bench(
+        "estimate_random_benchmark", scale,
+        lambda: pr.estimate_random_benchmark(labeled, n_runs=5),
+        repeat, rows=len(labeled), n_runs=5,
+    ))
+
+    results.append(bench(
+        "event_study", scale,
+        lambda: event_study(labeled, minutes=range(1, 121), sessions=5).summary(),
+        repeat, events=len(labeled), minutes=120, sessions=5,
+    ))
+
+    _, non_trading = pr.separate(news.copy())
+    non_trading["date_only_trading"] = non_trading["trading_time"].dt.date
+    groups = [g for _, g in non_trading.groupby(["ticker", "date_only_trading"])]
+    results.append(bench(
+        "create_prompt", scale,
+        lambda: [create_prompt(g) for g in groups],
+        repeat, groups=len(groups),
+    ))
+
+    backend = fakes.make_llm_backend()
+    prompts = [create_prompt(g) for g in groups]
+    results.append(bench(
+        "label (fake LLM) + parse_signal", scale,
+        lambda: [parse_signal(r) for r in asyncio.run(_run_all(prompts, "fake", backend))],
+        repeat, prompts=len(prompts),
+    ))
+
+    load_db = os.path.join(workdir, f"load_{scale}.db")
+    tickers_pkl = os.path.join(workdir, f"tickers_{scale}.pkl")
+    load_tickers = synthetic.tickers(min(n_tickers, 5))
+    pd.Series(load_tickers).to_pickle(tickers_pkl)
+    load_days = [d.date() for d in days[:min(n_days, 5)]]
+
+    def update_all():
+        if os.path.exists(load_db):
+            os.remove(load_db)
+        loader_db.DB_PATH = load_db
+        fetcher.TICKERS_PKL = tickers_pkl
+        asyncio.run(fetcher.update_all(load_days, 1))
+
+    results.append(bench(
+        "fetcher.update_all", scale, update_all, repeat,
+        tickers=len(load_tickers), days=len(load_days),
+    ))
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list[dict], baseline_path: str):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    before = {(r["scale"], r["name"]): r["best_s"] for r in baseline["results"]}
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('commit')}):")
+    for r in results:
+        old = before.get((r["scale"], r["name"]))
+        if old:
+            print(f"{r['scale']:>7} {r['name']:<32} {old:9.4f}s -> {r['best_s']:9.4f}s  x{old / r['best_s']:.2f}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Offline benchmarks of pipeline hot paths")
+    p.add_argument("--scale", nargs="+", choices=sorted(SCALES), default=["small"],
+                   help="Data sizes to run")
+    p.add_argument("--repeat", "-r", type=int, default=3, help="Timed runs per benchmark")
+    p.add_argument("--output", "-o", default=None, help="Where to save results JSON")
+    p.add_argument("--compare", "-c", default=None, help="Earlier results JSON to compare with")
+    p.add_argument("--workdir", default=None, help="Keep synthetic databases here")
+    args = p.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    fakes.install_moexalgo()
+    workdir = args.workdir or tempfile.mkdtemp(prefix="finam-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    # config modules resolve their paths at import time
+    os.environ["EXTRA_FILES_FOLDER"] = workdir
+    os.environ["WORK_FILES_FOLDER"] = workdir
+
+    results = []
+    for scale in args.scale:
+        results.extend(run_scale(scale, workdir, args.repeat))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nSaved {len(results)} results to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Synthetic market data and news generators.
+
+`build_market_db` writes 1-minute bars for `n_tickers` × `n_days` trading
+days (plus IMOEX) using the loader's own schema; `make_news` and
+`make_labeled` build frames shaped like the newsparser and labeling outputs.
+"""
+import zlib
+import sqlite3
+import numpy as np
+import pandas as pd
+
+SESSION_START = "09:50"
+SESSION_MINUTES = 540  # 09:50 … 18:49
+
+SHORTNAMES = ["Сбербанк", "ГАЗПРОМ ао", "Лукойл", "ВТБ ао", "Магнит ао", "НЛМК ао"]
+
+
+def tickers(n_tickers: int) -> list[str]:
+    return [f"T{i:03d}" for i in range(n_tickers)]
+
+
+def trading_days(n_days: int, start: str = "2024-01-08") -> pd.DatetimeIndex:
+    return pd.bdate_range(start=start, periods=n_days)
+
+
+def minute_bars(ticker: str, days: pd.DatetimeIndex, seed: int = 0) -> pd.DataFrame:
+    """
+    Random-walk 1-minute OHLCV bars of one ticker over the session of every day.
+    """
+    rng = np.random.default_rng([zlib.crc32(ticker.encode()), seed])
+    offsets = pd.to_timedelta(np.arange(SESSION_MINUTES), unit="min")
+    begin = (
+        days.normalize().repeat(SESSION_MINUTES)
+        + pd.Timedelta(SESSION_START + ":00")
+        + np.tile(offsets, len(days))
+    )
+    steps = rng.normal(0, 0.0008, size=len(begin))
+    close = 100 * np.exp(np.cumsum(steps))
+    open_ = np.concatenate([[100.0], close[:-1]])[:len(close)]
+    spread = np.abs(rng.normal(0, 0.0004, size=len(begin))) * close
+    return pd.DataFrame({
+        "begin": begin,
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": rng.integers(1, 10_000, size=len(begin)).astype(float),
+    })
+
+
+def bar_rows(ticker: str, bars: pd.DataFrame) -> list[tuple]:
+    dates = bars["begin"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    return list(zip(
+        [ticker] * len(bars), dates,
+        bars["open"], bars["high"], bars["low"], bars["close"], bars["volume"],
+    ))
+
+
+def build_market_db(db_path: str, n_tickers: int, n_days: int, seed: int = 0) -> dict:
+    """
+    Fill `db_path` with synthetic minute bars and the bars the loader
+    derives from them; returns a summary dict.
+    """
+    from market_data_loader import db as loader_db
+    from market_data_loader.resample import materialize
+    from market_data_loader.coverage import CoverageIndex
+
+    loader_db.DB_PATH = db_path
+    loader_db.init_db()
+    days = trading_days(n_days)
+    conn = sqlite3.connect(db_path)
+    rows = 0
+    for ticker in tickers(n_tickers) + ["IMOEX"]:
+        batch = bar_rows(ticker, minute_bars(ticker, days, seed))
+        conn.executemany(
+            '''INSERT OR IGNORE INTO ticker_data
+               (ticker, date, open, high, low, close, volume)
+               VALUES (?, ?, ?, ?, ?, ?, ?)''',
+            batch
+        )
+        rows += len(batch)
+    conn.commit()
+    # as if the loader had requested every calendar day: weekends came back empty
+    coverage = CoverageIndex.rebuild(conn)
+    calendar = pd.date_range(days[0], days[-1])
+    for ticker in coverage.tickers:
+        coverage.record_empty(ticker, calendar)
+    coverage.save(conn)
+    conn.commit()
+    conn.close()
+    derived = sum(materialize(t, days.date) for t in tickers(n_tickers) + ["IMOEX"])
+    return {"tickers": n_tickers, "days": n_days, "rows": rows, "derived": derived}
+
+
+def make_news(n_tickers: int, n_days: int, per_day: int = 5, seed: int = 0) -> pd.DataFrame:
+    """
+    News frame shaped like the newsparser output; `date` uses FINAM's
+    '%d.%m.%y %H:%M' format and mixes trading and non-trading hours.
+    """
+    rng = np.random.default_rng(seed)
+    days = trading_days(n_days)
+    n = n_days * per_day
+    day = days.repeat(per_day)
+    minutes = rng.integers(0, 24 * 60, size=n)
+    published = day + pd.to_timedelta(minutes, unit="min")
+    names = tickers(n_tickers)
+    ticker = rng.choice(names, size=n)
+    words = np.array(["выручка", "дивиденды", "прибыль", "санкции", "отчетность", "рост", "снижение"])
+    text = [" ".join(rng.choice(words, size=80)) for _ in range(n)]
+    return pd.DataFrame({
+        "title": [f"Новость {i}" for i in range(n)],
+        "short_info": "",
+        "shortname": [SHORTNAMES[int(t[1:]) % len(SHORTNAMES)] for t in ticker],
+        "ticker": ticker,
+        "link": [f"https://example.invalid/{i}" for i in range(n)],
+        "date": published.strftime("%d.%m.%y %H:%M"),
+        "text": text,
+    })
+
+
+def make_labeled(news: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """
+    Frame shaped like the labeling output consumed by `calculate_return`.
+    Trading dates are the next business day after publication.
+    """
+    rng = np.random.default_rng(seed)
+    published = pd.to_datetime(news["date"], format="%d.%m.%y %H:%M")
+    df = pd.DataFrame({
+        "ticker": news["ticker"].values,
+        "trading_date": (published + pd.offsets.BDay(1)).dt.normalize(),
+    }).drop_duplicates(ignore_index=True)
+    df["signal"] = rng.choice([-1, 0, 1], size=len(df))
+    df["combined_prompt"] = ""
+    df["explanation"] = ""
+    return df
@@ -11,6 +11,7 @@ setup(
          'requests',
          'moexalgo',
          'openpyxl',
+         'pyarrow',
          'python-dotenv',
          'openai',
          'backoff',
@@ -18,13 +19,21 @@ setup(
          'matplotlib',
          'seaborn',
          'scikit-learn',
+         'scipy',
          'pyfixest'
      ],
+     extras_require={
+         'local': ['llama-cpp-python'],
+     },
      entry_points={
          'console_scripts': [
+             'finam=finam.cli:main',
              'news-parser=newsparser.cli:main',
              'chatgpt-news-label=chatgpt_news_label.cli:main',
              "market-load=market_data_loader.cli:main",
+             "finam-pipeline=orchestrator.cli:main",
+             "finam-live=orchestrator.live_cli:main",
+             "finam-queue=orchestrator.queue_cli:main",
          ],
      },
  )
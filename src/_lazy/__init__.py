@@ -0,0 +1,27 @@
+"""
+Lazy package exports (PEP 562): exported names are resolved from their
+submodules on first access, so importing a package does not import its
+heavy dependencies.
+"""
+import sys
+import importlib
+
+
+def lazy_exports(package: str, exports: dict[str, str]):
+    """
+    `exports` maps exported name -> relative submodule. Returns the
+    package's (__getattr__, __dir__, __all__):
+
+        __getattr__, __dir__, __all__ = lazy_exports(__name__, {"run": ".parser"})
+    """
+    def __getattr__(name):
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(exports[name], package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__, list(exports)
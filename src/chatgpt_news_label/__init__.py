@@ -1,7 +1,11 @@
 """
 chatgpt_news_label — pipeline for labeling news via ChatGPT API.
 """
+from _lazy import lazy_exports
 
-from .chatgpt_label import run
-
-__all__ = ["run"]
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "run": ".chatgpt_label",
+    "label_frame": ".chatgpt_label",
+    "dedup_frame": ".dedup",
+    "NearDuplicateIndex": ".dedup",
+})
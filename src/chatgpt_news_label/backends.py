@@ -0,0 +1,213 @@
+"""
+Pluggable LLM backends used for labeling.
+
+Every backend exposes `complete(prompt, model)` and
+`complete_batch(prompts, model)`; the labeling code only talks to this
+interface, so the hosted OpenAI API, an OpenAI-compatible local server
+and an in-process CPU model are interchangeable.
+"""
+import time
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+
+import backoff
+
+import instrumentation as metrics
+
+
+def _on_backoff(details: dict):
+    # rate-limit stalls show up next to request latency
+    metrics.count("llm.retries")
+    metrics.observe("llm.backoff_wait", details["wait"])
+
+
+class LLMBackend(ABC):
+    """
+    Base class: subclasses implement `complete`; `complete_batch`
+    runs the prompts concurrently by default.
+    """
+    name = "base"
+
+    @abstractmethod
+    async def complete(
+        self,
+        prompt: str,
+        model: str | None = None,
+        response_format: dict | None = None,
+    ) -> str:
+        ...
+
+    async def complete_batch(
+        self,
+        prompts: list[str],
+        model: str | None = None,
+        response_format: dict | None = None,
+    ) -> list[str]:
+        return await asyncio.gather(
+            *(self.complete(p, model, response_format) for p in prompts)
+        )
+
+
+class OpenAIBackend(LLMBackend):
+    """
+    OpenAI chat completions. With `base_url` set it talks to any
+    OpenAI-compatible server (vLLM, llama.cpp server, Ollama, LM Studio…).
+    """
+    name = "openai"
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        timeout: float = 20,
+        temperature: float = 0,
+    ):
+        import openai
+
+        self.client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url)
+        self.timeout = timeout
+        self.temperature = temperature
+        self._create = backoff.on_exception(
+            backoff.expo, openai.RateLimitError,
+            on_backoff=_on_backoff,
+        )(self._create_once)
+
+    async def _create_once(self, prompt: str, model: str, response_format: dict | None) -> str:
+        messages = [{"role": "user", "content": prompt}]
+        extra = {"response_format": response_format} if response_format else {}
+        started = time.perf_counter()
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=self.temperature,
+            timeout=self.timeout,
+            **extra
+        )
+        metrics.observe("llm.request", time.perf_counter() - started)
+        metrics.count("llm.requests")
+        if response.usage is not None:
+            metrics.count("llm.tokens_in", response.usage.prompt_tokens)
+            metrics.count("llm.tokens_out", response.usage.completion_tokens)
+        return response.choices[0].message.content
+
+    async def complete(
+        self,
+        prompt: str,
+        model: str | None = None,
+        response_format: dict | None = None,
+    ) -> str:
+        return await self._create(prompt, model, response_format)
+
+
+class LocalServerBackend(OpenAIBackend):
+    """
+    OpenAI-compatible server on the local network; no real key needed.
+    """
+    name = "local"
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000/v1",
+        api_key: str | None = None,
+        timeout: float = 120,
+        temperature: float = 0,
+    ):
+        super().__init__(
+            api_key=api_key or "not-needed",
+            base_url=base_url,
+            timeout=timeout,
+            temperature=temperature,
+        )
+
+
+class LlamaCppBackend(LLMBackend):
+    """
+    In-process CPU model through llama-cpp-python (e.g. a quantized GGUF).
+    Prompts are generated one at a time in a worker thread, so the event
+    loop stays free; the model is guarded by a lock since it is not
+    thread-safe.
+    """
+    name = "llamacpp"
+
+    def __init__(
+        self,
+        model_path: str,
+        n_ctx: int = 8192,
+        n_threads: int | None = None,
+        max_tokens: int = 256,
+        temperature: float = 0,
+    ):
+        from llama_cpp import Llama
+
+        self.llm = Llama(
+            model_path=model_path,
+            n_ctx=n_ctx,
+            n_threads=n_threads,
+            verbose=False,
+        )
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _llama_format(response_format: dict | None) -> dict | None:
+        # llama.cpp takes OpenAI-style JSON schemas as {"type": "json_object", "schema": ...}
+        if response_format and response_format.get("type") == "json_schema":
+            return {
+                "type": "json_object",
+                "schema": response_format["json_schema"]["schema"],
+            }
+        return response_format
+
+    def _generate(self, prompt: str, response_format: dict | None) -> str:
+        with self._lock:
+            started = time.perf_counter()
+            out = self.llm.create_chat_completion(
+                messages=[{"role": "user", "content": prompt}],
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                response_format=self._llama_format(response_format),
+            )
+        metrics.observe("llm.request", time.perf_counter() - started)
+        metrics.count("llm.requests")
+        usage = out.get("usage") or {}
+        metrics.count("llm.tokens_in", usage.get("prompt_tokens", 0))
+        metrics.count("llm.tokens_out", usage.get("completion_tokens", 0))
+        return out["choices"][0]["message"]["content"]
+
+    async def complete(
+        self,
+        prompt: str,
+        model: str | None = None,
+        response_format: dict | None = None,
+    ) -> str:
+        return await asyncio.to_thread(self._generate, prompt, response_format)
+
+    async def complete_batch(
+        self,
+        prompts: list[str],
+        model: str | None = None,
+        response_format: dict | None = None,
+    ) -> list[str]:
+        # the model serves one prompt at a time; no point queuing threads
+        return [await self.complete(p, model, response_format) for p in prompts]
+
+
+BACKENDS = {
+    OpenAIBackend.name: OpenAIBackend,
+    LocalServerBackend.name: LocalServerBackend,
+    LlamaCppBackend.name: LlamaCppBackend,
+}
+
+
+def get_backend(name: str = "openai", **kwargs) -> LLMBackend:
+    """
+    Instantiate a backend by name ('openai', 'local', 'llamacpp').
+    Keyword arguments are passed to the backend constructor.
+    """
+    try:
+        cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown LLM backend {name!r}, choose from {sorted(BACKENDS)}")
+    return cls(**kwargs)
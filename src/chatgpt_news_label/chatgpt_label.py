@@ -1,67 +1,369 @@
+import re
+import json
+import time
+import logging
+from collections import Counter
 import pandas as pd
 import asyncio
 
-from .config import make_api_call_to_gpt
+import instrumentation as metrics
+from dataset_io import read_frame, write_frame
+from .backends import LLMBackend
+from .config import (
+    get_default_backend,
+    PACK_MAX_TICKERS,
+    PACK_MAX_TOKENS,
+    CHARS_PER_TOKEN,
+)
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_WORDS = {"вверх": 1, "вниз": -1, "неизвестно": 0}
+
+# one pass finds every signal word and whether it follows the "сигнал: " anchor
+_SIGNAL_RE = re.compile(r"(сигнал: )?(вверх|вниз|неизвестно)", re.IGNORECASE)
+
+# how each response was decided: 'prefix', 'anchor', 'fallback', 'structured'
+PARSE_STATS: Counter = Counter()
+
+# structured-output request: the answer is {"signal": <one of three words>}
+SIGNAL_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "news_signal",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "signal": {"type": "string", "enum": ["ВВЕРХ", "ВНИЗ", "НЕИЗВЕСТНО"]},
+            },
+            "required": ["signal"],
+            "additionalProperties": False,
+        },
+    },
+}
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+def _format_news(group: pd.DataFrame) -> str:
+    news = ""
+    count = 1
+    for _, row in group.iterrows():
+        news += f"Новость {count} : {row['title']}\nТекст: {row['text']}\n"
+        count += 1
+    return news
 
 def create_prompt(group: pd.DataFrame) -> str:
     prompt = f"""Забудь все предыдущие инструкции. Ты финансовый эксперт с опытом рекомендации на российском рынке акций. 
 Проанализируй следующие новости в России, чтобы оценить ее влияние на цену акций {group.shortname.iloc[0]}.
 Ответь одним из трех вариантов: «ВВЕРХ», если новости позитивно повлияют. «ВНИЗ», если новости негативно повлияютя. «НЕИЗВЕСТНО», если новости, скорее всего, не окажут существенного влияния.\n"""
-    count = 1
-    for _, row in group.iterrows():
-        prompt += f"Новость {count} : {row['title']}\nТекст: {row['text']}\n"
-        count += 1
+    prompt += _format_news(group)
     prompt += 'Верни сначала только единый сигнал для всех новостей компании.'
     return prompt
 
-def parse_signal(response: str) -> tuple[int | None, str]:
-    response_low = response.replace('*', '').lower()
-    if response_low.startswith("вверх"):
-        return 1, response.strip()
-    elif response_low.startswith("вниз"):
-        return -1, response.strip()
-    elif response_low.startswith("неизвестно"):
-        return 0, response.strip()
-    elif response_low.find('сигнал: вверх') != -1:
-        return 1, response.strip()
-    elif response_low.find('сигнал: вниз') != -1:
-        return -1, response.strip()
-    elif response_low.find('сигнал: неизвестно') != -1:
-        return 0, response.strip()
-    else:
-        down = response_low.count('вниз')
-        up = response_low.count('вверх')
-        undetected = response_low.count('неизвестно')
-        decision = {1: up, -1: down, 0: undetected}
-        print(decision, max(decision, key=decision.get))
-        return max(decision, key=decision.get), response 
+def create_packed_prompt(groups: list[pd.DataFrame]) -> str:
+    """
+    Build one prompt for several companies' news of the same day.
+    The instruction preamble is sent once and the model is asked
+    to answer with a JSON object {ticker: signal}.
+    """
+    prompt = """Забудь все предыдущие инструкции. Ты финансовый эксперт с опытом рекомендации на российском рынке акций. 
+Проанализируй следующие новости в России, чтобы оценить их влияние на цену акций каждой из перечисленных компаний.
+Для каждой компании ответь одним из трех вариантов: «ВВЕРХ», если новости позитивно повлияют. «ВНИЗ», если новости негативно повлияют. «НЕИЗВЕСТНО», если новости, скорее всего, не окажут существенного влияния.\n"""
+    for group in groups:
+        prompt += f"\nКомпания {group.ticker.iloc[0]} ({group.shortname.iloc[0]}):\n"
+        prompt += _format_news(group)
+    tickers = ", ".join(f'"{group.ticker.iloc[0]}"' for group in groups)
+    prompt += (
+        "\nВерни только JSON-объект без пояснений, где ключ — тикер компании "
+        f"({tickers}), а значение — единый сигнал для всех ее новостей: "
+        "«ВВЕРХ», «ВНИЗ» или «НЕИЗВЕСТНО»."
+    )
+    return prompt
 
-async def _run_all(prompts: list[str], model: str):
-    tasks = [make_api_call_to_gpt(p, model=model) for p in prompts]
-    return await asyncio.gather(*tasks)
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count used to size packs (no tokenizer dependency).
+    """
+    return len(text) // CHARS_PER_TOKEN + 1
 
-def run(
-    input_excel: str,
-    output_xlsx: str,
-    model: str = "gpt-4o-2024-08-06"
+def pack_groups(
+    groups: list[pd.DataFrame],
+    max_tickers: int = PACK_MAX_TICKERS,
+    max_tokens: int = PACK_MAX_TOKENS,
+) -> list[list[int]]:
+    """
+    Greedily pack indices of (ticker, date) groups into lists so that
+    every pack holds groups of a single trading date, at most
+    `max_tickers` groups and roughly at most `max_tokens` input tokens.
+    A group that does not fit anywhere gets a pack of its own.
+    """
+    by_day: dict = {}
+    for i, group in enumerate(groups):
+        by_day.setdefault(group.date_only_trading.iloc[0], []).append(i)
+
+    packs = []
+    for day in sorted(by_day):
+        current, current_tokens = [], 0
+        for i in by_day[day]:
+            tokens = estimate_tokens(_format_news(groups[i]))
+            if current and (
+                len(current) >= max_tickers
+                or current_tokens + tokens > max_tokens
+            ):
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+    return packs
+
+def parse_signal(response: str, max_chars: int | None = None) -> tuple[int | None, str]:
+    """
+    Map a model answer to a signal (1 up, -1 down, 0 unknown):
+      1) the answer starts with a signal word;
+      2) otherwise 'сигнал: <word>' anywhere (up before down before unknown);
+      3) otherwise the most frequent signal word (ties: up, down, unknown).
+    Only the first `max_chars` characters are scanned if given.
+    """
+    text = response[:max_chars] if max_chars else response
+    text = text.replace('*', '')
+
+    first = _SIGNAL_RE.match(text)
+    if first and not first.group(1):
+        PARSE_STATS["prefix"] += 1
+        return SIGNAL_WORDS[first.group(2).lower()], response.strip()
+
+    decision = {1: 0, -1: 0, 0: 0}
+    anchored = set()
+    for m in _SIGNAL_RE.finditer(text):
+        signal = SIGNAL_WORDS[m.group(2).lower()]
+        decision[signal] += 1
+        if m.group(1):
+            anchored.add(signal)
+
+    for signal in (1, -1, 0):
+        if signal in anchored:
+            PARSE_STATS["anchor"] += 1
+            return signal, response.strip()
+
+    PARSE_STATS["fallback"] += 1
+    signal = max(decision, key=decision.get)
+    logger.debug("Keyword fallback %s -> %s", decision, signal)
+    return signal, response
+
+def parse_structured_signal(response: str) -> tuple[int | None, str]:
+    """
+    Parse a structured-output answer {"signal": "ВВЕРХ" | "ВНИЗ" | "НЕИЗВЕСТНО"};
+    falls back to `parse_signal` if the answer is not valid JSON.
+    """
+    try:
+        value = json.loads(response)["signal"]
+    except (json.JSONDecodeError, KeyError, TypeError):
+        return parse_signal(response)
+    signal = SIGNAL_WORDS.get(str(value).strip().lower())
+    if signal is None:
+        return parse_signal(response)
+    PARSE_STATS["structured"] += 1
+    return signal, response.strip()
+
+def parse_stats() -> dict[str, int]:
+    """
+    Counts of how responses were decided since the last reset.
+    """
+    return dict(PARSE_STATS)
+
+def reset_parse_stats():
+    PARSE_STATS.clear()
+
+def parse_packed_signal(response: str, tickers: list[str]) -> dict[str, tuple[int, str]]:
+    """
+    Parse a packed JSON answer {ticker: signal}.
+    Returns (signal, answer) only for tickers whose answer is one of the
+    three signal words; anything missing or ambiguous is left out so the
+    caller can fall back to a single-ticker prompt.
+    """
+    start, end = response.find("{"), response.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        answer = json.loads(response[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(answer, dict):
+        return {}
+
+    answer = {str(k).strip().upper(): v for k, v in answer.items()}
+    parsed = {}
+    for ticker in tickers:
+        value = answer.get(ticker.upper())
+        if not isinstance(value, str):
+            continue
+        value_low = value.replace('*', '').strip().lower()
+        for word, signal in SIGNAL_WORDS.items():
+            if value_low.startswith(word):
+                parsed[ticker] = (signal, value.strip())
+                break
+    return parsed
+
+async def _run_all(
+    prompts: list[str],
+    model: str,
+    backend: LLMBackend | None = None,
+    response_format: dict | None = None,
 ):
-    df = pd.read_excel(input_excel)
-    df['date'] = pd.to_datetime(df['date'])
-    df['date_only_trading'] = df['trading_time'].dt.date
+    backend = backend or get_default_backend()
+    return await backend.complete_batch(prompts, model, response_format)
+
+async def _run_packed(
+    groups: list[pd.DataFrame],
+    model: str,
+    max_tickers: int = PACK_MAX_TICKERS,
+    max_tokens: int = PACK_MAX_TOKENS,
+    backend: LLMBackend | None = None,
+    structured: bool = False,
+) -> list[tuple[int | None, str]]:
+    """
+    Label groups with packed prompts, then re-ask every group whose
+    packed answer could not be parsed with its own single-ticker prompt.
+    Returns (signal, explanation) per group, in the order of `groups`.
+    """
+    packs = pack_groups(groups, max_tickers, max_tokens)
+    multi = [pack for pack in packs if len(pack) > 1]
+    single = [pack[0] for pack in packs if len(pack) == 1]
+
+    multi_responses, single_responses = await asyncio.gather(
+        _run_all(
+            [create_packed_prompt([groups[i] for i in pack]) for pack in multi],
+            model, backend, JSON_RESPONSE_FORMAT if structured else None,
+        ),
+        _run_single(groups, single, model, backend, structured),
+    )
+
+    results: list = [None] * len(groups)
+    for i, res in zip(single, single_responses):
+        results[i] = res
+    for pack, response in zip(multi, multi_responses):
+        tickers = [groups[i].ticker.iloc[0] for i in pack]
+        parsed = parse_packed_signal(response, tickers)
+        for i, ticker in zip(pack, tickers):
+            results[i] = parsed.get(ticker)
+
+    missing = [i for i, res in enumerate(results) if res is None]
+    logger.info(
+        "Labeled %d groups with %d requests, %d fell back to single prompts",
+        len(groups), len(packs), len(missing)
+    )
+    if missing:
+        retry = await _run_single(groups, missing, model, backend, structured)
+        for i, res in zip(missing, retry):
+            results[i] = res
+    return results
 
-    grouped = (
+async def _run_single(
+    groups: list[pd.DataFrame],
+    indices: list[int],
+    model: str,
+    backend: LLMBackend | None = None,
+    structured: bool = False,
+) -> list[tuple[int | None, str]]:
+    prompts = [create_prompt(groups[i]) for i in indices]
+    if structured:
+        responses = await _run_all(prompts, model, backend, SIGNAL_RESPONSE_FORMAT)
+        return [parse_structured_signal(resp) for resp in responses]
+    responses = await _run_all(prompts, model, backend)
+    return [parse_signal(resp) for resp in responses]
+
+def group_prompts(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One 'combined_prompt' per (ticker, date_only_trading) group.
+    """
+    if 'date_only_trading' not in df:
+        df = df.assign(date_only_trading=df['trading_time'].dt.date)
+    return (
         df
-        .groupby(['ticker', 'date_only_trading'])
+        .groupby(['ticker', 'date_only_trading'], observed=True)
         .apply(create_prompt)
         .reset_index(name='combined_prompt')
     )
-    prompts = grouped['combined_prompt'].tolist()
 
-    responses = asyncio.run(_run_all(prompts, model))
+def label_frame(
+    df: pd.DataFrame,
+    model: str = "gpt-4o-2024-08-06",
+    pack: bool = False,
+    max_tickers: int = PACK_MAX_TICKERS,
+    max_tokens: int = PACK_MAX_TOKENS,
+    backend: LLMBackend | None = None,
+    structured: bool = False,
+) -> pd.DataFrame:
+    """
+    Label non-trading news (with a 'trading_time' column) per
+    (ticker, trading date). Returns one row per group with
+    'combined_prompt', 'signal' and 'explanation'.
+    """
+    backend = backend or get_default_backend()
+    reset_parse_stats()
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['date'])
+    df['date_only_trading'] = df['trading_time'].dt.date
+
+    if df.empty:
+        return pd.DataFrame(columns=[
+            'ticker', 'date_only_trading', 'combined_prompt', 'signal', 'explanation'
+        ])
+
+    grouped = group_prompts(df)
+
+    started = time.perf_counter()
+    if pack:
+        groups = [g for _, g in df.groupby(['ticker', 'date_only_trading'], observed=True)]
+        signals_expls = asyncio.run(
+            _run_packed(groups, model, max_tickers, max_tokens, backend, structured)
+        )
+    else:
+        prompts = grouped['combined_prompt'].tolist()
+        fmt = SIGNAL_RESPONSE_FORMAT if structured else None
+        responses = asyncio.run(_run_all(prompts, model, backend, fmt))
+        parse = parse_structured_signal if structured else parse_signal
+        signals_expls = [parse(resp) for resp in responses]
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Labeled %d groups with %s backend in %.1fs (%.2f groups/s)",
+        len(grouped), backend.name, elapsed, len(grouped) / elapsed if elapsed else 0.0
+    )
+    logger.info("Signal parsing: %s", parse_stats())
+    for how, n in parse_stats().items():
+        metrics.count(f"chatgpt_news_label.parsed_{how}", n)
 
-    signals_expls = [parse_signal(resp) for resp in responses]
     signals, explanations = zip(*signals_expls)
     grouped['signal'] = signals
     grouped['explanation'] = explanations
+    return grouped
+
+@metrics.timed("chatgpt_news_label.run")
+def run(
+    input_path: str,
+    output_path: str,
+    model: str = "gpt-4o-2024-08-06",
+    pack: bool = False,
+    max_tickers: int = PACK_MAX_TICKERS,
+    max_tokens: int = PACK_MAX_TOKENS,
+    backend: LLMBackend | None = None,
+    structured: bool = False,
+    dedup: float | None = None,
+):
+    df = read_frame(input_path)
+    if dedup is not None:
+        from .dedup import dedup_frame
 
-    grouped.to_excel(output_xlsx, index=False)
+        df, _ = dedup_frame(df, threshold=dedup, by=("ticker", "trading_time"))
+    grouped = label_frame(
+        df,
+        model=model,
+        pack=pack,
+        max_tickers=max_tickers,
+        max_tokens=max_tokens,
+        backend=backend,
+        structured=structured,
+    )
+    write_frame(grouped, output_path)
@@ -1,12 +1,13 @@
+import os
 import argparse
 from dotenv import load_dotenv
 
-from .chatgpt_label import run
+from .backends import BACKENDS
+from .config import PACK_MAX_TICKERS, PACK_MAX_TOKENS, DEDUP_THRESHOLD, LLM_BACKEND, make_backend
 
 load_dotenv(dotenv_path=".env.txt")
 WORK_FOLDER = os.getenv("WORK_FILES_FOLDER", "")
 if WORK_FOLDER:
-    import os
     os.makedirs(WORK_FOLDER, exist_ok=True)
     
 def main():
@@ -16,27 +17,86 @@ def main():
     parser.add_argument(
         "--input", "-i",
         required=True,
-        help="Path to dataset with news to label (Excel with date,title,text,signal…)"
+        help="Path to dataset with news to label (Parquet/Feather with date,title,text,ticker…; legacy .xlsx is read too)"
     )
     parser.add_argument(
         "--output", "-o",
-        default="gpt_signals.json",
-        help="Where to save the JSON with signals"
+        default="gpt_signals.parquet",
+        help="Where to save the signals (Parquet by default, .feather or an explicit .xlsx export)"
     )
     parser.add_argument(
         "--model", "-m",
         default="gpt-4o-2024-08-06",
         help="OpenAI model to use"
     )
+    parser.add_argument(
+        "--backend", "-b",
+        choices=sorted(BACKENDS),
+        default=LLM_BACKEND,
+        help="LLM backend: hosted OpenAI, OpenAI-compatible local server or in-process llama.cpp"
+    )
+    parser.add_argument(
+        "--base-url",
+        default=None,
+        help="Base URL of an OpenAI-compatible server (openai/local backends)"
+    )
+    parser.add_argument(
+        "--model-path",
+        default=None,
+        help="Path to a GGUF model file (llamacpp backend)"
+    )
+    parser.add_argument(
+        "--pack",
+        action="store_true",
+        help="Pack several tickers of the same day into one request"
+    )
+    parser.add_argument(
+        "--structured",
+        action="store_true",
+        help="Request structured (JSON schema) answers so parsing is never ambiguous"
+    )
+    parser.add_argument(
+        "--dedup",
+        type=float,
+        nargs="?",
+        const=DEDUP_THRESHOLD,
+        default=None,
+        metavar="THRESHOLD",
+        help=f"Drop near-duplicate articles of a prompt first (similarity threshold, default {DEDUP_THRESHOLD})"
+    )
+    parser.add_argument(
+        "--max-tickers",
+        type=int,
+        default=PACK_MAX_TICKERS,
+        help="Max tickers per packed request"
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=PACK_MAX_TOKENS,
+        help="Approximate max input tokens of news per packed request"
+    )
 
     args = parser.parse_args()
+
+    from .chatgpt_label import run
     if WORK_FOLDER: 
         input_path = os.path.join(WORK_FOLDER, os.path.basename(args.input))
         output_path = os.path.join(WORK_FOLDER, os.path.basename(args.output))
     else:
         input_path = args.input
         output_path = args.output
-    run(input_path, output_path, model=args.model)
+    run(
+        input_path,
+        output_path,
+        model=args.model,
+        pack=args.pack,
+        max_tickers=args.max_tickers,
+        max_tokens=args.max_tokens,
+        backend=make_backend(args.backend, args.base_url, args.model_path),
+        structured=args.structured,
+        dedup=args.dedup,
+    )
 
 if __name__ == "__main__":
     main()
@@ -1,23 +1,73 @@
 import os
 from dotenv import load_dotenv
-import openai
-import backoff
+
+from .backends import LLMBackend, get_backend
 
 load_dotenv(dotenv_path=".env.txt")
 
-api_key = os.getenv("OPENAI_API_KEY")
-client = openai.AsyncOpenAI(api_key=api_key)
+# Which LLM backend labels the news: 'openai', 'local' (OpenAI-compatible
+# server at LLM_BASE_URL) or 'llamacpp' (in-process model at LLAMA_MODEL_PATH)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "")
+LLAMA_MODEL_PATH = os.getenv("LLAMA_MODEL_PATH", "")
+LLAMA_N_THREADS = int(os.getenv("LLAMA_N_THREADS", "0")) or None
+
+# Prompt packing: several tickers of the same day in one request
+PACK_MAX_TICKERS = int(os.getenv("PACK_MAX_TICKERS", "8"))
+PACK_MAX_TOKENS = int(os.getenv("PACK_MAX_TOKENS", "6000"))
+CHARS_PER_TOKEN = 3
+
+# Near-duplicate filtering before labeling: MinHash estimated Jaccard
+# similarity of word shingles at or above which articles are merged
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+DEDUP_SHINGLE = 3
+
+_default_backend = None
+
+def make_backend(
+    name: str | None = None,
+    base_url: str | None = None,
+    model_path: str | None = None,
+) -> LLMBackend:
+    """
+    Build a backend from arguments, falling back to the environment.
+    The API key is read here, not at import time.
+    """
+    name = name or LLM_BACKEND
+    base_url = base_url or LLM_BASE_URL
+    if name == "openai":
+        return get_backend(
+            name,
+            api_key=os.getenv("OPENAI_API_KEY"),
+            base_url=base_url or None,
+        )
+    if name == "local":
+        kwargs = {"base_url": base_url} if base_url else {}
+        return get_backend(name, api_key=os.getenv("OPENAI_API_KEY"), **kwargs)
+    if name == "llamacpp":
+        model_path = model_path or LLAMA_MODEL_PATH
+        if not model_path:
+            raise ValueError("llamacpp backend needs a model path (LLAMA_MODEL_PATH)")
+        return get_backend(
+            name,
+            model_path=model_path,
+            n_threads=LLAMA_N_THREADS,
+        )
+    return get_backend(name)
+
+def get_default_backend() -> LLMBackend:
+    """
+    Backend configured by the environment, created on first use.
+    """
+    global _default_backend
+    if _default_backend is None:
+        _default_backend = make_backend()
+    return _default_backend
 
-@backoff.on_exception(backoff.expo, openai.RateLimitError)
 async def make_api_call_to_gpt(prompt: str, model: str = "gpt-4o-2024-08-06"):
     """
-    Async function to make an API call to OpenAI's GPT model.
+    Async function to make an API call to the configured LLM backend
+    (OpenAI's GPT model by default).
     """
-    messages = [{"role": "user", "content": prompt}]
-    response = await client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=0,
-        timeout=20
-    )
-    return response.choices[0].message.content
+    return await get_default_backend().complete(prompt, model)
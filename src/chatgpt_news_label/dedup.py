@@ -0,0 +1,216 @@
+"""
+Near-duplicate news detection with MinHash signatures and LSH banding.
+
+Finam republishes and lightly rewrites the same story; without this
+step every copy ends up in the (ticker, date) prompt. Articles are
+visited in publication order and compared only with the articles kept
+so far in the same scope (by default the same ticker within
+`window`). The LSH index holds one scope at a time, so its memory is
+bounded by the largest scope; the frame itself is read whole, and the
+title + text of an article is only joined when it is visited.
+"""
+import re
+import zlib
+import logging
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import instrumentation as metrics
+from dataset_io import read_frame, write_frame
+from .chatgpt_label import estimate_tokens
+from .config import DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_SHINGLE
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _shingles(text: str, k: int) -> np.ndarray:
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return np.zeros(1, dtype=np.uint64)
+    h = np.fromiter((zlib.crc32(w.encode()) for w in words), dtype=np.uint64, count=len(words))
+    if len(h) < k:
+        return np.unique(h)
+    # rolling combination of k consecutive word hashes (wraps mod 2**64)
+    out = h[: len(h) - k + 1].copy()
+    for i in range(1, k):
+        out = out * np.uint64(1_000_003) + h[i: len(h) - k + 1 + i]
+    return np.unique(out)
+
+
+def _bands(threshold: float, num_perm: int) -> tuple[int, int]:
+    """
+    (bands, rows) with bands * rows == num_perm whose S-curve midpoint
+    (1/b)^(1/r) is the largest one not above `threshold`, so true
+    near-duplicates are rarely missed; candidates are verified anyway.
+    """
+    best = (num_perm, 1)
+    for r in range(1, num_perm + 1):
+        if num_perm % r:
+            continue
+        b = num_perm // r
+        if (1 / b) ** (1 / r) <= threshold:
+            best = (b, r)
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    Streaming LSH index of kept articles. `add(text)` returns the id of
+    the kept article it duplicates (estimated Jaccard >= threshold) or,
+    if there is none, keeps it under a new id and returns that.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEDUP_THRESHOLD,
+        num_perm: int = DEDUP_NUM_PERM,
+        shingle: int = DEDUP_SHINGLE,
+        seed: int = 1,
+    ):
+        self.threshold = threshold
+        self.shingle = shingle
+        self.bands, self.rows = _bands(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        # multiply-shift hashes: top 32 bits of (a * x + b) mod 2**64
+        self._a = rng.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+        self.clear()
+
+    def clear(self):
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures: dict[int, np.ndarray] = {}
+        self._order: deque = deque()   # (stamp, id) of kept articles, oldest first
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> np.ndarray:
+        s = _shingles(text, self.shingle)
+        hashed = (self._a[:, None] * s[None, :] + self._b[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def _keys(self, sig: np.ndarray):
+        for band in range(self.bands):
+            yield band, sig[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def query(self, sig: np.ndarray) -> int | None:
+        seen = set()
+        for band, key in self._keys(sig):
+            for rid in self._buckets[band].get(key, ()):
+                if rid in seen:
+                    continue
+                seen.add(rid)
+                if np.mean(self._signatures[rid] == sig) >= self.threshold:
+                    return rid
+        return None
+
+    def add(self, text: str, stamp=None) -> int:
+        sig = self.signature(text)
+        match = self.query(sig)
+        if match is not None:
+            return match
+        rid = self._next_id
+        self._next_id += 1
+        self._signatures[rid] = sig
+        self._order.append((stamp, rid))
+        for band, key in self._keys(sig):
+            self._buckets[band].setdefault(key, []).append(rid)
+        return rid
+
+    def evict_before(self, stamp):
+        """
+        Forget kept articles added with a stamp older than `stamp`.
+        """
+        while self._order and self._order[0][0] is not None and self._order[0][0] < stamp:
+            _, rid = self._order.popleft()
+            sig = self._signatures.pop(rid)
+            for band, key in self._keys(sig):
+                bucket = self._buckets[band][key]
+                bucket.remove(rid)
+                if not bucket:
+                    del self._buckets[band][key]
+
+
+def _str(value) -> str:
+    return "" if value is None or value != value else str(value)
+
+
+@metrics.timed("label.dedup")
+def dedup_frame(
+    df: pd.DataFrame,
+    threshold: float = DEDUP_THRESHOLD,
+    by: tuple[str, ...] = ("ticker",),
+    window: pd.Timedelta | None = pd.Timedelta(days=1),
+    num_perm: int = DEDUP_NUM_PERM,
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Drop near-duplicate articles (title + text) within each `by` scope,
+    keeping the earliest one of every cluster. Articles older than
+    `window` are no longer compared against. Returns the kept rows
+    (with a 'duplicates' count per representative) and stats with the
+    number of dropped articles and the prompt tokens saved.
+    """
+    df = df.reset_index(drop=True)
+    df["date"] = pd.to_datetime(df["date"])
+    # visit rows by (scope, date) through a permutation instead of a sorted copy
+    keys = df.groupby(list(by), observed=True, dropna=False).ngroup().to_numpy()
+    dates = df["date"].to_numpy()
+    order = np.lexsort((dates, keys))
+    titles, bodies = df["title"].to_numpy(), df["text"].to_numpy()
+
+    index = NearDuplicateIndex(threshold, num_perm)
+    rep_of: dict[int, int] = {}     # dropped row label -> representative row label
+    rep_rows: dict[int, int] = {}   # index id -> row label in the current scope
+    scope = None
+    for label in order.tolist():
+        key, date = keys[label], dates[label]
+        text = f"{_str(titles[label])}\n{_str(bodies[label])}"
+        if key != scope:
+            index.clear()
+            rep_rows.clear()
+            scope = key
+        elif window is not None:
+            index.evict_before(date - window)
+        rid = index.add(text, stamp=date)
+        if rid in rep_rows:
+            rep_of[label] = rep_rows[rid]
+        else:
+            rep_rows[rid] = label
+
+    dropped = df.loc[list(rep_of)]
+    tokens_saved = int(sum(
+        estimate_tokens(f"Новость : {t}\nТекст: {x}\n")
+        for t, x in zip(dropped["title"], dropped["text"])
+    ))
+    kept = df.drop(index=list(rep_of))
+    kept["duplicates"] = pd.Series(rep_of).value_counts().reindex(kept.index, fill_value=0)
+
+    stats = {
+        "articles": len(df),
+        "kept": len(kept),
+        "duplicates": len(rep_of),
+        "tokens_saved": tokens_saved,
+    }
+    metrics.count("label.dedup.duplicates", len(rep_of))
+    metrics.count("label.dedup.tokens_saved", tokens_saved)
+    logger.info(
+        "Dedup: %d of %d articles are near-duplicates (threshold %.2f), ~%d prompt tokens saved",
+        len(rep_of), len(df), threshold, tokens_saved,
+    )
+    return kept, stats
+
+
+def run(
+    input_path: str,
+    output_path: str,
+    threshold: float = DEDUP_THRESHOLD,
+    by: tuple[str, ...] = ("ticker",),
+) -> dict:
+    kept, stats = dedup_frame(read_frame(input_path), threshold=threshold, by=by)
+    write_frame(kept, output_path)
+    return stats
@@ -0,0 +1,11 @@
+"""
+dataset_io — typed, compact dataset hand-off between pipeline stages.
+"""
+from _lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "read_frame": ".frames",
+    "write_frame": ".frames",
+    "export_excel": ".frames",
+    "DEFAULT_SUFFIX": ".frames",
+})
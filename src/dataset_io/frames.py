@@ -0,0 +1,110 @@
+import os
+import logging
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUFFIX = ".parquet"
+
+FORMATS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".xlsx": "excel",
+}
+
+# low-cardinality string columns stored as dictionary-encoded categoricals
+CATEGORY_COLUMNS = ("ticker", "shortname")
+
+# timestamp columns stored as datetimes: column -> format of its strings
+# (FINAM publication time for news; ISO 8601 is accepted for any of them)
+NEWS_DATE_FORMAT = "%d.%m.%y %H:%M"
+DATETIME_COLUMNS = {"date": NEWS_DATE_FORMAT, "trading_time": "ISO8601"}
+
+
+def _format(path: str) -> str:
+    suffix = os.path.splitext(path)[1].lower()
+    if not suffix:
+        return FORMATS[DEFAULT_SUFFIX]
+    try:
+        return FORMATS[suffix]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported dataset format {suffix!r}, use one of {sorted(FORMATS)}"
+        )
+
+
+def with_default_suffix(path: str) -> str:
+    """
+    Append the default (Parquet) suffix to a path without an extension.
+    """
+    return path if os.path.splitext(path)[1] else path + DEFAULT_SUFFIX
+
+
+def _datetimes(values: pd.Series, fmt: str) -> pd.Series:
+    for candidate in dict.fromkeys((fmt, "ISO8601")):
+        try:
+            return pd.to_datetime(values, format=candidate)
+        except (ValueError, TypeError):
+            continue
+    logger.warning("Column %r is not in %s or ISO 8601; kept as text", values.name, fmt)
+    return values
+
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype("category")
+    for col, fmt in DATETIME_COLUMNS.items():
+        if col in df.columns and df[col].dtype == object:
+            df[col] = _datetimes(df[col], fmt)
+    return df
+
+
+def read_frame(path: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Read a stage hand-off. Parquet/Feather keep datetimes and categoricals;
+    legacy .xlsx files are still readable but slow. A path without an
+    extension means Parquet, as in `write_frame`.
+    """
+    path = with_default_suffix(path)
+    fmt = _format(path)
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    if fmt == "feather":
+        return pd.read_feather(path, columns=columns)
+    logger.warning("Reading legacy Excel hand-off %s; prefer Parquet", path)
+    return _typed(pd.read_excel(path, usecols=columns))
+
+
+def write_frame(df: pd.DataFrame, path: str) -> str:
+    """
+    Write a stage hand-off (Parquet unless the path says otherwise) and
+    return the path written. A .xlsx path is treated as an explicit export.
+    """
+    path = with_default_suffix(path)
+    fmt = _format(path)
+    if fmt == "excel":
+        export_excel(df, path)
+        return path
+    df = _typed(df).reset_index(drop=True)
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_feather(path)
+    return path
+
+
+def export_excel(df: pd.DataFrame, path: str):
+    """
+    Export-only Excel copy for humans; not meant as a pipeline input.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+        elif isinstance(df[col].dtype, pd.DatetimeTZDtype):
+            df[col] = df[col].dt.tz_localize(None)
+    df.to_excel(path, index=False)
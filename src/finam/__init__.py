@@ -0,0 +1,3 @@
+"""
+finam — single entry point for all pipeline commands.
+"""
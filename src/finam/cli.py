@@ -0,0 +1,45 @@
+"""
+`finam <command> [options]` dispatches to the package CLIs. Only the
+chosen command's module is imported, so `finam --help` and every
+`finam <command> --help` start without pandas, selenium, matplotlib or
+the LLM client.
+"""
+import sys
+import importlib
+
+# command -> (module with main(), one-line description)
+COMMANDS = {
+    "parse": ("newsparser.cli", "Scrape FINAM news and tag companies"),
+    "label": ("chatgpt_news_label.cli", "Label news with an LLM into signals"),
+    "market": ("market_data_loader.cli", "Fill or update market_data.db from MOEX"),
+    "pipeline": ("orchestrator.cli", "Run scrape → label → backtest, skipping up-to-date stages"),
+    "live": ("orchestrator.live_cli", "Poll for new news and update signals and portfolio state"),
+    "queue": ("orchestrator.queue_cli", "Queue scrape/label jobs, run workers, report and collect"),
+}
+
+
+def usage() -> str:
+    width = max(map(len, COMMANDS))
+    lines = ["usage: finam <command> [options]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {desc}" for name, (_, desc) in COMMANDS.items()]
+    lines += ["", "Run `finam <command> --help` for the options of a command."]
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(usage(), file=sys.stderr)
+        sys.exit(f"finam: unknown command '{command}'")
+
+    module = importlib.import_module(COMMANDS[command][0])
+    sys.argv = [f"finam {command}", *rest]
+    return module.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+instrumentation — lightweight stage timers, counters and latency
+histograms shared by all pipeline packages.
+
+Disabled unless FINAM_METRICS=1 (or `enable()` is called); set
+FINAM_METRICS_FILE to a .json or .prom path to export on exit.
+"""
+
+from .metrics import (
+    enable,
+    disable,
+    enabled,
+    count,
+    observe,
+    timer,
+    timed,
+    summary,
+    reset,
+    export,
+)
+
+__all__ = [
+    "enable",
+    "disable",
+    "enabled",
+    "count",
+    "observe",
+    "timer",
+    "timed",
+    "summary",
+    "reset",
+    "export",
+]
@@ -0,0 +1,217 @@
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import functools
+import inspect
+from bisect import bisect_left
+
+# seconds; the last bucket is +Inf
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+_enabled = os.getenv("FINAM_METRICS", "") not in ("", "0", "false", "False")
+_lock = threading.Lock()
+_counters: dict[str, float] = {}
+_histograms: dict[str, "Histogram"] = {}
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with count, sum, min and max.
+    """
+    __slots__ = ("buckets", "count", "sum", "min", "max")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, value: float):
+        self.buckets[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], self.buckets)),
+        }
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def count(name: str, value: float = 1):
+    """
+    Add `value` to counter `name` (pages fetched, rows read, retries, tokens…).
+    """
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, value: float):
+    """
+    Record one observation (usually seconds) in histogram `name`.
+    """
+    if not _enabled:
+        return
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.add(value)
+
+
+class _Timer:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name: str):
+    """
+    Context manager recording wall time of the block in histogram `name`.
+    """
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+
+def timed(name: str):
+    """
+    Decorator form of `timer` for plain and async functions.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await func(*args, **kwargs)
+                with _Timer(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def summary() -> dict:
+    with _lock:
+        return {
+            "counters": dict(sorted(_counters.items())),
+            "histograms": {k: v.as_dict() for k, v in sorted(_histograms.items())},
+        }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _prom_name(name: str) -> str:
+    return "finam_" + "".join(ch if ch.isalnum() else "_" for ch in name)
+
+
+def to_prometheus() -> str:
+    """
+    Prometheus text exposition format of the current metrics.
+    """
+    data = summary()
+    lines = []
+    for name, value in data["counters"].items():
+        metric = _prom_name(name) + "_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for name, hist in data["histograms"].items():
+        metric = _prom_name(name) + "_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for le, n in hist["buckets"].items():
+            cumulative += n
+            lines.append(f'{metric}_bucket{{le="{le}"}} {cumulative}')
+        lines += [f"{metric}_sum {hist['sum']}", f"{metric}_count {hist['count']}"]
+    return "\n".join(lines) + "\n"
+
+
+def export(path: str):
+    """
+    Write metrics to `path`: Prometheus text for .prom/.txt, JSON otherwise.
+    """
+    if path.endswith((".prom", ".txt")):
+        content = to_prometheus()
+    else:
+        content = json.dumps(summary(), ensure_ascii=False, indent=2)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _format_summary() -> str:
+    data = summary()
+    lines = ["Pipeline metrics:"]
+    for name, hist in data["histograms"].items():
+        lines.append(
+            f"  {name:<44} n={hist['count']:<6} total={hist['sum']:.3f}s "
+            f"mean={hist['mean']:.4f}s max={hist['max']:.4f}s"
+        )
+    for name, value in data["counters"].items():
+        lines.append(f"  {name:<44} {value:g}")
+    return "\n".join(lines)
+
+
+@atexit.register
+def _dump_on_exit():
+    if not _enabled or not (_counters or _histograms):
+        return
+    print(_format_summary(), file=sys.stderr)
+    path = os.getenv("FINAM_METRICS_FILE", "")
+    if path:
+        export(path)
@@ -1,8 +1,8 @@
 import argparse
-from datetime import date, timedelta
+from datetime import date
 import asyncio
 import logging
-from .fetcher import update_all
+from .config import DERIVED_PERIODS
 
 logging.basicConfig(
     format="%(asctime)s %(levelname)s %(name)s │ %(message)s",
@@ -16,31 +16,45 @@ def main():
     )
     p.add_argument(
         "--start", "-s",
-        required=True,
+        required=False,
         help="Start date, YYYY-MM-DD"
     )
     p.add_argument(
         "--end", "-e",
-        required=True,
+        required=False,
         help="End date, YYYY-MM-DD"
     )
     p.add_argument(
         "--period", "-p",
         type=int,
-        default=1,
-        help="MOEX candle period (1=daily)"
+        nargs="*",
+        choices=[1, *DERIVED_PERIODS],
+        default=list(DERIVED_PERIODS),
+        help="Bar periods to derive locally from the downloaded 1-minute bars "
+             "(MOEX codes: 5, 10, 60 minutes, 24=daily)"
+    )
+    p.add_argument(
+        "--materialize-only",
+        action="store_true",
+        help="Download nothing; derive missing --period bars and rebuild the coverage index from the stored 1-minute bars"
     )
     args = p.parse_args()
 
+    if args.materialize_only:
+        from .resample import materialize_missing
+
+        materialize_missing(args.period)
+        return
+    if not (args.start and args.end):
+        p.error("--start and --end are required")
+
+    from .fetcher import update_all, calendar_days
+
     start = date.fromisoformat(args.start)
     end   = date.fromisoformat(args.end)
-    days = []
-    cur = start
-    while cur <= end:
-        days.append(cur)
-        cur += timedelta(days=1)
+    days = calendar_days(start, end)
     logger.info(
-        "Will fetch from %s to %s (period=%d)",
+        "Will fetch 1-minute bars from %s to %s and derive periods %s",
         args.start, args.end, args.period
     )
 
@@ -9,3 +9,12 @@ if EXTRA_FOLDER:
 
 DB_PATH = os.path.join(EXTRA_FOLDER, "market_data.db")
 TICKERS_PKL = os.path.join(EXTRA_FOLDER, "tickers_extended.pkl")
+
+# MOEX period code -> bar length in minutes (24 is the daily bar). Only
+# 1-minute bars are downloaded; the others are resampled locally.
+PERIOD_MINUTES = {1: 1, 5: 5, 10: 10, 60: 60, 24: 24 * 60}
+DERIVED_PERIODS = (5, 10, 60, 24)
+
+# a stored day whose last bar is earlier than this was loaded mid-session
+# and is requested again (the backtest exits at 18:39)
+COMPLETE_AFTER = "18:39"
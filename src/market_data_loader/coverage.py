@@ -0,0 +1,270 @@
+"""
+Per-ticker coverage index of the stored 1-minute bars.
+
+For every ticker the `coverage` table keeps, over consecutive calendar
+days from its first loaded day, a bitset of days that have bars, a
+bitset of days that were requested but returned nothing (weekends,
+holidays, not yet listed) and the first/last bar minute of each day.
+The loader updates it on insert and asks MOEX only for the gaps; the
+backtest checks whole frames of (ticker, day) pairs against it without
+touching the bars.
+"""
+import sqlite3
+import logging
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from .config import COMPLETE_AFTER
+
+logger = logging.getLogger(__name__)
+
+_NO_MINUTE = -1
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS coverage (
+        ticker TEXT PRIMARY KEY,
+        start  INTEGER,
+        size   INTEGER,
+        days   BLOB,
+        empty  BLOB,
+        first  BLOB,
+        last   BLOB
+    ) WITHOUT ROWID
+'''
+
+
+def _minute(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def _day_numbers(days) -> np.ndarray:
+    return pd.to_datetime(pd.Series(days)).to_numpy().astype("datetime64[D]").astype(np.int64)
+
+
+@dataclass
+class TickerCoverage:
+    start: int              # day number (days since 1970-01-01) of index 0
+    days: np.ndarray        # bool: the day has bars
+    empty: np.ndarray       # bool: requested, no bars
+    first: np.ndarray       # int16: minute of day of the first bar, -1 if none
+    last: np.ndarray        # int16: minute of day of the last bar, -1 if none
+
+    @classmethod
+    def new(cls, start: int, size: int = 0) -> "TickerCoverage":
+        return cls(
+            start,
+            np.zeros(size, dtype=bool),
+            np.zeros(size, dtype=bool),
+            np.full(size, _NO_MINUTE, dtype=np.int16),
+            np.full(size, _NO_MINUTE, dtype=np.int16),
+        )
+
+    def span(self, lo: int, hi: int):
+        """
+        Grow the arrays so that day numbers lo..hi are addressable.
+        """
+        if len(self.days) == 0:
+            self.start = lo
+        new_start = min(self.start, lo)
+        new_end = max(self.start + len(self.days), hi + 1)
+        if new_start == self.start and new_end == self.start + len(self.days):
+            return
+        grown = TickerCoverage.new(new_start, new_end - new_start)
+        at = self.start - new_start
+        for name in ("days", "empty", "first", "last"):
+            getattr(grown, name)[at:at + len(self.days)] = getattr(self, name)
+        self.start, self.days, self.empty, self.first, self.last = (
+            grown.start, grown.days, grown.empty, grown.first, grown.last
+        )
+
+    def lookup(self, day_numbers: np.ndarray):
+        """
+        (has bars, first minute, last minute) per day number.
+        """
+        i = day_numbers - self.start
+        inside = (i >= 0) & (i < len(self.days))
+        j = np.where(inside, i, 0)
+        if len(self.days) == 0:
+            none = np.full(len(i), _NO_MINUTE, dtype=np.int16)
+            return np.zeros(len(i), dtype=bool), none, none
+        return inside & self.days[j], self.first[j], self.last[j]
+
+
+class CoverageIndex:
+    def __init__(self, tickers: dict[str, TickerCoverage] | None = None):
+        self.tickers = tickers or {}
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    @classmethod
+    def load(cls, conn) -> "CoverageIndex":
+        try:
+            rows = conn.execute(
+                "SELECT ticker, start, size, days, empty, first, last FROM coverage"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return cls()  # database filled before the index existed
+        tickers = {}
+        for ticker, start, size, days, empty, first, last in rows:
+            tickers[ticker] = TickerCoverage(
+                start,
+                np.unpackbits(np.frombuffer(days, dtype=np.uint8), count=size).astype(bool),
+                np.unpackbits(np.frombuffer(empty, dtype=np.uint8), count=size).astype(bool),
+                np.frombuffer(first, dtype=np.int16).copy(),
+                np.frombuffer(last, dtype=np.int16).copy(),
+            )
+        return cls(tickers)
+
+    @classmethod
+    def load_or_rebuild(cls, conn) -> "CoverageIndex":
+        """
+        `load`, rebuilding the index first when it is empty but 1-minute
+        bars are stored (a database filled before the index was kept up
+        to date, or whose coverage table was cleared).
+        """
+        index = cls.load(conn)
+        if len(index):
+            return index
+        try:
+            stored = conn.execute("SELECT EXISTS (SELECT 1 FROM ticker_data)").fetchone()[0]
+        except sqlite3.OperationalError:
+            return index  # no minute bars table either
+        if not stored:
+            return index
+        logger.warning("Coverage index is empty but ticker_data has bars; rebuilding it")
+        conn.execute(SCHEMA)
+        index = cls.rebuild(conn)
+        conn.commit()
+        return index
+
+    def save(self, conn, tickers=None):
+        rows = [
+            (
+                ticker, cov.start, len(cov.days),
+                np.packbits(cov.days).tobytes(), np.packbits(cov.empty).tobytes(),
+                cov.first.tobytes(), cov.last.tobytes(),
+            )
+            for ticker, cov in self.tickers.items()
+            if tickers is None or ticker in tickers
+        ]
+        conn.executemany(
+            '''INSERT OR REPLACE INTO coverage
+               (ticker, start, size, days, empty, first, last)
+               VALUES (?, ?, ?, ?, ?, ?, ?)''',
+            rows,
+        )
+
+    def _ticker(self, ticker: str, day_numbers: np.ndarray) -> TickerCoverage:
+        cov = self.tickers.setdefault(ticker, TickerCoverage.new(int(day_numbers.min())))
+        cov.span(int(day_numbers.min()), int(day_numbers.max()))
+        return cov
+
+    def record(self, ticker: str, timestamps: list[str]):
+        """
+        Mark the bars with 'YYYY-MM-DD HH:MM:SS' timestamps as stored.
+        """
+        if not timestamps:
+            return
+        stamps = pd.Series(timestamps, dtype=str)
+        days = _day_numbers(stamps.str[:10])
+        minutes = (stamps.str[11:13].astype(int) * 60 + stamps.str[14:16].astype(int)).to_numpy()
+        cov = self._ticker(ticker, days)
+        i = days - cov.start
+        cov.days[i] = True
+        cov.empty[i] = False
+        minutes = minutes.astype(np.int16)
+        unset = np.iinfo(np.int16).max
+        first = np.where(cov.first == _NO_MINUTE, unset, cov.first).astype(np.int16)
+        np.minimum.at(first, i, minutes)
+        cov.first = np.where(first == unset, _NO_MINUTE, first).astype(np.int16)
+        np.maximum.at(cov.last, i, minutes)
+
+    def record_empty(self, ticker: str, days):
+        days = _day_numbers(days)
+        if len(days) == 0:
+            return
+        cov = self._ticker(ticker, days)
+        i = days - cov.start
+        cov.empty[i] = ~cov.days[i]
+
+    def _empty(self, cov: TickerCoverage, numbers: np.ndarray) -> np.ndarray:
+        i = numbers - cov.start
+        inside = (i >= 0) & (i < len(cov.days))
+        return inside & cov.empty[np.where(inside, i, 0)]
+
+    def known(self, ticker: str, days) -> np.ndarray:
+        """
+        Per day: True where `ticker` has bars or the day was requested and
+        came back empty, i.e. the local store can answer for that day.
+        """
+        numbers = _day_numbers(days)
+        cov = self.tickers.get(ticker)
+        if cov is None:
+            return np.zeros(len(numbers), dtype=bool)
+        return cov.lookup(numbers)[0] | self._empty(cov, numbers)
+
+    def missing(self, ticker: str, days, today: date | None = None) -> list:
+        """
+        The `days` worth requesting for `ticker`: no bars yet and not known
+        to be empty, or, for today and yesterday, bars ending before
+        COMPLETE_AFTER (loaded mid-session).
+        """
+        days = list(days)
+        cov = self.tickers.get(ticker)
+        if cov is None or not days:
+            return days
+        numbers = _day_numbers(days)
+        has, _, last = cov.lookup(numbers)
+        empty = self._empty(cov, numbers)
+        today = _day_numbers([today or date.today()])[0]
+        partial = has & (last < _minute(COMPLETE_AFTER)) & (numbers >= today - 1)
+        need = (~has & ~empty) | partial
+        return [d for d, n in zip(days, need) if n]
+
+    def covered(self, tickers, days, start: str = "00:00", end: str = "23:59") -> np.ndarray:
+        """
+        For aligned arrays of tickers and days: True where the ticker has
+        bars that day with the first bar at or before `end` and the last
+        at or after `start` ('HH:MM').
+        """
+        codes, names = pd.factorize(pd.Series(tickers).astype(str))
+        numbers = _day_numbers(days)
+        out = np.zeros(len(codes), dtype=bool)
+        lo, hi = _minute(start), _minute(end)
+        for code, name in enumerate(names):
+            cov = self.tickers.get(name)
+            if cov is None:
+                continue
+            rows = codes == code
+            has, first, last = cov.lookup(numbers[rows])
+            out[rows] = has & (first <= hi) & (last >= lo)
+        return out
+
+    @classmethod
+    def rebuild(cls, conn) -> "CoverageIndex":
+        """
+        Recompute the index from all stored 1-minute bars and save it.
+        """
+        stats = pd.read_sql(
+            """SELECT ticker, substr(date, 1, 10) AS day,
+                      min(substr(date, 12, 5)) AS first, max(substr(date, 12, 5)) AS last
+               FROM ticker_data GROUP BY ticker, day""",
+            conn,
+        )
+        index = cls()
+        for ticker, group in stats.groupby("ticker", sort=False):
+            numbers = _day_numbers(group["day"])
+            cov = index._ticker(ticker, numbers)
+            i = numbers - cov.start
+            cov.days[i] = True
+            cov.first[i] = [_minute(m) for m in group["first"]]
+            cov.last[i] = [_minute(m) for m in group["last"]]
+        conn.execute("DELETE FROM coverage")
+        index.save(conn)
+        logger.info("Rebuilt coverage index for %d tickers", len(index))
+        return index
@@ -19,3 +19,24 @@ def init_db():
             PRIMARY KEY (ticker, date)
         )
     ''')
+    # coarser bars derived locally from the 1-minute bars in ticker_data;
+    # period uses the MOEX codes (5, 10, 60 minutes; 24 = daily)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS bars (
+            ticker TEXT,
+            period INTEGER,
+            date   DATETIME,
+            open   REAL,
+            high   REAL,
+            low    REAL,
+            close  REAL,
+            volume REAL,
+            PRIMARY KEY (ticker, period, date)
+        ) WITHOUT ROWID
+    ''')
+    # which days of each ticker are stored; see coverage.py
+    from .coverage import CoverageIndex, SCHEMA
+
+    c.execute(SCHEMA)
+    # a database filled before the coverage index was maintained
+    CoverageIndex.load_or_rebuild(c.connection)
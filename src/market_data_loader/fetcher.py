@@ -1,21 +1,38 @@
 # src/market_data_loader/fetcher.py
 import asyncio
 import pickle
-from datetime import date
+from datetime import date, timedelta
 import pandas as pd
-from moexalgo import Ticker, Index
+import instrumentation as metrics
 from .db import get_conn, init_db
-from .config import TICKERS_PKL
+from .config import TICKERS_PKL, DERIVED_PERIODS
+from .resample import materialize
+from .coverage import CoverageIndex
 import logging
 
 logger = logging.getLogger(__name__)
 
+def calendar_days(start: date, end: date) -> list[date]:
+    """
+    Every calendar day from start to end inclusive.
+    """
+    days = []
+    cur = start
+    while cur <= end:
+        days.append(cur)
+        cur += timedelta(days=1)
+    return days
+
+@metrics.timed("market.fetch_one")
 async def fetch_one(ticker: str, day: date, period: int = 1):
+    from moexalgo import Ticker, Index
+
     cls = Index if ticker == "IMOEX" else Ticker
     inst = cls(ticker)
     df = await asyncio.to_thread(
         lambda: inst.candles(start=str(day), end=str(day), period=period)
     )
+    metrics.count("market.requests")
     if df is None or "begin" not in df.columns:
         return []
     df["begin"] = pd.to_datetime(df["begin"])
@@ -33,7 +50,15 @@ async def fetch_one(ticker: str, day: date, period: int = 1):
     ]
     return rows
 
-async def update_all(trading_days: list[date], period: int):
+@metrics.timed("market.update_all")
+async def update_all(trading_days: list[date], periods=DERIVED_PERIODS):
+    """
+    Download 1-minute bars for every ticker and day, then derive the
+    coarser `periods` (MOEX codes) locally for the days that got data.
+    Only 1-minute bars are requested from MOEX whatever `periods` is,
+    and only for days the coverage index does not already have.
+    """
+    periods = [periods] if isinstance(periods, int) else list(periods)
     # load your tickers from pickle
     with open(TICKERS_PKL, "rb") as f:
         tickers = pickle.load(f)
@@ -41,12 +66,19 @@ async def update_all(trading_days: list[date], period: int):
     init_db()
     conn = get_conn()
     cur = conn.cursor()
+    coverage = CoverageIndex.load(conn)
+    today = date.today()
 
     for ticker in tickers:
         total_rows = 0
-        for day in trading_days:
-            rows = await fetch_one(ticker, day, period)
+        loaded = []
+        days = coverage.missing(ticker, trading_days, today)
+        metrics.count("market.days_skipped", len(trading_days) - len(days))
+        for day in days:
+            rows = await fetch_one(ticker, day, 1)
             if not rows:
+                if day < today:
+                    coverage.record_empty(ticker, [day])
                 continue
             cur.executemany(
                 '''INSERT OR IGNORE INTO ticker_data
@@ -54,7 +86,12 @@ async def update_all(trading_days: list[date], period: int):
                    VALUES (?, ?, ?, ?, ?, ?, ?)''',
                 rows
             )
+            coverage.record(ticker, [row[1] for row in rows])
             total_rows += len(rows)
-        logger.info("Inserted %d rows for %s", total_rows, ticker)
+            loaded.append(day)
+            metrics.count("market.rows_inserted", len(rows))
+        coverage.save(conn, [ticker])
+        derived = materialize(ticker, loaded, periods, conn)
+        logger.info("Inserted %d rows for %s, derived %d bars", total_rows, ticker, derived)
     conn.close()
     logger.info("All tickers updated")
@@ -0,0 +1,144 @@
+"""
+Local resampling of stored 1-minute bars into coarser resolutions.
+
+Only 1-minute bars are downloaded (table `ticker_data`); 5/10/60-minute
+and daily bars are derived from them and kept in `bars`, tagged by the
+MOEX period code. Each bar is labelled by the start of its interval,
+like MOEX `begin`, and aggregates open=first, high=max, low=min,
+close=last, volume=sum.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+import instrumentation as metrics
+from .db import get_conn, init_db
+from .config import PERIOD_MINUTES, DERIVED_PERIODS
+
+logger = logging.getLogger(__name__)
+
+_NS_PER_MINUTE = 60 * 10**9
+
+
+def resample(minutes: pd.DataFrame, period: int) -> pd.DataFrame:
+    """
+    minutes: 1-minute bars with ticker, date, open, high, low, close,
+    volume (any order). Returns `period` bars with the same columns.
+    """
+    if period not in PERIOD_MINUTES:
+        raise ValueError(f"unsupported period {period}; use one of {sorted(PERIOD_MINUTES)}")
+    columns = ["ticker", "date", "open", "high", "low", "close", "volume"]
+    if minutes.empty:
+        return pd.DataFrame(columns=columns)
+
+    df = minutes.assign(date=pd.to_datetime(minutes["date"])).sort_values(
+        ["ticker", "date"], kind="stable"
+    )
+    ticker_codes, ticker_names = pd.factorize(df["ticker"])
+    step = PERIOD_MINUTES[period] * _NS_PER_MINUTE
+    bucket = df["date"].to_numpy().astype("datetime64[ns]").astype(np.int64) // step
+
+    # rows are sorted by (ticker, date), so every bar is a contiguous run
+    change = np.r_[True, (np.diff(ticker_codes) != 0) | (np.diff(bucket) != 0)]
+    starts = np.flatnonzero(change)
+    ends = np.r_[starts[1:], len(df)] - 1
+
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    volume = df["volume"].to_numpy(dtype=float)
+    return pd.DataFrame({
+        "ticker": ticker_names[ticker_codes[starts]],
+        "date": pd.to_datetime(bucket[starts] * step),
+        "open": df["open"].to_numpy(dtype=float)[starts],
+        "high": np.maximum.reduceat(high, starts),
+        "low": np.minimum.reduceat(low, starts),
+        "close": df["close"].to_numpy(dtype=float)[ends],
+        "volume": np.add.reduceat(volume, starts),
+    })
+
+
+def _read_minutes(conn, ticker: str, days: list[str]) -> pd.DataFrame:
+    minutes = pd.read_sql(
+        """SELECT ticker, date, open, high, low, close, volume
+           FROM ticker_data WHERE ticker=? AND date BETWEEN ? AND ?""",
+        conn, params=(ticker, f"{days[0]} 00:00:00", f"{days[-1]} 23:59:59"),
+    )
+    return minutes[minutes["date"].str[:10].isin(days)]
+
+
+@metrics.timed("market.materialize")
+def materialize(ticker: str, days: list, periods=DERIVED_PERIODS, conn=None) -> int:
+    """
+    Recompute the derived bars of `ticker` for `days` (dates or
+    'YYYY-MM-DD' strings) from its stored 1-minute bars. Returns the
+    number of bars written.
+    """
+    periods = [p for p in periods if p != 1]
+    days = sorted({str(d)[:10] for d in days})
+    if not (periods and days):
+        return 0
+    own = conn is None
+    conn = conn or get_conn()
+    minutes = _read_minutes(conn, ticker, days)
+    written = 0
+    conn.execute("BEGIN")
+    for period in periods:
+        bars = resample(minutes, period)
+        conn.executemany(
+            '''INSERT OR REPLACE INTO bars
+               (ticker, period, date, open, high, low, close, volume)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+            zip(
+                bars["ticker"], [period] * len(bars),
+                bars["date"].dt.strftime("%Y-%m-%d %H:%M:%S"),
+                bars["open"], bars["high"], bars["low"], bars["close"], bars["volume"],
+            ),
+        )
+        written += len(bars)
+    conn.execute("COMMIT")
+    metrics.count("market.bars_materialized", written)
+    if own:
+        conn.close()
+    return written
+
+
+def missing_days(conn, period: int) -> dict[str, list[str]]:
+    """
+    Days with 1-minute bars but no derived `period` bars, per ticker.
+    """
+    rows = conn.execute(
+        '''SELECT DISTINCT ticker, substr(date, 1, 10) FROM ticker_data
+           EXCEPT
+           SELECT ticker, substr(date, 1, 10) FROM bars WHERE period = ?''',
+        (period,),
+    ).fetchall()
+    out: dict[str, list[str]] = {}
+    for ticker, day in rows:
+        out.setdefault(ticker, []).append(day)
+    return out
+
+
+def materialize_missing(periods=DERIVED_PERIODS) -> int:
+    """
+    Backfill derived bars for every stored day that lacks them and
+    rebuild the coverage index (e.g. for a database filled before either
+    was maintained on load).
+    """
+    from .coverage import CoverageIndex
+
+    init_db()
+    conn = get_conn()
+    CoverageIndex.rebuild(conn)
+    written = 0
+    pending: dict[str, set] = {}
+    for period in periods:
+        if period == 1:
+            continue
+        for ticker, days in missing_days(conn, period).items():
+            pending.setdefault(ticker, set()).update(days)
+    for ticker, days in pending.items():
+        written += materialize(ticker, sorted(days), periods, conn)
+    conn.close()
+    logger.info("Materialized %d derived bars for %d tickers", written, len(pending))
+    return written
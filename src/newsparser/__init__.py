@@ -1 +1,8 @@
-from .parser import run
+"""
+newsparser — FINAM news scraper.
+"""
+from _lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "run": ".parser",
+})
@@ -1,7 +1,5 @@
 import os
 import argparse
-from .parser import run
-from dotenv import load_dotenv
 from .config import WORK_FOLDER
 
 def main():
@@ -15,18 +13,35 @@ def main():
     )
     parser.add_argument(
         '--output', '-o',
-        default='df_news_total_info.xlsx',
-        help='Name of file to save results (Excel with date,title,text,signal…)'
+        default='df_news_total_info.parquet',
+        help='Name of file to save results (Parquet by default, .feather or an explicit .xlsx export)'
+    )
+    parser.add_argument(
+        '--refresh-tickers',
+        action='store_true',
+        help='Re-download the MOEX ticker/shortname reference instead of using the local cache'
+    )
+    parser.add_argument(
+        '--match-text',
+        action='store_true',
+        help='Also tag companies mentioned in article bodies, not only in the short info'
     )
     args = parser.parse_args()
 
+    from .parser import run
+
     if WORK_FOLDER:
         os.makedirs(WORK_FOLDER, exist_ok=True)
         filename = os.path.basename(args.output)
         output_path = os.path.join(WORK_FOLDER, filename)
     else:
         output_path = args.output
-    run(args.source, output_path)
+    run(
+        args.source,
+        output_path,
+        refresh_tickers=args.refresh_tickers,
+        match_text=args.match_text,
+    )
 
 if __name__ == '__main__':
     main()
@@ -1,9 +1,10 @@
-from selenium.webdriver.chrome.options import Options
+import os
 from dotenv import load_dotenv
 
 load_dotenv(dotenv_path=".env.txt")
 
 EXTRA_FILES_FOLDER = os.getenv("EXTRA_FILES_FOLDER", "")
+WORK_FOLDER = os.getenv("WORK_FILES_FOLDER", "")
 
 if EXTRA_FILES_FOLDER:
     os.makedirs(EXTRA_FILES_FOLDER, exist_ok=True)
@@ -12,6 +13,8 @@ def get_chrome_options():
     """
     Возвращает настроенный объект Chrome Options
     """
+    from selenium.webdriver.chrome.options import Options
+
     options = Options()
     options.add_argument('--disable-extensions')
     options.add_argument('--disable-gpu')
@@ -1,22 +1,19 @@
 import json
 import threading
 import asyncio
-import re
 import pandas as pd
-import requests
 import os
 
 from concurrent.futures import ThreadPoolExecutor
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
-from moexalgo import Market
+import instrumentation as metrics
+from dataset_io import write_frame
 from .config import get_chrome_options, EXTRA_FILES_FOLDER
+from .tickers import load_reference, CompanyMatcher, INDEX_ROW
 
 thread_local = threading.local()
 
+@metrics.timed("newsparser.fetch_section")
 def fetch_section(section_url: str):
     """
     Function to fetch articles from a given section URL.
@@ -24,8 +21,14 @@ def fetch_section(section_url: str):
     and then scrapes the titles and links of the articles.
     It returns two lists: one with titles and links, and another with short information about the articles.
     """
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     options = get_chrome_options()
-    driver = webdriver.Chrome(options=options)
+    with metrics.timer("newsparser.chrome_start"):
+        driver = webdriver.Chrome(options=options)
     driver.get(section_url)  
     wait = WebDriverWait(driver, 3)
 
@@ -42,6 +45,7 @@ def fetch_section(section_url: str):
                 (By.XPATH, "//span[@data-id='button-more']")
             ))
             driver.execute_script("arguments[0].click();", load_more)
+            metrics.count("newsparser.load_more_clicks")
             print("Button 'Download more' clicked")
         except Exception:
             print("Button 'Download more' not found or no more articles to load.")
@@ -75,14 +79,22 @@ def get_driver():
     Thread‑local WebDriver.
     """
     if not hasattr(thread_local, 'driver'):
-        thread_local.driver = webdriver.Chrome(options=get_chrome_options())
+        from selenium import webdriver
+
+        with metrics.timer("newsparser.chrome_start"):
+            thread_local.driver = webdriver.Chrome(options=get_chrome_options())
     return thread_local.driver
 
+@metrics.timed("newsparser.get_data")
 def get_data(title, link):
     """
     Function to scrape data from a given article link.
     It uses Selenium to load the page and extract the date and text of the article.
     """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     driver = get_driver()
     driver.get(link)
     try:
@@ -92,8 +104,10 @@ def get_data(title, link):
         text = WebDriverWait(driver, 3).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-id='text']"))
         ).text
+        metrics.count("newsparser.pages_fetched")
     except Exception as e:
         print(f"Error: {e}")
+        metrics.count("newsparser.page_errors")
         date, text = None, ""
     finally:
         driver.quit()
@@ -136,62 +150,82 @@ async def scrape_all(titles_links):
 
     return existing
 
-def extract_tickers(ticker_string: str):
+def collect_titles(source: str):
     """
-    Extract tickers from a string using regex."""
-    return re.findall(
-        r'([А-Яа-яA-Za-z_()]+(?:\s[А-Яа-яA-Za-z_()]+)*)\s[-+]?\d+(?:,\d+)?%',
-        ticker_string
-    )
-
-def run(source: str, output_path: str):
-    """
-    Pipeline to run the entire scraping process.
-    It fetches the articles from the given source, scrapes their data,
-    processes the data, and saves it to an Excel file.
+    Titles/links to scrape and the short info of the articles, from a
+    FINAM section URL (via Selenium) or a JSON list of titles/links.
     """
     if source.startswith(('http://', 'https://')) and '/section/' in source:
-        titles_links, short_info = fetch_section(source)
-    else:
-        if source.startswith(('http://', 'https://')):
-            resp = requests.get(source)
-            resp.raise_for_status()
-            titles_links = resp.json()
-        else:
-            with open(source, encoding='utf-8') as f:
-                titles_links = json.load(f)
+        return fetch_section(source)
+    if source.startswith(('http://', 'https://')):
+        import requests
 
-        path_unique_short = os.path.join(EXTRA_FILES_FOLDER, 'article_short_info_main.json')
-        with open(path_unique_short, encoding='utf-8') as f:
-            short_info = json.load(f)
-
-    existing = asyncio.run(scrape_all(titles_links))
+        resp = requests.get(source)
+        resp.raise_for_status()
+        titles_links = resp.json()
+    else:
+        with open(source, encoding='utf-8') as f:
+            titles_links = json.load(f)
 
+    path_unique_short = os.path.join(EXTRA_FILES_FOLDER, 'article_short_info_main.json')
+    with open(path_unique_short, encoding='utf-8') as f:
+        short_info = json.load(f)
+    return titles_links, short_info
+
+def build_frame(
+    existing: list[dict],
+    short_info: list,
+    refresh_tickers: bool = False,
+    match_text: bool = False,
+) -> pd.DataFrame:
+    """
+    Join scraped articles with the companies tagged from their short info
+    (and, with `match_text`, from their bodies).
+    """
     df_news = pd.DataFrame(existing).drop_duplicates(subset=['title'])
 
-    processed = []
+    matcher = CompanyMatcher(load_reference(refresh=refresh_tickers))
+    texts = dict(zip(df_news['title'], df_news['text'])) if match_text else {}
+
+    tagged = []
     for row in short_info:
         row = row[1:]
+        title, short = row[0], row[1] if len(row) > 1 else None
         if len(row) == 3:
-            row[2] = extract_tickers(row[2])
+            companies = matcher.find(row[2])
         else:
-            row.append(['IMOEX'])
-        processed.append(row)
-
-    df_si = pd.DataFrame(processed, columns=['title', 'short_info', 'shortname'])
-    df_expl = df_si.explode('shortname', ignore_index=True)
-
-    all_stocks = Market('shares').tickers()[['ticker', 'shortname']]
-    all_stocks.loc[len(all_stocks)] = {'ticker': 'IMOEX', 'shortname': 'IMOEX'}
-
-    df_merge1 = pd.merge(
-        df_expl, all_stocks,
-        on='shortname', how='left'
-    ).dropna(subset=['ticker'])
-
-    df_total = pd.merge(
-        df_merge1, df_news,
+            companies = [(INDEX_ROW['ticker'], INDEX_ROW['shortname'])]
+        if match_text:
+            companies += [c for c in matcher.find(texts.get(title)) if c not in companies]
+        for ticker, shortname in companies:
+            tagged.append({
+                'title': title,
+                'short_info': short,
+                'shortname': shortname,
+                'ticker': ticker,
+            })
+
+    df_tagged = pd.DataFrame(tagged, columns=['title', 'short_info', 'shortname', 'ticker'])
+    return pd.merge(
+        df_tagged, df_news,
         on='title', how='left'
     )
 
-    df_total.to_excel(output_path, index=False)
+@metrics.timed("newsparser.run")
+def run(
+    source: str,
+    output_path: str,
+    refresh_tickers: bool = False,
+    match_text: bool = False,
+):
+    """
+    Pipeline to run the entire scraping process.
+    It fetches the articles from the given source, scrapes their data,
+    processes the data, and saves it as a dataset (Parquet by default).
+    Companies are tagged with the cached ticker reference; with
+    `match_text` mentions in the article bodies are tagged as well.
+    """
+    titles_links, short_info = collect_titles(source)
+    existing = asyncio.run(scrape_all(titles_links))
+    df_total = build_frame(existing, short_info, refresh_tickers, match_text)
+    write_frame(df_total, output_path)
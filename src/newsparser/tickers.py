@@ -0,0 +1,137 @@
+"""
+Local ticker/shortname reference and a multi-pattern company matcher.
+
+The reference is fetched from MOEX once and cached as versioned JSON in
+EXTRA_FILES_FOLDER, so tagging news works offline. `CompanyMatcher` is an
+Aho-Corasick automaton over all shortnames that finds every company
+mention in a single pass over the text.
+"""
+import os
+import json
+import logging
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+
+from .config import EXTRA_FILES_FOLDER
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_VERSION = 1
+REFERENCE_PATH = os.path.join(EXTRA_FILES_FOLDER, 'tickers_reference.json')
+INDEX_ROW = {'ticker': 'IMOEX', 'shortname': 'IMOEX'}
+
+
+def fetch_reference() -> pd.DataFrame:
+    """
+    Download ticker/shortname pairs of all MOEX shares.
+    """
+    from moexalgo import Market
+
+    ref = Market('shares').tickers()[['ticker', 'shortname']]
+    ref.loc[len(ref)] = INDEX_ROW
+    return ref.reset_index(drop=True)
+
+
+def load_reference(refresh: bool = False, path: str = REFERENCE_PATH) -> pd.DataFrame:
+    """
+    Cached ticker reference; hits the network only when `refresh` is set,
+    the cache is missing or it was written by another format version.
+    """
+    if not refresh:
+        try:
+            with open(path, encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') == REFERENCE_VERSION:
+                return pd.DataFrame(cached['rows'], columns=['ticker', 'shortname'])
+            logger.info("Ticker reference %s has old version, refreshing", path)
+        except FileNotFoundError:
+            logger.info("No ticker reference at %s, fetching from MOEX", path)
+
+    ref = fetch_reference()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': REFERENCE_VERSION,
+            'fetched_at': datetime.now().isoformat(timespec='seconds'),
+            'rows': ref.to_dict(orient='records'),
+        }, f, ensure_ascii=False, indent=4)
+    return ref
+
+
+class CompanyMatcher:
+    """
+    Aho-Corasick matcher over company shortnames.
+    `find` returns leftmost-longest, non-overlapping mentions that are
+    not glued to letters or digits on either side.
+    """
+
+    def __init__(self, reference: pd.DataFrame):
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.out: list[list[tuple[int, str, str]]] = [[]]
+
+        for ticker, name in reference[['ticker', 'shortname']].itertuples(index=False):
+            if isinstance(name, str) and name:
+                self._add(name, ticker)
+        self._build()
+
+    def _add(self, name: str, ticker: str):
+        node = 0
+        for ch in name:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            node = nxt
+        self.out[node].append((len(name), name, ticker))
+
+    def _build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                cand = self.goto[f].get(ch, 0)
+                self.fail[nxt] = cand if cand != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def _scan(self, text: str):
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for length, name, ticker in self.out[node]:
+                yield i + 1 - length, i + 1, name, ticker
+
+    def find(self, text: str) -> list[tuple[str, str]]:
+        """
+        Unique (ticker, shortname) pairs mentioned in `text`, in order.
+        """
+        if not isinstance(text, str) or not text:
+            return []
+        hits = []
+        for start, end, name, ticker in self._scan(text):
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end < len(text) and text[end].isalnum():
+                continue
+            hits.append((start, -(end - start), name, ticker))
+        hits.sort()
+
+        found, seen, pos = [], set(), 0
+        for start, neg_len, name, ticker in hits:
+            if start < pos:
+                continue
+            pos = start - neg_len
+            if (ticker, name) not in seen:
+                seen.add((ticker, name))
+                found.append((ticker, name))
+        return found
@@ -0,0 +1,13 @@
+"""
+orchestrator — runs the scrape → label → backtest pipeline as a DAG
+with content-hashed stage caching, and scrapes/labels through a shared
+job queue.
+"""
+from _lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "Stage": ".dag",
+    "Pipeline": ".dag",
+    "build_pipeline": ".stages",
+    "JobQueue": ".jobs",
+})
@@ -0,0 +1,64 @@
+import argparse
+import logging
+
+from .stages import build_pipeline
+from .config import SCRAPE_TTL
+
+logging.basicConfig(
+    format="%(asctime)s %(levelname)s %(name)s │ %(message)s",
+    level=logging.INFO,
+)
+logger = logging.getLogger(__name__)
+
+def main():
+    p = argparse.ArgumentParser(
+        description="Run the scrape → label → backtest pipeline, skipping up-to-date stages"
+    )
+    p.add_argument("--source", "-s", required=True,
+                   help="FINAM news section URL or JSON file with titles/links")
+    p.add_argument("--start", required=True, help="YYYY-MM-DD")
+    p.add_argument("--end", required=True, help="YYYY-MM-DD")
+    p.add_argument("--period", "-p", type=int, nargs="*", default=None,
+                   help="Bar periods to derive from the 1-minute market data "
+                        "(MOEX codes 5, 10, 60, 24; default all)")
+    p.add_argument("--model", "-m", default="gpt-4o-2024-08-06",
+                   help="LLM model for labeling")
+    p.add_argument("--pack", action="store_true",
+                   help="Pack several tickers of the same day into one LLM request")
+    p.add_argument("--dedup-threshold", type=float, default=None,
+                   help="Similarity at or above which articles count as near-duplicates")
+    p.add_argument("--scrape-ttl", type=float, default=SCRAPE_TTL,
+                   help="Seconds after which the scrape is rerun for the same source "
+                        "(0 = only when the source changes)")
+    p.add_argument("--strategy", default="gpt", help="Backtest strategy")
+    p.add_argument("--force", "-f", nargs="*", default=[],
+                   help="Stages to rerun even if up to date")
+    p.add_argument("--workers", "-w", type=int, default=2,
+                   help="How many independent stages may run at once")
+    p.add_argument("--dry-run", action="store_true",
+                   help="Only list stages that are currently stale")
+    args = p.parse_args()
+
+    pipeline = build_pipeline(
+        args.source, args.start, args.end,
+        periods=args.period, model=args.model, pack=args.pack,
+        strategy=args.strategy, dedup_threshold=args.dedup_threshold,
+        scrape_ttl=args.scrape_ttl,
+    )
+    unknown = set(args.force) - set(pipeline.stages)
+    if unknown:
+        p.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    if args.dry_run:
+        stale = pipeline.stale()
+        logger.info("Stale stages: %s", ", ".join(stale) or "none")
+        return
+
+    status = pipeline.run(force=set(args.force), max_workers=args.workers)
+    for name, result in status.items():
+        logger.info("%-10s %s", name, result)
+    if any(result in ("failed", "blocked") for result in status.values()):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path=".env.txt")
+
+WORK_FOLDER = os.getenv("WORK_FILES_FOLDER", "")
+if WORK_FOLDER:
+    os.makedirs(WORK_FOLDER, exist_ok=True)
+
+# where stage fingerprints and output digests are remembered between runs
+STATE_PATH = os.path.join(WORK_FOLDER, ".pipeline_state.json")
+
+# a scrape older than this many seconds is stale even if the source is the
+# same (news sections keep growing); 0 rescrapes only when the source changes
+SCRAPE_TTL = float(os.getenv("SCRAPE_TTL", "3600"))
+
+# stage hand-offs
+NEWS_PATH = os.path.join(WORK_FOLDER, "news.parquet")
+NON_TRADING_PATH = os.path.join(WORK_FOLDER, "news_non_trading.parquet")
+DEDUP_PATH = os.path.join(WORK_FOLDER, "news_dedup.parquet")
+LABELS_PATH = os.path.join(WORK_FOLDER, "labels.parquet")
+RETURNS_PATH = os.path.join(WORK_FOLDER, "returns.parquet")
+# summary of the stored bars; stands in for market_data.db, which the
+# backtest may write to (coverage index) without changing any bar
+MARKET_MANIFEST_PATH = os.path.join(WORK_FOLDER, "market_manifest.json")
+
+# live (incremental) mode
+LIVE_STATE_PATH = os.path.join(WORK_FOLDER, "live_state.json")
+LIVE_NEWS_PATH = os.path.join(WORK_FOLDER, "live_news.parquet")
+# one Parquet part per poll; read the folder as one dataset
+LIVE_SIGNALS_DIR = os.path.join(WORK_FOLDER, "live_signals")
+
+# job queue shared by scrape/label workers (may sit on a shared filesystem)
+QUEUE_PATH = os.getenv("QUEUE_PATH", os.path.join(WORK_FOLDER, "jobs.db"))
@@ -0,0 +1,183 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import instrumentation as metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline step: `func(**params)` reads `inputs` and writes `outputs`.
+    `deps` are names of stages that must finish first.
+    """
+    name: str
+    func: Callable[..., None]
+    inputs: list[str] = field(default_factory=list)
+    outputs: list[str] = field(default_factory=list)
+    deps: list[str] = field(default_factory=list)
+    params: dict = field(default_factory=dict)
+
+
+class Pipeline:
+    """
+    Executes stages in dependency order, running independent branches
+    concurrently. A stage is skipped when its fingerprint (params + input
+    contents) matches the last successful run and its outputs are unchanged.
+    """
+
+    def __init__(self, stages: list[Stage], state_path: str):
+        self.stages = {s.name: s for s in stages}
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._check_graph()
+        self.state = self._load_state()
+
+    def _check_graph(self):
+        for stage in self.stages.values():
+            unknown = set(stage.deps) - set(self.stages)
+            if unknown:
+                raise ValueError(f"Stage {stage.name!r} depends on unknown {sorted(unknown)}")
+        visiting, visited = set(), set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through stage {name!r}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            state = {}
+        state.setdefault("stages", {})
+        state.setdefault("files", {})
+        return state
+
+    def _save_state(self):
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.state_path)
+
+    def digest(self, path: str) -> str | None:
+        """
+        sha256 of a file's contents; reuses the cached digest while the
+        file's size and mtime are unchanged. None if the file is missing.
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        stamp = [st.st_size, st.st_mtime_ns]
+        with self._lock:
+            cached = self.state["files"].get(path)
+        if cached and cached["stamp"] == stamp:
+            return cached["sha256"]
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            self.state["files"][path] = {"stamp": stamp, "sha256": digest}
+        return digest
+
+    def fingerprint(self, stage: Stage) -> str:
+        payload = {
+            "params": stage.params,
+            "inputs": {path: self.digest(path) for path in stage.inputs},
+        }
+        raw = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def is_fresh(self, stage: Stage, key: str | None = None) -> bool:
+        with self._lock:
+            record = self.state["stages"].get(stage.name)
+        if not record or record["key"] != (key or self.fingerprint(stage)):
+            return False
+        return all(
+            self.digest(path) == record["outputs"].get(path)
+            for path in stage.outputs
+        )
+
+    def stale(self) -> list[str]:
+        """
+        Stages that are out of date right now (downstream stages may
+        become stale once these rerun).
+        """
+        return [name for name, stage in self.stages.items() if not self.is_fresh(stage)]
+
+    def _run_stage(self, stage: Stage, force: bool) -> str:
+        key = self.fingerprint(stage)
+        if not force and self.is_fresh(stage, key):
+            logger.info("Stage %s is up to date, skipping", stage.name)
+            return "skipped"
+
+        logger.info("Running stage %s", stage.name)
+        with metrics.timer(f"pipeline.{stage.name}"):
+            stage.func(**stage.params)
+        outputs = {path: self.digest(path) for path in stage.outputs}
+        missing = [path for path, d in outputs.items() if d is None]
+        if missing:
+            raise RuntimeError(f"Stage {stage.name!r} did not write {missing}")
+        with self._lock:
+            self.state["stages"][stage.name] = {"key": key, "outputs": outputs}
+            self._save_state()
+        logger.info("Stage %s finished", stage.name)
+        return "ran"
+
+    def run(self, force: set[str] | None = None, max_workers: int = 2) -> dict[str, str]:
+        """
+        Run every stage whose inputs changed (or that is in `force`).
+        Returns {stage: 'ran' | 'skipped' | 'failed' | 'blocked'}.
+        """
+        force = force or set()
+        pending = set(self.stages)
+        status: dict[str, str] = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            running = {}
+            while pending or running:
+                for name in sorted(pending):
+                    deps = self.stages[name].deps
+                    if not all(d in status for d in deps):
+                        continue
+                    pending.discard(name)
+                    if any(status[d] in ("failed", "blocked") for d in deps):
+                        status[name] = "blocked"
+                        continue
+                    running[pool.submit(self._run_stage, self.stages[name], name in force)] = name
+
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    name = running.pop(fut)
+                    try:
+                        status[name] = fut.result()
+                    except Exception:
+                        logger.exception("Stage %s failed", name)
+                        status[name] = "failed"
+
+        with self._lock:
+            self._save_state()
+        return status
@@ -0,0 +1,298 @@
+"""
+File-backed job queue with visibility-timeout leases.
+
+Jobs live in one SQLite file that any number of worker processes, on
+one host or several hosts sharing the file, can lease from. A leased job
+is invisible to other workers until its lease runs out; a worker that
+dies simply lets the lease expire and the job is handed out again.
+Failed jobs are retried with exponential backoff and moved to the dead
+letter state ('dead') once they run out of attempts.
+
+The default rollback journal is kept on purpose: WAL mode needs shared
+memory and does not work when hosts share the file over a network
+filesystem.
+"""
+import os
+import json
+import time
+import socket
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+READY, LEASED, DONE, DEAD = "ready", "leased", "done", "dead"
+STATUSES = (READY, LEASED, DONE, DEAD)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind         TEXT NOT NULL,
+    batch        TEXT NOT NULL,
+    key          TEXT,
+    payload      TEXT NOT NULL,
+    status       TEXT NOT NULL DEFAULT 'ready',
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_until  REAL,
+    worker       TEXT,
+    result       TEXT,
+    error        TEXT,
+    created      REAL NOT NULL,
+    updated      REAL NOT NULL,
+    UNIQUE (kind, batch, key)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (kind, status, available_at);
+CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch, kind, status);
+CREATE TABLE IF NOT EXISTS batches (
+    batch   TEXT PRIMARY KEY,
+    meta    TEXT,
+    created REAL NOT NULL
+);
+"""
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    batch: str
+    key: str | None
+    payload: dict
+    attempts: int
+    max_attempts: int
+    worker: str
+
+
+class JobQueue:
+    def __init__(
+        self,
+        path: str,
+        max_attempts: int = 5,
+        retry_delay: float = 5.0,
+        timeout: float = 60.0,
+    ):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _write(self):
+        # serialize writers across processes/hosts for the whole claim
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    # producers
+
+    def enqueue(
+        self,
+        kind: str,
+        payloads: list[dict],
+        batch: str,
+        keys: list[str] | None = None,
+        max_attempts: int | None = None,
+    ) -> int:
+        """
+        Add jobs; a (kind, batch, key) that is already queued is skipped,
+        so re-running a producer does not duplicate work. Returns the
+        number of jobs added.
+        """
+        now = time.time()
+        keys = keys or [None] * len(payloads)
+        rows = [
+            (kind, batch, key, json.dumps(payload, ensure_ascii=False, default=str),
+             max_attempts or self.max_attempts, now, now, now)
+            for payload, key in zip(payloads, keys)
+        ]
+        self._write()
+        before = self.conn.total_changes
+        self.conn.executemany(
+            """INSERT OR IGNORE INTO jobs
+               (kind, batch, key, payload, max_attempts, available_at, created, updated)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
+        added = self.conn.total_changes - before
+        self.conn.execute("COMMIT")
+        return added
+
+    def set_meta(self, batch: str, meta: dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO batches (batch, meta, created) VALUES (?, ?, ?)",
+            (batch, json.dumps(meta, ensure_ascii=False, default=str), time.time()),
+        )
+
+    def meta(self, batch: str) -> dict:
+        row = self.conn.execute("SELECT meta FROM batches WHERE batch=?", (batch,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else {}
+
+    # workers
+
+    def lease(
+        self,
+        kinds: list[str],
+        visibility: float,
+        worker: str | None = None,
+    ) -> Job | None:
+        """
+        Claim the oldest available job of `kinds` for `visibility`
+        seconds. Jobs whose lease expired are available again, or dead if
+        that was their last attempt.
+        """
+        worker = worker or worker_name()
+        now = time.time()
+        marks = ",".join("?" * len(kinds))
+        self._write()
+        try:
+            self.conn.execute(
+                f"""UPDATE jobs SET status='dead', error='lease expired on last attempt',
+                        updated=?
+                    WHERE kind IN ({marks}) AND status='leased' AND lease_until < ?
+                          AND attempts >= max_attempts""",
+                (now, *kinds, now),
+            )
+            row = self.conn.execute(
+                f"""SELECT id, kind, batch, key, payload, attempts, max_attempts FROM jobs
+                    WHERE kind IN ({marks})
+                      AND ((status='ready' AND available_at <= ?)
+                           OR (status='leased' AND lease_until < ?))
+                    ORDER BY id LIMIT 1""",
+                (*kinds, now, now),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                """UPDATE jobs SET status='leased', attempts=attempts+1,
+                       lease_until=?, worker=?, updated=? WHERE id=?""",
+                (now + visibility, worker, now, row[0]),
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        job_id, kind, batch, key, payload, attempts, max_attempts = row
+        return Job(job_id, kind, batch, key, json.loads(payload), attempts + 1, max_attempts, worker)
+
+    def extend(self, job: Job, visibility: float) -> bool:
+        """
+        Heartbeat for long jobs; False if the lease was lost meanwhile.
+        """
+        cur = self.conn.execute(
+            """UPDATE jobs SET lease_until=?, updated=?
+               WHERE id=? AND status='leased' AND worker=?""",
+            (time.time() + visibility, time.time(), job.id, job.worker),
+        )
+        return cur.rowcount == 1
+
+    @contextmanager
+    def heartbeat(self, job: Job, visibility: float, interval: float | None = None):
+        """
+        Extend the lease of `job` every `interval` seconds (a third of
+        `visibility` by default) while the block runs, so a long job is
+        not handed to another worker. The beats use their own connection.
+        """
+        interval = interval or visibility / 3
+        stop = threading.Event()
+
+        def beat():
+            queue = JobQueue(self.path)
+            try:
+                while not stop.wait(interval):
+                    if not queue.extend(job, visibility):
+                        logger.warning("Job %d lost its lease while running", job.id)
+                        return
+            finally:
+                queue.close()
+
+        thread = threading.Thread(target=beat, name=f"heartbeat-{job.id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def complete(self, job: Job, result) -> bool:
+        """
+        Store the result. Ignored (False) if the lease expired and the job
+        was handed to another worker in the meantime.
+        """
+        cur = self.conn.execute(
+            """UPDATE jobs SET status='done', result=?, error=NULL, lease_until=NULL, updated=?
+               WHERE id=? AND status='leased' AND worker=?""",
+            (json.dumps(result, ensure_ascii=False, default=str), time.time(), job.id, job.worker),
+        )
+        return cur.rowcount == 1
+
+    def fail(self, job: Job, error: str) -> str:
+        """
+        Schedule a retry with exponential backoff, or dead-letter the job
+        after its last attempt. Returns the new status.
+        """
+        status = DEAD if job.attempts >= job.max_attempts else READY
+        delay = self.retry_delay * 2 ** (job.attempts - 1)
+        self.conn.execute(
+            """UPDATE jobs SET status=?, error=?, available_at=?, lease_until=NULL, updated=?
+               WHERE id=? AND status='leased' AND worker=?""",
+            (status, error, time.time() + delay, time.time(), job.id, job.worker),
+        )
+        return status
+
+    # reporting and maintenance
+
+    def progress(self, batch: str | None = None) -> dict[tuple[str, str], dict[str, int]]:
+        """
+        {(batch, kind): {status: count}} for one batch or all of them.
+        """
+        sql = "SELECT batch, kind, status, count(*) FROM jobs"
+        params: tuple = ()
+        if batch is not None:
+            sql += " WHERE batch=?"
+            params = (batch,)
+        out: dict = {}
+        for b, kind, status, n in self.conn.execute(sql + " GROUP BY batch, kind, status", params):
+            out.setdefault((b, kind), dict.fromkeys(STATUSES, 0))[status] = n
+        return out
+
+    def results(self, batch: str, kind: str) -> list[tuple[str | None, dict, str, object]]:
+        """
+        (key, payload, status, result or error) of every job in a batch,
+        in enqueue order.
+        """
+        rows = self.conn.execute(
+            """SELECT key, payload, status, result, error FROM jobs
+               WHERE batch=? AND kind=? ORDER BY id""",
+            (batch, kind),
+        ).fetchall()
+        return [
+            (key, json.loads(payload), status,
+             json.loads(result) if status == DONE else error)
+            for key, payload, status, result, error in rows
+        ]
+
+    def requeue_dead(self, batch: str | None = None, kind: str | None = None) -> int:
+        """
+        Give dead-lettered jobs a fresh set of attempts.
+        """
+        sql = """UPDATE jobs SET status='ready', attempts=0, available_at=?, updated=?
+                 WHERE status='dead'"""
+        params: list = [time.time(), time.time()]
+        if batch is not None:
+            sql += " AND batch=?"
+            params.append(batch)
+        if kind is not None:
+            sql += " AND kind=?"
+            params.append(kind)
+        return self.conn.execute(sql, params).rowcount
@@ -0,0 +1,251 @@
+"""
+Live (incremental) signal mode.
+
+Each poll lists the news source, scrapes only articles not seen before
+and maps them to the next session with the trading calendar. Every
+(ticker, session) that got new articles is labeled again from all of its
+articles, as the backtest labels it once, and its next-open position is
+replaced. Positions whose session has closed are settled: their returns
+are folded into a persisted `RunningMetrics`, so cumulative return, peak
+and drawdown are updated in O(new rows) instead of recomputing the whole
+history.
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+from datetime import timedelta
+
+import pandas as pd
+
+from dataset_io import read_frame, write_frame
+from .config import LIVE_STATE_PATH, LIVE_NEWS_PATH, LIVE_SIGNALS_DIR
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_LOOKBACK_DAYS = 30
+# seen titles are remembered this long; older articles have left the section
+SEEN_LOOKBACK_DAYS = CALENDAR_LOOKBACK_DAYS
+
+
+class LiveState:
+    """
+    Seen article titles (with when they were first seen), open positions
+    and portfolio state, persisted as JSON; the articles of the open
+    positions are kept next to it as Parquet.
+    """
+
+    def __init__(self, path: str = LIVE_STATE_PATH):
+        from portfolio_backtest.performance import RunningMetrics
+
+        self.path = path
+        try:
+            with open(path, encoding="utf-8") as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            raw = {}
+        seen = raw.get("seen", {})
+        if isinstance(seen, list):  # state written before seen times were kept
+            seen = dict.fromkeys(seen, pd.Timestamp.now().isoformat(timespec="seconds"))
+        self.seen: dict[str, str] = seen
+        self.positions: list[dict] = raw.get("positions", [])
+        self.portfolio = RunningMetrics(**raw.get("portfolio", {}))
+        self.news_path = os.path.splitext(path)[0] + "_news.parquet"
+        self.news = read_frame(self.news_path) if os.path.exists(self.news_path) else pd.DataFrame()
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "seen": self.seen,
+                "positions": self.positions,
+                "portfolio": self.portfolio.to_dict(),
+            }, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        if not self.news.empty:
+            write_frame(self.news, self.news_path)
+        elif os.path.exists(self.news_path):
+            os.remove(self.news_path)
+
+    def mark_seen(self, titles, now: pd.Timestamp):
+        stamp = now.isoformat(timespec="seconds")
+        for title in titles:
+            self.seen.setdefault(str(title), stamp)
+
+    def trim_seen(self, now: pd.Timestamp, days: int = SEEN_LOOKBACK_DAYS):
+        cutoff = (now - timedelta(days=days)).isoformat(timespec="seconds")
+        self.seen = {title: at for title, at in self.seen.items() if at >= cutoff}
+
+
+def trading_calendar(now: pd.Timestamp) -> pd.Series:
+    """
+    Recent MOEX trading days plus business days ahead of the last known one.
+    """
+    from portfolio_backtest.utils import trading_days_index, extend_trading_days
+
+    start = (now - timedelta(days=CALENDAR_LOOKBACK_DAYS)).date()
+    days = pd.to_datetime(trading_days_index(str(start), str(now.date())))
+    return extend_trading_days(days.reset_index(drop=True))
+
+
+def load_news(source: str, seen) -> pd.DataFrame:
+    """
+    Articles of `source` whose titles are not in `seen`. A FINAM section
+    URL is listed first and only the new articles are scraped (and kept
+    in LIVE_NEWS_PATH); otherwise `source` is a dataset written by
+    news-parser.
+    """
+    if not source.startswith(("http://", "https://")):
+        news = read_frame(source)
+        return news[~news["title"].astype(str).isin(seen)]
+
+    from newsparser.parser import collect_titles, scrape_all, build_frame
+
+    titles_links, short_info = collect_titles(source)
+    fresh = [item for item in titles_links if item["title"] not in seen]
+    logger.info("%d of %d listed articles are new", len(fresh), len(titles_links))
+    if not fresh:
+        return pd.DataFrame(columns=["title", "short_info", "shortname", "ticker", "link", "date", "text"])
+    existing = asyncio.run(scrape_all(fresh))
+    news = build_frame(existing, short_info)
+    news = news[news["title"].isin({item["title"] for item in fresh})]
+    write_frame(news, LIVE_NEWS_PATH)
+    return news
+
+
+def _sessions(df: pd.DataFrame) -> list[tuple[str, str]]:
+    """
+    (ticker, trading date) of every article row.
+    """
+    return list(zip(df["ticker"].astype(str), df["trading_time"].dt.date.astype(str)))
+
+
+def _append_signals(signals: pd.DataFrame, now: pd.Timestamp):
+    # a new part per poll instead of rewriting the whole history
+    os.makedirs(LIVE_SIGNALS_DIR, exist_ok=True)
+    write_frame(signals, os.path.join(LIVE_SIGNALS_DIR, f"{now:%Y%m%dT%H%M%S}.parquet"))
+
+
+def poll_once(
+    state: LiveState,
+    source: str,
+    calendar: pd.Series,
+    now: pd.Timestamp | None = None,
+    model: str = "gpt-4o-2024-08-06",
+    pack: bool = False,
+    structured: bool = False,
+    include_index: bool = True,
+    load_market: bool = False,
+) -> dict:
+    """
+    Label unseen news into next-open positions and settle positions whose
+    session has closed. Returns a short summary of what changed.
+    """
+    from chatgpt_news_label import label_frame
+    from portfolio_backtest import PortfolioReturn
+    from portfolio_backtest.config import TRADING_END
+
+    now = now or pd.Timestamp.now()
+    pr = PortfolioReturn(None, None, trading_days=calendar)
+    summary = {"new_articles": 0, "labeled": 0, "settled": 0}
+
+    state.trim_seen(now)
+    new = load_news(source, state.seen)
+    # pages that failed to load stay unseen and are retried next poll
+    new = new[new["date"].notna()]
+    summary["new_articles"] = len(new)
+    if not new.empty:
+        _, non_trading = pr.separate(new.copy())
+        # articles mapped to sessions that already opened are only marked seen
+        upcoming = non_trading[non_trading["trading_time"] > now]
+        if not upcoming.empty:
+            articles = upcoming if state.news.empty else pd.concat(
+                [state.news, upcoming], ignore_index=True
+            ).drop_duplicates(subset=["title", "ticker"], keep="last")
+            touched = set(_sessions(upcoming))
+            group = articles[[s in touched for s in _sessions(articles)]]
+            labeled = label_frame(group, model=model, pack=pack, structured=structured)
+            labeled = labeled.rename(columns={"date_only_trading": "trading_date"})
+            labeled["trading_date"] = labeled["trading_date"].astype(str)
+            labeled["ticker"] = labeled["ticker"].astype(str)
+            state.positions = [
+                p for p in state.positions if (p["ticker"], p["trading_date"]) not in touched
+            ] + labeled.to_dict(orient="records")
+            state.news = articles
+            _append_signals(labeled.assign(labeled_at=now), now)
+            summary["labeled"] = len(labeled)
+            logger.info("New signals:\n%s", labeled[["ticker", "trading_date", "signal"]])
+        state.mark_seen(new["title"], now)
+
+    closes = {
+        p["trading_date"]: pd.Timestamp(f"{p['trading_date']} {TRADING_END}")
+        for p in state.positions
+    }
+    due = [p for p in state.positions if closes[p["trading_date"]] <= now]
+    if due:
+        if load_market:
+            from market_data_loader.fetcher import update_all
+
+            days = sorted({pd.Timestamp(p["trading_date"]).date() for p in due})
+            asyncio.run(update_all(days, 1))
+
+        returns = pr.calculate_return(
+            pd.DataFrame(due), include_index=include_index, on_uncovered="flag"
+        )
+        # sessions are folded into the portfolio in date order, so nothing
+        # from the first session still lacking market data on is settled;
+        # those positions wait for the data to arrive
+        wait_from = None
+        if not returns.empty and not returns["covered"].astype(bool).all():
+            wait_from = returns.loc[~returns["covered"].astype(bool), "news_time"].min()
+            returns = returns[returns["news_time"] < wait_from]
+            logger.warning("No market data yet for %s; positions from then on stay open", wait_from.date())
+        if not returns.empty:
+            daily = pr.calculate_self_financing_cum_return(returns, with_metrics=False)
+            for day, ret in daily.sort_values("news_time")[["news_time", "daily_ret"]].itertuples(index=False):
+                state.portfolio.update(day, ret)
+
+        def is_open(p):
+            return closes[p["trading_date"]] > now or (
+                wait_from is not None and pd.Timestamp(p["trading_date"]) >= wait_from
+            )
+
+        state.positions = [p for p in state.positions if is_open(p)]
+        summary["settled"] = sum(not is_open(p) for p in due)
+        if not state.news.empty:
+            open_sessions = {(p["ticker"], p["trading_date"]) for p in state.positions}
+            state.news = state.news[[s in open_sessions for s in _sessions(state.news)]]
+        logger.info("Portfolio: %s", state.portfolio.metrics())
+
+    state.save()
+    return summary
+
+
+def run_live(
+    source: str,
+    interval: float = 300,
+    once: bool = False,
+    state_path: str = LIVE_STATE_PATH,
+    **kwargs,
+):
+    """
+    Poll `source` every `interval` seconds until interrupted.
+    The trading calendar is refreshed once per day.
+    """
+    state = LiveState(state_path)
+    calendar, calendar_day = None, None
+    while True:
+        now = pd.Timestamp.now()
+        if calendar_day != now.date():
+            calendar, calendar_day = trading_calendar(now), now.date()
+        try:
+            summary = poll_once(state, source, calendar, now=now, **kwargs)
+            logger.info("Poll at %s: %s", now.strftime("%Y-%m-%d %H:%M"), summary)
+        except Exception:
+            if once:
+                raise
+            logger.exception("Poll failed, retrying in %ss", interval)
+        if once:
+            return
+        time.sleep(interval)
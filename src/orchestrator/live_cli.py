@@ -0,0 +1,45 @@
+import argparse
+import logging
+
+logging.basicConfig(
+    format="%(asctime)s %(levelname)s %(name)s │ %(message)s",
+    level=logging.INFO,
+)
+
+def main():
+    p = argparse.ArgumentParser(
+        description="Incrementally label new news into next-open signals and update portfolio state"
+    )
+    p.add_argument("--source", "-s", required=True,
+                   help="FINAM news section URL or dataset written by news-parser")
+    p.add_argument("--interval", "-n", type=float, default=300,
+                   help="Seconds between polls")
+    p.add_argument("--once", action="store_true", help="Poll once and exit")
+    p.add_argument("--model", "-m", default="gpt-4o-2024-08-06",
+                   help="LLM model for labeling")
+    p.add_argument("--pack", action="store_true",
+                   help="Pack several tickers of the same day into one LLM request")
+    p.add_argument("--structured", action="store_true",
+                   help="Request structured (JSON schema) answers")
+    p.add_argument("--no-index", dest="include_index", action="store_false",
+                   help="Measure raw settled returns instead of returns in excess of IMOEX "
+                        "(the backtest default)")
+    p.add_argument("--load-market", action="store_true",
+                   help="Load market data for sessions being settled")
+    args = p.parse_args()
+
+    from .live import run_live
+
+    run_live(
+        args.source,
+        interval=args.interval,
+        once=args.once,
+        model=args.model,
+        pack=args.pack,
+        structured=args.structured,
+        include_index=args.include_index,
+        load_market=args.load_market,
+    )
+
+if __name__ == "__main__":
+    main()
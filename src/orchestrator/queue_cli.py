@@ -0,0 +1,120 @@
+import os
+import argparse
+import logging
+
+from chatgpt_news_label.backends import BACKENDS
+from chatgpt_news_label.config import DEDUP_THRESHOLD, LLM_BACKEND
+from .config import QUEUE_PATH, WORK_FOLDER
+
+logging.basicConfig(
+    format="%(asctime)s %(levelname)s %(name)s │ %(message)s",
+    level=logging.INFO,
+)
+
+KINDS = ["scrape", "label"]
+
+
+def _work_path(path: str) -> str:
+    # datasets live in the work folder, as with the other CLIs
+    return os.path.join(WORK_FOLDER, os.path.basename(path)) if WORK_FOLDER else path
+
+
+def main():
+    p = argparse.ArgumentParser(
+        description="Scrape and label through a shared job queue with any number of workers"
+    )
+    p.add_argument("--queue", "-q", default=QUEUE_PATH, help="Job queue database file")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    w = sub.add_parser("work", help="Run a worker; start as many as needed, on any host")
+    w.add_argument("--kind", "-k", nargs="*", choices=KINDS, default=KINDS,
+                   help="Job kinds to serve")
+    w.add_argument("--visibility", type=float, default=300,
+                   help="Seconds a leased job stays hidden from other workers; "
+                        "renewed while the job runs")
+    w.add_argument("--poll", type=float, default=2, help="Seconds between polls when idle")
+    w.add_argument("--drain", action="store_true", help="Exit when no job is available")
+    w.add_argument("--max-jobs", type=int, default=None, help="Exit after this many jobs")
+    w.add_argument("--backend", "-b", choices=sorted(BACKENDS), default=LLM_BACKEND,
+                   help="LLM backend for label jobs")
+    w.add_argument("--base-url", default=None,
+                   help="Base URL of an OpenAI-compatible server (openai/local backends)")
+    w.add_argument("--model-path", default=None, help="Path to a GGUF model file (llamacpp backend)")
+
+    es = sub.add_parser("enqueue-scrape", help="Queue one job per article of a news source")
+    es.add_argument("--source", "-s", required=True,
+                    help="FINAM news section URL or JSON file with titles/links")
+    es.add_argument("--batch", required=True, help="Batch name to collect later")
+    es.add_argument("--max-attempts", type=int, default=None)
+
+    el = sub.add_parser("enqueue-label", help="Queue one job per (ticker, trading date) prompt")
+    el.add_argument("--input", "-i", required=True, help="Non-trading news dataset")
+    el.add_argument("--batch", required=True, help="Batch name to collect later")
+    el.add_argument("--model", "-m", default="gpt-4o-2024-08-06", help="LLM model")
+    el.add_argument("--structured", action="store_true",
+                    help="Request structured (JSON schema) answers")
+    el.add_argument("--dedup", type=float, nargs="?", const=DEDUP_THRESHOLD, default=None,
+                    metavar="THRESHOLD",
+                    help=f"Drop near-duplicate articles of a prompt first (default {DEDUP_THRESHOLD})")
+    el.add_argument("--max-attempts", type=int, default=None)
+
+    pr = sub.add_parser("progress", help="Job counts per batch and status")
+    pr.add_argument("--batch", default=None)
+    pr.add_argument("--wait", action="store_true", help="Keep reporting until the batch is finished")
+    pr.add_argument("--interval", type=float, default=10)
+
+    cs = sub.add_parser("collect-scrape", help="Write the news dataset of a scrape batch")
+    cs.add_argument("--batch", required=True)
+    cs.add_argument("--output", "-o", default="finam_news_parsed.parquet")
+    cs.add_argument("--refresh-tickers", action="store_true")
+    cs.add_argument("--match-text", action="store_true")
+    cs.add_argument("--partial", action="store_true",
+                    help="Write the finished jobs even if some are still ready or running")
+
+    cl = sub.add_parser("collect-label", help="Write the signals of a label batch")
+    cl.add_argument("--batch", required=True)
+    cl.add_argument("--output", "-o", default="gpt_signals.parquet")
+    cl.add_argument("--partial", action="store_true",
+                    help="Write the finished jobs even if some are still ready or running")
+
+    rd = sub.add_parser("requeue-dead", help="Retry dead-lettered jobs")
+    rd.add_argument("--batch", default=None)
+    rd.add_argument("--kind", choices=KINDS, default=None)
+
+    args = p.parse_args()
+
+    from . import worker
+    from .jobs import JobQueue
+
+    queue = JobQueue(args.queue)
+    if args.command == "work":
+        context = {"backend_args": (args.backend, args.base_url, args.model_path)}
+        worker.work(queue, args.kind, args.visibility, args.poll, args.drain, args.max_jobs, context)
+    elif args.command == "enqueue-scrape":
+        added = worker.enqueue_scrape(queue, args.source, args.batch, args.max_attempts)
+        print(f"queued {added} scrape jobs in batch {args.batch}")
+    elif args.command == "enqueue-label":
+        added = worker.enqueue_label(queue, _work_path(args.input), args.batch, args.model,
+                                     args.structured, args.dedup, args.max_attempts)
+        print(f"queued {added} label jobs in batch {args.batch}")
+    elif args.command == "progress":
+        if args.wait:
+            worker.wait_for(queue, args.batch, args.interval)
+        print(worker.format_progress(queue.progress(args.batch)))
+    elif args.command in ("collect-scrape", "collect-label"):
+        try:
+            if args.command == "collect-scrape":
+                worker.collect_scrape(queue, args.batch, _work_path(args.output),
+                                      args.refresh_tickers, args.match_text, args.partial)
+            else:
+                worker.collect_label(queue, args.batch, _work_path(args.output), args.partial)
+        except worker.BatchPending as e:
+            queue.close()
+            p.exit(1, f"{e} (--partial)\n")
+    elif args.command == "requeue-dead":
+        print(f"requeued {queue.requeue_dead(args.batch, args.kind)} jobs")
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Stage functions and the default pipeline:
+
+    scrape ─► separate ─► dedup ─► label ─┐
+                                          ├─► backtest
+    market ───────────────────────────────┘
+
+Heavy packages are imported inside the stage functions so that
+planning a run (or skipping every stage) stays cheap.
+"""
+import os
+import json
+import time
+import sqlite3
+import asyncio
+from datetime import date, datetime
+
+from .dag import Stage, Pipeline
+from .config import (
+    STATE_PATH,
+    SCRAPE_TTL,
+    NEWS_PATH,
+    NON_TRADING_PATH,
+    DEDUP_PATH,
+    LABELS_PATH,
+    RETURNS_PATH,
+    MARKET_MANIFEST_PATH,
+)
+
+
+def scrape(source: str, output: str, window: str | None = None):
+    """
+    `window` only feeds the stage fingerprint: it names the SCRAPE_TTL
+    period the scrape belongs to, so the next period reruns it.
+    """
+    from newsparser import run
+
+    run(source, output)
+
+
+def separate(news: str, output: str, start: str, end: str):
+    """
+    Keep news published outside trading hours, mapped to the next open.
+    """
+    from dataset_io import read_frame, write_frame
+    from portfolio_backtest import PortfolioReturn
+
+    pr = PortfolioReturn(start, end)
+    _, non_trading = pr.separate(read_frame(news))
+    write_frame(non_trading, output)
+
+
+def dedup(news: str, output: str, threshold: float):
+    """
+    Drop near-duplicate articles within each (ticker, next open) prompt.
+    """
+    from chatgpt_news_label.dedup import run
+
+    run(news, output, threshold=threshold, by=("ticker", "trading_time"))
+
+
+def label(news: str, output: str, model: str, pack: bool):
+    from chatgpt_news_label import run
+
+    run(news, output, model=model, pack=pack)
+
+
+def market(start: str, end: str, periods: list[int], manifest: str):
+    from market_data_loader.config import DB_PATH
+    from market_data_loader.fetcher import update_all, calendar_days
+
+    days = calendar_days(date.fromisoformat(start), date.fromisoformat(end))
+    asyncio.run(update_all(days, periods))
+    write_market_manifest(DB_PATH, manifest)
+
+
+def write_market_manifest(db_path: str, output: str):
+    """
+    Per ticker (and derived period): bar count, first and last bar and
+    close total. Only the bar tables are summarized, so rebuilding the
+    coverage index leaves the manifest unchanged.
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    manifest = {
+        "ticker_data": conn.execute(
+            """SELECT ticker, count(*), min(date), max(date), total(close)
+               FROM ticker_data GROUP BY ticker ORDER BY ticker"""
+        ).fetchall(),
+        "bars": conn.execute(
+            """SELECT ticker, period, count(*), min(date), max(date), total(close)
+               FROM bars GROUP BY ticker, period ORDER BY ticker, period"""
+        ).fetchall(),
+    }
+    conn.close()
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+
+
+def backtest(labels: str, output: str, start: str, end: str, strategy: str):
+    from dataset_io import read_frame, write_frame
+    from portfolio_backtest import PortfolioReturn
+
+    df = read_frame(labels).rename(columns={"date_only_trading": "trading_date"})
+    pr = PortfolioReturn(start, end)
+    write_frame(pr.calculate_return(df, strategy=strategy), output)
+
+
+def scrape_window(ttl: float, now: float | None = None) -> str | None:
+    """
+    Start of the `ttl`-second period containing `now`; None if ttl <= 0.
+    """
+    if ttl <= 0:
+        return None
+    now = time.time() if now is None else now
+    return datetime.fromtimestamp(now // ttl * ttl).isoformat(timespec="seconds")
+
+
+def build_pipeline(
+    source: str,
+    start: str,
+    end: str,
+    periods: list[int] | None = None,
+    model: str = "gpt-4o-2024-08-06",
+    pack: bool = False,
+    strategy: str = "gpt",
+    dedup_threshold: float | None = None,
+    state_path: str = STATE_PATH,
+    scrape_ttl: float = SCRAPE_TTL,
+) -> Pipeline:
+    from market_data_loader.config import TICKERS_PKL, DERIVED_PERIODS
+    from chatgpt_news_label.config import DEDUP_THRESHOLD
+
+    stages = [
+        Stage(
+            "scrape", scrape,
+            # a local titles/links file is hashed; a URL is refreshed per TTL window
+            inputs=[source] if os.path.isfile(source) else [],
+            outputs=[NEWS_PATH],
+            params={"source": source, "output": NEWS_PATH,
+                    "window": scrape_window(scrape_ttl)},
+        ),
+        Stage(
+            "separate", separate,
+            inputs=[NEWS_PATH], outputs=[NON_TRADING_PATH], deps=["scrape"],
+            params={"news": NEWS_PATH, "output": NON_TRADING_PATH,
+                    "start": start, "end": end},
+        ),
+        Stage(
+            "dedup", dedup,
+            inputs=[NON_TRADING_PATH], outputs=[DEDUP_PATH], deps=["separate"],
+            params={"news": NON_TRADING_PATH, "output": DEDUP_PATH,
+                    "threshold": dedup_threshold or DEDUP_THRESHOLD},
+        ),
+        Stage(
+            "label", label,
+            inputs=[DEDUP_PATH], outputs=[LABELS_PATH], deps=["dedup"],
+            params={"news": DEDUP_PATH, "output": LABELS_PATH,
+                    "model": model, "pack": pack},
+        ),
+        Stage(
+            "market", market,
+            inputs=[TICKERS_PKL], outputs=[MARKET_MANIFEST_PATH],
+            params={"start": start, "end": end,
+                    "periods": list(DERIVED_PERIODS if periods is None else periods),
+                    "manifest": MARKET_MANIFEST_PATH},
+        ),
+        Stage(
+            "backtest", backtest,
+            inputs=[LABELS_PATH, MARKET_MANIFEST_PATH], outputs=[RETURNS_PATH],
+            deps=["label", "market"],
+            params={"labels": LABELS_PATH, "output": RETURNS_PATH,
+                    "start": start, "end": end, "strategy": strategy},
+        ),
+    ]
+    return Pipeline(stages, state_path)
@@ -0,0 +1,265 @@
+"""
+Queue-backed scraping and labeling.
+
+Producers split a run into jobs (one article page to scrape, one
+(ticker, trading date) prompt to label) in a shared `JobQueue`; any
+number of `work` processes execute them; the collectors turn a finished
+batch back into the same datasets `newsparser.run` and
+`chatgpt_news_label.run` write.
+"""
+import time
+import asyncio
+import logging
+
+import instrumentation as metrics
+from .jobs import JobQueue, READY, LEASED, DONE, DEAD, STATUSES, worker_name
+
+logger = logging.getLogger(__name__)
+
+SCRAPE, LABEL = "scrape", "label"
+
+
+class ScrapeError(RuntimeError):
+    pass
+
+
+class BatchPending(RuntimeError):
+    pass
+
+
+def scrape_job(payload: dict, context: dict) -> dict:
+    from newsparser.parser import get_data
+
+    article = get_data(payload["title"], payload["link"])
+    if article["date"] is None:
+        raise ScrapeError(f"could not read {payload['link']}")
+    return article
+
+
+def label_job(payload: dict, context: dict) -> dict:
+    from chatgpt_news_label.chatgpt_label import (
+        parse_signal,
+        parse_structured_signal,
+        SIGNAL_RESPONSE_FORMAT,
+    )
+
+    # one event loop per worker: the cached backend's client is bound to it
+    if "loop" not in context:
+        context["loop"] = asyncio.new_event_loop()
+    if "backend" not in context:
+        from chatgpt_news_label.config import make_backend
+
+        context["backend"] = make_backend(*context.get("backend_args", ()))
+    structured = payload.get("structured", False)
+    response = context["loop"].run_until_complete(context["backend"].complete(
+        payload["prompt"],
+        payload["model"],
+        SIGNAL_RESPONSE_FORMAT if structured else None,
+    ))
+    signal, explanation = (parse_structured_signal if structured else parse_signal)(response)
+    return {"signal": signal, "explanation": explanation}
+
+
+HANDLERS = {SCRAPE: scrape_job, LABEL: label_job}
+
+
+def work(
+    queue: JobQueue,
+    kinds: list[str],
+    visibility: float = 300.0,
+    poll: float = 2.0,
+    drain: bool = False,
+    max_jobs: int | None = None,
+    context: dict | None = None,
+) -> dict[str, int]:
+    """
+    Lease and run jobs until stopped (or, with `drain`, until none are
+    available). Returns counts of done/retried/dead jobs.
+    """
+    context = context if context is not None else {}
+    worker = worker_name()
+    counts = {"done": 0, "retried": 0, "dead": 0}
+    logger.info("Worker %s serving %s from %s", worker, ", ".join(kinds), queue.path)
+    try:
+        while max_jobs is None or sum(counts.values()) < max_jobs:
+            job = queue.lease(kinds, visibility, worker)
+            if job is None:
+                if drain:
+                    break
+                time.sleep(poll)
+                continue
+            try:
+                with queue.heartbeat(job, visibility), metrics.timer(f"queue.{job.kind}"):
+                    result = HANDLERS[job.kind](job.payload, context)
+            except Exception as e:
+                status = queue.fail(job, f"{type(e).__name__}: {e}")
+                outcome = "dead" if status == DEAD else "retried"
+                logger.warning(
+                    "Job %d (%s) attempt %d/%d failed: %s%s",
+                    job.id, job.kind, job.attempts, job.max_attempts, e,
+                    " — moved to dead letters" if status == DEAD else "",
+                )
+            else:
+                outcome = "done" if queue.complete(job, result) else "retried"
+            counts[outcome] += 1
+            metrics.count(f"queue.{job.kind}.{outcome}")
+    finally:
+        loop = context.pop("loop", None)
+        if loop is not None:
+            context.pop("backend", None)
+            loop.close()
+    logger.info("Worker %s finished: %s", worker, counts)
+    return counts
+
+
+def wait_for(queue: JobQueue, batch: str, interval: float = 10.0):
+    """
+    Log progress of a batch until no job is ready or leased.
+    """
+    while True:
+        pending = 0
+        for (_, kind), counts in queue.progress(batch).items():
+            total = sum(counts.values())
+            logger.info(
+                "%s %s: %d/%d done, %d running, %d waiting, %d dead",
+                batch, kind, counts[DONE], total, counts["leased"], counts["ready"], counts[DEAD],
+            )
+            pending += counts["ready"] + counts["leased"]
+        if not pending:
+            return
+        time.sleep(interval)
+
+
+def format_progress(progress: dict) -> str:
+    lines = [f"{'batch':<24} {'kind':<8} " + " ".join(f"{s:>7}" for s in STATUSES) + "    done%"]
+    for (batch, kind), counts in sorted(progress.items()):
+        total = sum(counts.values())
+        lines.append(
+            f"{batch:<24} {kind:<8} " + " ".join(f"{counts[s]:>7}" for s in STATUSES)
+            + f"  {100 * counts[DONE] / total:6.1f}%"
+        )
+    return "\n".join(lines)
+
+
+# producers and collectors
+
+def _finished(queue: JobQueue, batch: str, kind: str, partial: bool) -> list:
+    """
+    Results of the finished (done or dead) `kind` jobs of `batch`. Raises
+    BatchPending while jobs are still ready or leased, unless `partial`.
+    """
+    counts = queue.progress(batch).get((batch, kind), dict.fromkeys(STATUSES, 0))
+    pending = counts[READY] + counts[LEASED]
+    if pending and not partial:
+        raise BatchPending(
+            f"{pending} {kind} jobs of batch {batch} are not finished; "
+            "wait for them (progress --wait) or collect a partial dataset"
+        )
+    if pending:
+        logger.warning("Collecting batch %s without its %d unfinished %s jobs", batch, pending, kind)
+    return [r for r in queue.results(batch, kind) if r[2] in (DONE, DEAD)]
+
+
+def enqueue_scrape(
+    queue: JobQueue,
+    source: str,
+    batch: str,
+    max_attempts: int | None = None,
+) -> int:
+    """
+    Collect the titles/links of `source` and queue one job per article.
+    """
+    from newsparser.parser import collect_titles
+
+    titles_links, short_info = collect_titles(source)
+    queue.set_meta(batch, {"source": source, "short_info": short_info})
+    return queue.enqueue(
+        SCRAPE,
+        [{"title": item["title"], "link": item["link"]} for item in titles_links],
+        batch,
+        keys=[item["link"] for item in titles_links],
+        max_attempts=max_attempts,
+    )
+
+
+def collect_scrape(
+    queue: JobQueue,
+    batch: str,
+    output_path: str,
+    refresh_tickers: bool = False,
+    match_text: bool = False,
+    partial: bool = False,
+):
+    """
+    Write the news dataset of a finished scrape batch (with `partial`,
+    of its finished jobs so far). Dead-lettered pages are kept with an
+    empty text, as `newsparser.run` does.
+    """
+    from dataset_io import write_frame
+    from newsparser.parser import build_frame
+
+    existing = [
+        result if status == DONE
+        else {"title": payload["title"], "link": payload["link"], "date": None, "text": ""}
+        for _, payload, status, result in _finished(queue, batch, SCRAPE, partial)
+    ]
+    df = build_frame(existing, queue.meta(batch)["short_info"], refresh_tickers, match_text)
+    write_frame(df, output_path)
+
+
+def enqueue_label(
+    queue: JobQueue,
+    input_path: str,
+    batch: str,
+    model: str = "gpt-4o-2024-08-06",
+    structured: bool = False,
+    dedup: float | None = None,
+    max_attempts: int | None = None,
+) -> int:
+    """
+    Queue one labeling job per (ticker, trading date) prompt of the
+    non-trading news at `input_path`.
+    """
+    from dataset_io import read_frame
+    from chatgpt_news_label.chatgpt_label import group_prompts
+
+    df = read_frame(input_path)
+    if dedup is not None:
+        from chatgpt_news_label.dedup import dedup_frame
+
+        df, _ = dedup_frame(df, threshold=dedup, by=("ticker", "trading_time"))
+    grouped = group_prompts(df.assign(date_only_trading=df["trading_time"].dt.date))
+    payloads = [
+        {"ticker": str(row.ticker), "date_only_trading": str(row.date_only_trading),
+         "prompt": row.combined_prompt, "model": model, "structured": structured}
+        for row in grouped.itertuples()
+    ]
+    return queue.enqueue(
+        LABEL, payloads, batch,
+        keys=[f"{p['ticker']}|{p['date_only_trading']}" for p in payloads],
+        max_attempts=max_attempts,
+    )
+
+
+def collect_label(queue: JobQueue, batch: str, output_path: str, partial: bool = False):
+    """
+    Write the signals of a finished labeling batch (with `partial`, of
+    its finished jobs so far) in the layout of `label_frame`;
+    dead-lettered prompts get no signal and the error as explanation.
+    """
+    import pandas as pd
+    from dataset_io import write_frame
+
+    rows = []
+    for _, payload, status, result in _finished(queue, batch, LABEL, partial):
+        done = status == DONE
+        rows.append({
+            "ticker": payload["ticker"],
+            "date_only_trading": pd.Timestamp(payload["date_only_trading"]).date(),
+            "combined_prompt": payload["prompt"],
+            "signal": result["signal"] if done else None,
+            "explanation": result["explanation"] if done else result,
+        })
+    write_frame(pd.DataFrame(rows, columns=[
+        "ticker", "date_only_trading", "combined_prompt", "signal", "explanation"
+    ]), output_path)
@@ -1,13 +1,18 @@
 """
 portfolio_backtest — tools for running portfolio return backtests.
 """
+from _lazy import lazy_exports
 
-from .portfolio import PortfolioReturn
-from .utils import determine_trading_time
-from .db import fetch_daily  # whatever helpers you need
-
-__all__ = [
-    "PortfolioReturn",
-    "determine_trading_time",
-    "fetch_daily",
-]
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "PortfolioReturn": ".portfolio",
+    "determine_trading_time": ".utils",
+    "fetch_daily": ".db",
+    "compute_metrics": ".performance",
+    "rolling_metrics": ".performance",
+    "compute_curves": ".reporting",
+    "strategy_figure": ".reporting",
+    "render_figures": ".reporting",
+    "FERegression": ".regression",
+    "MinutePanel": ".intraday",
+    "event_study": ".intraday",
+})
@@ -1,11 +1,13 @@
 import sqlite3
 import pandas as pd
-from .config import DB_PATH
+import instrumentation as metrics
+from .config import DB_PATH, INDEX_TICKER
 
 def get_conn():
     conn = sqlite3.connect(DB_PATH, timeout=10)
     return conn
 
+@metrics.timed("backtest.fetch_daily")
 def fetch_daily(ticker: str, start_dt: pd.Timestamp, end_dt: pd.Timestamp) -> pd.DataFrame:
     """
     Returns a DataFrame of one OHLC bar per calendar date,
@@ -21,6 +23,8 @@ def fetch_daily(ticker: str, start_dt: pd.Timestamp, end_dt: pd.Timestamp) -> pd
                      params=(ticker,
                              start_dt.strftime("%Y-%m-%d %H:%M:%S"),
                              end_dt.strftime("%Y-%m-%d %H:%M:%S")))
+    metrics.count("backtest.db_queries")
+    metrics.count("backtest.rows_read", len(df))
     df["date"] = pd.to_datetime(df["date"])
     daily = (
         df.groupby(df["date"].dt.date)
@@ -30,3 +34,36 @@ def fetch_daily(ticker: str, start_dt: pd.Timestamp, end_dt: pd.Timestamp) -> pd
     )
     daily["date"] = pd.to_datetime(daily["date"])
     return daily
+
+def local_trading_days(start, end) -> pd.Series:
+    """
+    IMOEX trading days stored locally between start and end: the derived
+    daily bars if materialized, else the days with 1-minute bars.
+    """
+    lo = pd.Timestamp(start).strftime("%Y-%m-%d 00:00:00")
+    hi = pd.Timestamp(end).strftime("%Y-%m-%d 23:59:59")
+    conn = get_conn()
+    queries = [
+        "SELECT date FROM bars WHERE ticker=? AND period=24 AND date BETWEEN ? AND ? ORDER BY date",
+        """SELECT DISTINCT substr(date, 1, 10) AS date FROM ticker_data
+           WHERE ticker=? AND date BETWEEN ? AND ? ORDER BY date""",
+    ]
+    days = pd.Series(dtype=object)
+    for sql in queries:
+        try:
+            days = pd.read_sql(sql, conn, params=(INDEX_TICKER, lo, hi))["date"]
+        except pd.errors.DatabaseError:
+            continue  # table not created yet (older or empty database)
+        if not days.empty:
+            break
+    metrics.count("backtest.db_queries")
+    return pd.to_datetime(days).rename("begin")
+
+def load_coverage():
+    """
+    The loader's per-ticker coverage index of the stored minute bars,
+    rebuilt if the bars predate it (empty if no bars are stored).
+    """
+    from market_data_loader.coverage import CoverageIndex
+
+    return CoverageIndex.load_or_rebuild(get_conn())
@@ -0,0 +1,184 @@
+"""
+Vectorized intraday event study over preloaded minute bars.
+
+`MinutePanel.load` reads the bars of the needed tickers (plus IMOEX) in
+one query into dense (ticker × session × minute) arrays. `event_study`
+then gathers, for every event at once, raw and IMOEX-abnormal returns
+from the session open to each minute horizon and to the close of the
+next K sessions, and aggregates them by signal.
+"""
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import instrumentation as metrics
+from .db import get_conn
+from .config import INDEX_TICKER, TRADING_START, TRADING_END
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    # forward-fill NaNs along the last (minute) axis
+    valid = ~np.isnan(values)
+    idx = np.where(valid, np.arange(values.shape[-1]), 0)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    filled = np.take_along_axis(values, idx, axis=-1)
+    seen = np.maximum.accumulate(valid, axis=-1)
+    return np.where(seen, filled, np.nan)
+
+
+@dataclass
+class MinutePanel:
+    tickers: list[str]
+    days: pd.DatetimeIndex
+    entry: np.ndarray       # ticker × session: first open at/after the session start
+    close: np.ndarray       # ticker × session × minute, forward-filled closes
+    session_close: np.ndarray  # ticker × session: last close of the session
+
+    @classmethod
+    @metrics.timed("backtest.event_study.load")
+    def load(
+        cls,
+        tickers: list[str],
+        start,
+        end,
+        session_start: str = TRADING_START,
+        session_end: str = TRADING_END,
+    ) -> "MinutePanel":
+        """
+        Load minute bars of `tickers` and IMOEX between `start` and `end`
+        (dates) with a single query.
+        """
+        tickers = sorted(set(tickers) | {INDEX_TICKER})
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        placeholders = ",".join("?" * len(tickers))
+        sql = f"""
+            SELECT ticker, date, open, close
+            FROM ticker_data
+            WHERE ticker IN ({placeholders}) AND date BETWEEN ? AND ?
+        """
+        bars = pd.read_sql(sql, get_conn(), params=(
+            *tickers,
+            start.strftime("%Y-%m-%d 00:00:00"),
+            end.strftime("%Y-%m-%d 23:59:59"),
+        ))
+        bars["date"] = pd.to_datetime(bars["date"])
+
+        day = bars["date"].dt.normalize()
+        minute = (bars["date"] - day - pd.Timedelta(session_start)) // pd.Timedelta(minutes=1)
+        n_minutes = (pd.Timedelta(session_end) - pd.Timedelta(session_start)) // pd.Timedelta(minutes=1) + 1
+        bars = bars[(minute >= 0) & (minute < n_minutes)]
+        day, minute = day[bars.index], minute[bars.index]
+
+        days = pd.DatetimeIndex(np.sort(day.unique()))
+        t_idx = pd.Index(tickers).get_indexer(bars["ticker"])
+        d_idx = days.get_indexer(day)
+        m_idx = minute.to_numpy(dtype=int)
+
+        shape = (len(tickers), len(days), n_minutes)
+        open_ = np.full(shape, np.nan, dtype=np.float32)
+        close = np.full(shape, np.nan, dtype=np.float32)
+        open_[t_idx, d_idx, m_idx] = bars["open"].to_numpy()
+        close[t_idx, d_idx, m_idx] = bars["close"].to_numpy()
+
+        valid_open = ~np.isnan(open_)
+        first = valid_open.argmax(axis=2)
+        entry = np.take_along_axis(open_, first[..., None], axis=2)[..., 0]
+        entry[~valid_open.any(axis=2)] = np.nan
+        close = _ffill(close)
+        return cls(tickers, days, entry, close, close[..., -1])
+
+    def locate(self, tickers, dates) -> tuple[np.ndarray, np.ndarray]:
+        t = pd.Index(self.tickers).get_indexer(pd.Index(tickers).astype(str))
+        d = self.days.get_indexer(pd.to_datetime(pd.Series(dates)).dt.normalize())
+        return t, d
+
+
+@dataclass
+class EventStudyResult:
+    events: pd.DataFrame
+    horizons: list[str]
+    raw: np.ndarray        # events × horizons
+    abnormal: np.ndarray   # events × horizons
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Mean/std/count of raw, abnormal and signal-signed abnormal returns
+        (in %) per signal and horizon.
+        """
+        signal = self.events["signal"].to_numpy()
+        frames = []
+        for s in np.unique(signal[~pd.isna(signal)]):
+            rows = signal == s
+            raw, ab = self.raw[rows], self.abnormal[rows]
+            sign = np.sign(s) if s != 0 else 1
+            # horizons without any return are NaN, not a warning
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                frames.append(pd.DataFrame({
+                    "signal": s,
+                    "horizon": self.horizons,
+                    "count": (~np.isnan(ab)).sum(axis=0),
+                    "mean_raw_pct": np.nanmean(raw, axis=0) * 100,
+                    "mean_abnormal_pct": np.nanmean(ab, axis=0) * 100,
+                    "std_abnormal_pct": np.nanstd(ab, axis=0, ddof=1) * 100,
+                    "mean_signed_abnormal_pct": np.nanmean(ab * sign, axis=0) * 100,
+                }))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+@metrics.timed("backtest.event_study")
+def event_study(
+    events: pd.DataFrame,
+    panel: MinutePanel | None = None,
+    minutes: list[int] | range = range(1, 61),
+    sessions: int = 5,
+    date_column: str = "trading_date",
+) -> EventStudyResult:
+    """
+    events: DataFrame with ticker, `date_column` (session of the reaction)
+    and signal. Entry is the first open of that session; horizon '+Nm' is
+    the close N minutes after the session start, '+Kd' the close of the
+    K-th session (the event session is '+0d'). Abnormal = raw - IMOEX.
+    """
+    events = events.reset_index(drop=True)
+    if panel is None:
+        dates = pd.to_datetime(events[date_column])
+        panel = MinutePanel.load(
+            events["ticker"].astype(str).unique().tolist(),
+            dates.min(),
+            dates.max() + pd.Timedelta(days=2 * sessions + 7),
+        )
+
+    minutes = np.asarray(list(minutes), dtype=int)
+    minutes = minutes[(minutes >= 0) & (minutes < panel.close.shape[2])]
+    horizons = [f"+{m}m" for m in minutes] + [f"+{k}d" for k in range(sessions + 1)]
+    if not len(panel.days):
+        # no bars in the window: every return is unknown
+        missing = np.full((len(events), len(horizons)), np.nan)
+        return EventStudyResult(events, horizons, missing, missing.copy())
+
+    t, d = panel.locate(events["ticker"], events[date_column])
+    i = panel.tickers.index(INDEX_TICKER)
+    ok = (t >= 0) & (d >= 0)
+    t, d = np.where(ok, t, 0), np.where(ok, d, 0)
+
+    def returns(ti):
+        entry = panel.entry[ti, d].astype(float)
+        intraday = panel.close[ti[:, None], d[:, None], minutes[None, :]]
+        later = d[:, None] + np.arange(sessions + 1)[None, :]
+        in_range = later < len(panel.days)
+        multi = np.where(
+            in_range,
+            panel.session_close[ti[:, None], np.minimum(later, len(panel.days) - 1)],
+            np.nan,
+        )
+        exits = np.concatenate([intraday, multi], axis=1).astype(float)
+        out = exits / entry[:, None] - 1
+        out[~ok] = np.nan
+        return out
+
+    raw = returns(t)
+    index = returns(np.full_like(t, i))
+    return EventStudyResult(events, horizons, raw, raw - index)
@@ -0,0 +1,195 @@
+"""
+Vectorized performance metrics over many return series at once.
+
+Returns are a 2-D (series × days) matrix; NaN marks a day on which a
+series has no position and is skipped, like pandas does for a Series.
+"""
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+METRIC_LABELS = {
+    "sharpe_ratio": "Sharpe (Annualized)",
+    "mean_return_daily_pct": "Mean Daily Return (%)",
+    "std_daily_pct": "Std. Dev. (%)",
+    "max_drawdown_pct": "Max Drawdown (%)",
+}
+
+
+def return_matrix(series: dict[str, pd.Series]) -> pd.DataFrame:
+    """
+    Align daily return Series (indexed by date) into a series × days
+    frame; days missing from a series become NaN.
+    """
+    return pd.concat(series, axis=1).sort_index().T
+
+
+def _drawdowns(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    valid = ~np.isnan(values)
+    cum = np.cumprod(1 + np.where(valid, values, 0.0), axis=1)
+    peak = np.maximum.accumulate(cum, axis=1)
+    drawdown = (cum - peak) / peak
+
+    # longest stretch of consecutive days below the running peak; days
+    # without a position neither extend nor end a stretch
+    below = (drawdown < 0) & valid
+    run = np.cumsum(below, axis=1)
+    reset = np.maximum.accumulate(np.where(valid & ~below, run, 0), axis=1)
+    duration = (run - reset).max(axis=1, initial=0)
+    return drawdown.min(axis=1, initial=0.0), duration
+
+
+def compute_metrics(
+    returns: pd.DataFrame | np.ndarray,
+    periods_per_year: int = TRADING_DAYS,
+) -> pd.DataFrame:
+    """
+    One row of metrics per return series:
+    sharpe_ratio (annualized), mean_return_daily_pct, std_daily_pct,
+    max_drawdown_pct, max_drawdown_days, hit_rate_pct and n_days.
+    """
+    index = returns.index if isinstance(returns, pd.DataFrame) else None
+    values = np.asarray(returns, dtype=float)
+    if values.ndim == 1:
+        values = values[None, :]
+
+    valid = ~np.isnan(values)
+    n = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(values, axis=1) / n
+        sq = np.nansum((values - mean[:, None]) ** 2, axis=1)
+        std = np.sqrt(np.where(n > 1, sq / (n - 1), np.nan))
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), np.nan)
+        hit_rate = (values > 0).sum(axis=1) / n
+
+    max_dd, dd_days = _drawdowns(values)
+    return pd.DataFrame({
+        "sharpe_ratio": sharpe,
+        "mean_return_daily_pct": mean * 100,
+        "std_daily_pct": std * 100,
+        "max_drawdown_pct": np.where(n > 0, max_dd * 100, np.nan),
+        "max_drawdown_days": dd_days,
+        "hit_rate_pct": hit_rate * 100,
+        "n_days": n,
+    }, index=index)
+
+
+def rolling_metrics(
+    returns: pd.DataFrame,
+    window: int,
+    periods_per_year: int = TRADING_DAYS,
+) -> dict[str, pd.DataFrame]:
+    """
+    Rolling mean (%), std (%) and annualized Sharpe over `window` days for
+    every series, from cumulative sums in one pass. Windows with fewer
+    than two observations are NaN.
+    """
+    values = returns.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+
+    def windowed(a):
+        c = np.cumsum(a, axis=1)
+        out = c.copy()
+        out[:, window:] -= c[:, :-window]
+        return out
+
+    n = windowed(valid.astype(float))
+    s = windowed(filled)
+    s2 = windowed(filled ** 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s / n
+        var = np.where(n > 1, (s2 - s * mean) / (n - 1), np.nan)
+        std = np.sqrt(np.clip(var, 0, None))
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), np.nan)
+    mean = np.where(n > 1, mean, np.nan)
+
+    def frame(a):
+        return pd.DataFrame(a, index=returns.index, columns=returns.columns)
+
+    return {
+        "mean_pct": frame(mean * 100),
+        "std_pct": frame(std * 100),
+        "sharpe_ratio": frame(sharpe),
+    }
+
+
+def summary_metrics(table: pd.DataFrame) -> dict[str, dict]:
+    """
+    {series: {'Sharpe (Annualized)': …, …}} as reported in the plots.
+    """
+    return table[list(METRIC_LABELS)].rename(columns=METRIC_LABELS).to_dict(orient="index")
+
+
+class RunningMetrics:
+    """
+    Cumulative return, running peak, drawdown and Sharpe of one
+    self-financing portfolio, updated in O(1) per new day and
+    serializable so live runs can resume where they stopped.
+    """
+
+    FIELDS = (
+        "cumulative_return", "peak", "max_drawdown", "drawdown_days",
+        "max_drawdown_days", "n_days", "sum_ret", "sum_sq_ret", "hits", "last_date",
+    )
+
+    def __init__(self, **state):
+        self.cumulative_return = 1.0
+        self.peak = 1.0
+        self.max_drawdown = 0.0
+        self.drawdown_days = 0
+        self.max_drawdown_days = 0
+        self.n_days = 0
+        self.sum_ret = 0.0
+        self.sum_sq_ret = 0.0
+        self.hits = 0
+        self.last_date: str | None = None
+        for k, v in state.items():
+            if k in self.FIELDS:
+                setattr(self, k, v)
+
+    def update(self, day, daily_ret: float):
+        """
+        Fold in one day's return; days already folded in are ignored.
+        """
+        day = str(pd.Timestamp(day).date())
+        if self.last_date is not None and day <= self.last_date:
+            return
+        daily_ret = float(daily_ret)
+        self.cumulative_return *= 1 + daily_ret
+        self.peak = max(self.peak, self.cumulative_return)
+        drawdown = (self.cumulative_return - self.peak) / self.peak
+        self.max_drawdown = min(self.max_drawdown, drawdown)
+        self.drawdown_days = self.drawdown_days + 1 if drawdown < 0 else 0
+        self.max_drawdown_days = max(self.max_drawdown_days, self.drawdown_days)
+        self.n_days += 1
+        self.sum_ret += daily_ret
+        self.sum_sq_ret += daily_ret ** 2
+        self.hits += int(daily_ret > 0)
+        self.last_date = day
+
+    @property
+    def drawdown(self) -> float:
+        return (self.cumulative_return - self.peak) / self.peak
+
+    def metrics(self, periods_per_year: int = TRADING_DAYS) -> dict:
+        n = self.n_days
+        mean = self.sum_ret / n if n else np.nan
+        var = (self.sum_sq_ret - n * mean ** 2) / (n - 1) if n > 1 else np.nan
+        std = np.sqrt(max(var, 0.0)) if n > 1 else np.nan
+        sharpe = mean / std * np.sqrt(periods_per_year) if n > 1 and std > 0 else np.nan
+        return {
+            "sharpe_ratio": sharpe,
+            "mean_return_daily_pct": mean * 100,
+            "std_daily_pct": std * 100,
+            "max_drawdown_pct": self.max_drawdown * 100,
+            "max_drawdown_days": self.max_drawdown_days,
+            "hit_rate_pct": self.hits / n * 100 if n else np.nan,
+            "n_days": n,
+            "cumulative_return": self.cumulative_return,
+            "drawdown_pct": self.drawdown * 100,
+        }
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.FIELDS}
@@ -1,20 +1,39 @@
+import logging
 import numpy as np
 import pandas as pd
 from datetime import timedelta
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-from .db import fetch_daily
+import instrumentation as metrics
+
+from .db import fetch_daily, load_coverage
+from .performance import (
+    compute_metrics,
+    return_matrix,
+    METRIC_LABELS,
+)
+from .reporting import (
+    compute_curves,
+    strategy_figure,
+    draw_figure,
+    render_figure,
+    RC,
+)
 from .utils import (
     trading_days_index,
     determine_trading_time,
 )
 from .config import INDEX_TICKER, TRADING_START, TRADING_END
 
+logger = logging.getLogger(__name__)
+
 class PortfolioReturn:
-    def __init__(self, start, end):
-        self.trading_days = trading_days_index(start, end)
+    def __init__(self, start, end, trading_days: pd.Series | None = None):
+        self.trading_days = (
+            trading_days if trading_days is not None
+            else trading_days_index(start, end)
+        )
     
+    @metrics.timed("backtest.separate")
     def separate(self, df: pd.DataFrame):
         df["date"] = pd.to_datetime(df["date"], format="%d.%m.%y %H:%M")
         df["trading_time"] = df["date"].apply(
@@ -26,6 +45,44 @@ class PortfolioReturn:
         )
     
 
+    @metrics.timed("backtest.coverage")
+    def coverage_mask(
+        self,
+        df: pd.DataFrame,
+        start: str,
+        end: str,
+        include_index: bool = True,
+    ) -> np.ndarray:
+        """
+        One vectorized lookup of every (ticker, trading_date) row in the
+        loader's coverage index: True where the ticker (and IMOEX, with
+        include_index) has bars between `start` and `end` ('HH:MM') that
+        day. All False when there is no coverage index (no bars stored).
+        """
+        coverage = load_coverage()
+        if not len(coverage):
+            logger.warning("No coverage index in market_data.db; run `market-load --materialize-only`")
+            return np.zeros(len(df), dtype=bool)
+        days = df["trading_date"]
+        mask = coverage.covered(df["ticker"], days, start, end)
+        if include_index:
+            mask &= coverage.covered([INDEX_TICKER] * len(df), days, start, end)
+        return mask
+
+    def _check_coverage(self, df, start, end, include_index, on_uncovered):
+        if on_uncovered not in ("drop", "flag"):
+            raise ValueError("on_uncovered must be 'drop' or 'flag'")
+        covered = self.coverage_mask(df, start, end, include_index)
+        if not covered.all():
+            logger.warning(
+                "%d of %d rows have no market data between %s and %s (%s)",
+                (~covered).sum(), len(df), start, end,
+                "dropped" if on_uncovered == "drop" else "flagged",
+            )
+        df = df.assign(covered=covered)
+        return df[covered] if on_uncovered == "drop" else df
+
+    @metrics.timed("backtest.calculate_return")
     def calculate_return(
         self,
         non_trading: pd.DataFrame,
@@ -35,12 +92,14 @@ class PortfolioReturn:
         minute_open: int = 1,
         hour_close: int = 18,
         minute_close: int = 39,
-        exclude_neutral: bool = True
-
+        exclude_neutral: bool = True,
+        on_uncovered: str = "drop",
     ) -> pd.DataFrame:
         """
         Applies a signal strategy, then computes excess returns and
-        returns.
+        returns. Rows without market data (per the coverage index, or no
+        bars when fetched) are dropped, or with on_uncovered='flag' kept
+        with a NaN return and covered=False.
         """
         non_trading_df = non_trading.copy()
 
@@ -59,6 +118,13 @@ class PortfolioReturn:
         non_trading_df["trading_time"] = non_trading_df["trading_date"].apply(
             lambda d: d.replace(hour=hour_open, minute=minute_open)
         )
+        non_trading_df = self._check_coverage(
+            non_trading_df,
+            f"{hour_open:02d}:{minute_open:02d}",
+            f"{hour_close:02d}:{minute_close:02d}",
+            include_index,
+            on_uncovered,
+        )
 
         results = []
         for _, row in non_trading_df.iterrows():
@@ -66,53 +132,63 @@ class PortfolioReturn:
             trading_time = row["trading_time"]
             signal       = row["signal"]
 
-            mkt = fetch_daily(
-                ticker,
-                trading_time,
-                trading_time.replace(hour=hour_close, minute=minute_close),
-            )
-            idx = fetch_daily(
-                INDEX_TICKER,
-                trading_time,
-                trading_time.replace(hour=hour_close, minute=minute_close),
-            )
-
-            if mkt.empty:
-                continue
-
-            entry_price = mkt.open.iloc[0]
-            exit_price  = mkt.close.iloc[0]
-            entry_idx   = idx.open.iloc[0]
-            exit_idx    = idx.close.iloc[0]
-
-            if signal == 1:
-                trade_ret = (exit_price - entry_price) / entry_price 
-            else:
-                trade_ret = (entry_price - exit_price) / entry_price
-
-            if include_index:
-                idx_ret = (exit_idx - entry_idx) / entry_idx if signal == 1 else (entry_idx - exit_idx) / entry_idx
-            else:
-                idx_ret = 0
-
             # filter out zeros or IMOEX
             if ticker == INDEX_TICKER:
                 continue
             if signal == 0 and exclude_neutral:
                 continue
 
-            results.append({
+            ret = np.nan
+            covered = bool(row["covered"])
+            if covered:
+                mkt = fetch_daily(
+                    ticker,
+                    trading_time,
+                    trading_time.replace(hour=hour_close, minute=minute_close),
+                )
+                idx = fetch_daily(
+                    INDEX_TICKER,
+                    trading_time,
+                    trading_time.replace(hour=hour_close, minute=minute_close),
+                ) if include_index else None
+                # no bars after all: dropped, or flagged like any uncovered row
+                covered = not mkt.empty and (idx is None or not idx.empty)
+                if not covered and on_uncovered == "drop":
+                    continue
+
+            if covered:
+                entry_price = mkt.open.iloc[0]
+                exit_price  = mkt.close.iloc[0]
+
+                if signal == 1:
+                    trade_ret = (exit_price - entry_price) / entry_price 
+                else:
+                    trade_ret = (entry_price - exit_price) / entry_price
+
+                if include_index:
+                    entry_idx = idx.open.iloc[0]
+                    exit_idx  = idx.close.iloc[0]
+                    idx_ret = (exit_idx - entry_idx) / entry_idx if signal == 1 else (entry_idx - exit_idx) / entry_idx
+                else:
+                    idx_ret = 0
+                ret = trade_ret - idx_ret
+
+            result = {
                 "time": trading_time,
                 "ticker": ticker,
-                "return": trade_ret - idx_ret,
+                "return": ret,
                 "signal": signal,
                 "combined_prompt": row["combined_prompt"],
                 "explanation": row["explanation"],
                 "news_time": row["trading_date"],
-            })
+            }
+            if on_uncovered == "flag":
+                result["covered"] = covered
+            results.append(result)
 
         return pd.DataFrame(results)
     
+    @metrics.timed("backtest.create_df_regression")
     def create_df_regression(
         self,
         non_trading: pd.DataFrame,
@@ -126,6 +202,7 @@ class PortfolioReturn:
         (10:01 to 18:39) and compute raw, index, and excess returns.
         Returns a DataFrame with columns:
           ['time','ticker','raw_return','index_return','excess_return','news_time']
+        Rows the coverage index has no bars for (ticker or IMOEX) are dropped.
         """
         df = non_trading.copy()
         df["trading_date"] = pd.to_datetime(df["trading_date"])
@@ -136,6 +213,13 @@ class PortfolioReturn:
         df["trading_time"] = df["trading_date"].apply(
             lambda d: d.replace(hour=hour_open, minute=minute_open)
         )
+        df = self._check_coverage(
+            df,
+            f"{hour_open:02d}:{minute_open:02d}",
+            f"{hour_close:02d}:{minute_close:02d}",
+            True,
+            "drop",
+        )
 
         results = []
         for _, row in df.iterrows():
@@ -167,6 +251,7 @@ class PortfolioReturn:
 
         return pd.DataFrame(results)
     
+    @metrics.timed("backtest.compute_returns_by_offset")
     def compute_returns_by_offset(self, df_gpt, base_open=(9, 51), base_close=(18, 49), max_offset=15):
         records = []
         for offset in range(1, max_offset + 1):
@@ -192,44 +277,40 @@ class PortfolioReturn:
         Given a Series of daily returns, compute
         mean, std, Sharpe (annualized), and max drawdown.
         """
-        mean_ret = returns.mean()
-        std_ret  = returns.std()
-        sharpe   = (mean_ret / std_ret) * np.sqrt(252) if std_ret > 0 else np.nan
-
-        cum = (1 + returns).cumprod()
-        peak = cum.cummax()
-        drawdown = (cum - peak) / peak
-        max_dd = drawdown.min()
-
-        return {
-            "sharpe_ratio": sharpe,
-            "mean_return_daily_pct": mean_ret * 100,
-            "std_daily_pct": std_ret * 100,
-            "max_drawdown_pct": max_dd * 100
-        }
+        table = compute_metrics(returns.to_numpy(dtype=float))
+        return {k: table[k].iloc[0] for k in METRIC_LABELS}
+
+    def metrics_table(self, daily_returns: dict[str, pd.Series]) -> pd.DataFrame:
+        """
+        Score many daily return series (label -> Series indexed by date)
+        in one vectorized pass; one row of metrics per label.
+        """
+        return compute_metrics(return_matrix(daily_returns))
 
-    def calculate_cumulative_return(self, df: pd.DataFrame) -> pd.DataFrame:
+    @metrics.timed("backtest.calculate_cumulative_return")
+    def calculate_cumulative_return(self, df: pd.DataFrame, with_metrics: bool = True) -> pd.DataFrame:
         """
         1) Group by news_time, compute avg return
         2) Compute cumulative return
-        3) Attach Sharpe, mean, std, drawdown (as %)
+        3) Attach Sharpe, mean, std, drawdown (as %) unless with_metrics=False
         """
         dfg = (df.groupby("news_time")['return'].mean().rename("avg_return").reset_index().sort_values("news_time"))
         
         dfg["multiplier"] = 1 + dfg["avg_return"]
         dfg["cumulative_return"] = dfg["multiplier"].cumprod()
 
-        metrics = self._compute_metrics(dfg["avg_return"])
-        for k, v in metrics.items():
-            dfg[k] = v
+        if with_metrics:
+            for k, v in self._compute_metrics(dfg["avg_return"]).items():
+                dfg[k] = v
 
         return dfg
 
-    def calculate_self_financing_cum_return(self, df: pd.DataFrame) -> pd.DataFrame:
+    @metrics.timed("backtest.calculate_self_financing_cum_return")
+    def calculate_self_financing_cum_return(self, df: pd.DataFrame, with_metrics: bool = True) -> pd.DataFrame:
         """
         1) Split long vs short signals and average per day
         2) Sum into daily_ret, cumprod into cumulative_return
-        3) Attach Sharpe, mean, std, drawdown (as %)
+        3) Attach Sharpe, mean, std, drawdown (as %) unless with_metrics=False
         """
         long_r = (df[df.signal == 1].groupby("news_time")['return'].mean().rename("long_ret"))
         short_r = (df[df.signal == -1].groupby("news_time")['return'].mean().rename("short_ret"))
@@ -239,12 +320,13 @@ class PortfolioReturn:
         pr = pr.sort_index()
         pr["cumulative_return"] = (1 + pr["daily_ret"]).cumprod()
 
-        metrics = self._compute_metrics(pr["daily_ret"])
-        for k, v in metrics.items():
-            pr[k] = v
+        if with_metrics:
+            for k, v in self._compute_metrics(pr["daily_ret"]).items():
+                pr[k] = v
 
         return pr.reset_index()
     
+    @metrics.timed("backtest.estimate_random_benchmark")
     def estimate_random_benchmark(
         self,
         non_trading_df: pd.DataFrame,
@@ -264,7 +346,7 @@ class PortfolioReturn:
         """
 
         cum_returns = []
-        metrics_list = []
+        daily_returns = {}
 
         for i in range(n_runs):
             np.random.seed(i + seed_offset)
@@ -279,34 +361,32 @@ class PortfolioReturn:
             )
 
 
-            result = self.calculate_self_financing_cum_return(df_rand)
-            cr = result.set_index("news_time")["cumulative_return"]
-            cum_returns.append(cr)
-            metrics_list.append({
-                "Sharpe (Annualized)":       result["sharpe_ratio"].iloc[0],
-                "Mean Daily Return (%)":     result["mean_return_daily_pct"].iloc[0],
-                "Std. Dev. (%)":             result["std_daily_pct"].iloc[0],
-                "Max Drawdown (%)":          result["max_drawdown_pct"].iloc[0],
-            })
+            result = self.calculate_self_financing_cum_return(df_rand, with_metrics=False)
+            result = result.set_index("news_time")
+            cum_returns.append(result["cumulative_return"])
+            daily_returns[f"run_{i}"] = result["daily_ret"]
 
         cum_df = pd.concat(cum_returns, axis=1).sort_index()
         cum_df.columns = [f"run_{i}" for i in range(n_runs)]
 
         mean_cum_return = cum_df.mean(axis=1)
 
-        metrics_df = pd.DataFrame(metrics_list)
-        avg_metrics = metrics_df.mean(numeric_only=True).to_dict()
+        metrics_df = self.metrics_table(daily_returns)[list(METRIC_LABELS)]
+        avg_metrics = metrics_df.rename(columns=METRIC_LABELS).mean().to_dict()
 
         return mean_cum_return, avg_metrics
     
 
+    @metrics.timed("backtest.plot_with_random")
     def plot_with_random(
         self,
         portfolios: dict[str, pd.DataFrame],
         mean_random: pd.Series,
         random_metrics: dict[str, float],
         output_prefix: str = "fig_cumulative_returns_raw",
-        title: str = "Cumulative Returns by Strategy\n(Open 10-min / Close 10-min)"
+        title: str = "Cumulative Returns by Strategy\n(Open 10-min / Close 10-min)",
+        show: bool = True,
+        pgf: bool = True,
     ) -> dict[str, dict]:
         """
         portfolios: {
@@ -315,65 +395,27 @@ class PortfolioReturn:
         mean_random: pd.Series indexed by news_time of expected-random cum. return
         random_metrics: dict with keys
           'Sharpe (Annualized)', 'Mean Daily Return (%)', 'Std. Dev. (%)', 'Max Drawdown (%)'
+        With show=False the figure is rendered headless (Agg) and not displayed;
+        for batches of figures see reporting.render_figures.
         """
-        sns.set_style("whitegrid")
-        plt.figure(figsize=(12, 6), dpi=300)
-        plt.rcParams.update({
-            "text.usetex": False,
-            "font.family": "serif",
-            "axes.labelsize": 14,
-            "xtick.labelsize": 12,
-            "ytick.labelsize": 12,
-            "legend.fontsize": 12
-        })
-
-        colors = ['red', 'green', 'orange', 'purple', 'brown', 'pink']
-        metrics: dict[str, dict] = {}
-
-        for (label, df), color in zip(portfolios.items(), colors):
-            if df.empty:
-                continue
+        curves, summary = compute_curves(self, portfolios)
+        summary["Expected Random"] = random_metrics
+        spec = strategy_figure(curves, mean_random, output_prefix, title, pgf=pgf,
+                               labels=list(portfolios))
 
-            if label in {"GPT", "Only long GPT", "Only short GPT", "Random"}:
-                res = self.calculate_self_financing_cum_return(df)
-                ls = "dashed"
-            else:
-                res = self.calculate_cumulative_return(df)
-                ls = "solid"
-
-            plt.plot(
-                res["news_time"],
-                res["cumulative_return"],
-                label=label,
-                color=color,
-                linestyle=ls
-            )
+        if not show:
+            render_figure(spec)
+            return summary
 
-            metrics[label] = {
-                "Sharpe (Annualized)"   : res["sharpe_ratio"].iloc[0],
-                "Mean Daily Return (%)" : res["mean_return_daily_pct"].iloc[0],
-                "Std. Dev. (%)"         : res["std_daily_pct"].iloc[0],
-                "Max Drawdown (%)"      : res["max_drawdown_pct"].iloc[0],
-            }
+        import matplotlib.pyplot as plt
+        import seaborn as sns
 
-        plt.plot(
-            mean_random.index,
-            mean_random.values,
-            label="Expected Random",
-            color="black",
-            linestyle="dotted"
-        )
-        metrics["Expected Random"] = random_metrics
-
-        plt.title(title)
-        plt.xlabel("Date")
-        plt.legend()
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-
-        plt.savefig(f"{output_prefix}.pgf")
-        plt.savefig(f"{output_prefix}.png")
+        sns.set_style("whitegrid")
+        plt.rcParams.update(RC)
+        fig = plt.figure(figsize=spec.figsize, dpi=spec.dpi)
+        draw_figure(spec, fig)
+        for fmt in spec.formats:
+            fig.savefig(f"{output_prefix}.{fmt}")
         plt.show()
 
-        return metrics
-    
+        return summary
@@ -0,0 +1,204 @@
+"""
+Fixed-effects OLS over `create_df_regression` output.
+
+The data are demeaned once per (fixed-effect structure, sample) by
+alternating projections on integer group codes, and the demeaned
+columns are reused by every outcome/regressor specification on that
+sample. Standard errors are clustered (CRV1, by ticker by default)
+with the same small-sample correction pyfixest applies by default
+(a fixed effect nested in the cluster counts as one parameter).
+"""
+import re
+import numpy as np
+import pandas as pd
+
+_FORMULA_RE = re.compile(r"^\s*(\w+)\s*~\s*([^|]+?)\s*(?:\|\s*(.+?))?\s*$")
+_CATEGORICAL_RE = re.compile(r"^C\((\w+)\)$")
+
+
+def parse_formula(formula: str) -> tuple[str, list[str], list[str]]:
+    """
+    'y ~ x1 + C(x2) | fe1 + fe2' -> ('y', ['x1', 'C(x2)'], ['fe1', 'fe2']).
+    """
+    m = _FORMULA_RE.match(formula)
+    if not m:
+        raise ValueError(f"Cannot parse formula {formula!r}")
+    split = lambda part: [t.strip() for t in part.split("+") if t.strip()] if part else []
+    return m.group(1), split(m.group(2)), split(m.group(3))
+
+
+def demean(
+    values: np.ndarray,
+    codes: list[np.ndarray],
+    tol: float = 1e-10,
+    maxiter: int = 10_000,
+) -> np.ndarray:
+    """
+    Project the columns of `values` (n × k) off every set of group
+    dummies given as integer codes, by alternating projections.
+    """
+    out = np.array(values, dtype=float, copy=True)
+    if not codes:
+        return out
+    counts = [np.bincount(c) for c in codes]
+    for _ in range(maxiter):
+        change = 0.0
+        for c, n in zip(codes, counts):
+            means = np.stack(
+                [np.bincount(c, weights=out[:, j], minlength=len(n)) for j in range(out.shape[1])],
+                axis=1,
+            ) / n[:, None]
+            out -= means[c]
+            change = max(change, np.abs(means).max(initial=0.0))
+        if change < tol or len(codes) == 1:
+            break
+    return out
+
+
+class FERegression:
+    """
+    Fixed-effects regression runner over one data frame.
+
+        reg = FERegression(df_reg, cluster="ticker")
+        reg.fit("excess_return ~ signal | ticker + date")
+        reg.fit("excess_return ~ C(signal) | ticker + date",
+                sample=reg.trim("excess_return", 0.01, 0.99))
+        reg.sweep([...formulas...], trims=[None, (0.01, 0.99)])
+    """
+
+    def __init__(self, df: pd.DataFrame, cluster: str = "ticker"):
+        self.df = df.reset_index(drop=True)
+        self.cluster = cluster
+        self._cache: dict = {}
+
+    def trim(self, column: str, low: float, high: float) -> np.ndarray:
+        """
+        Boolean sample mask keeping rows within the [low, high] quantiles of `column`.
+        """
+        lo, hi = self.df[column].quantile([low, high])
+        return ((self.df[column] >= lo) & (self.df[column] <= hi)).to_numpy()
+
+    def _design(self, terms: list[str]) -> pd.DataFrame:
+        cols = {}
+        for term in terms:
+            m = _CATEGORICAL_RE.match(term)
+            if not m:
+                cols[term] = self.df[term].astype(float)
+                continue
+            col = self.df[m.group(1)]
+            cat = col.astype("category") if not isinstance(col.dtype, pd.CategoricalDtype) else col
+            for level in cat.cat.categories[1:]:
+                cols[f"C({m.group(1)})[T.{level}]"] = (cat == level).astype(float)
+        return pd.DataFrame(cols)
+
+    def _demeaned(self, names: list[str], data: pd.DataFrame, fe: list[str], sample: np.ndarray):
+        key = (tuple(fe), sample.tobytes())
+        entry = self._cache.get(key)
+        if entry is None:
+            codes = [pd.factorize(self.df.loc[sample, f])[0] for f in fe]
+            entry = self._cache[key] = {"codes": codes, "columns": {}}
+        missing = [n for n in names if n not in entry["columns"]]
+        if missing:
+            done = demean(data.loc[sample, missing].to_numpy(dtype=float), entry["codes"])
+            for j, name in enumerate(missing):
+                entry["columns"][name] = done[:, j]
+        return np.column_stack([entry["columns"][n] for n in names])
+
+    def _fe_dof(self, fe: list[str], sample: np.ndarray, clusters: np.ndarray) -> int:
+        # a fixed effect nested in the cluster variable counts as one parameter
+        dof = 0
+        for f in fe:
+            levels = pd.factorize(self.df.loc[sample, f])[0]
+            nested = pd.Series(clusters).groupby(levels).nunique().max() == 1
+            dof += 1 if nested else levels.max() + 1
+        return dof - max(len(fe) - 1, 0)
+
+    def fit(self, formula: str, sample: np.ndarray | None = None) -> pd.DataFrame:
+        """
+        Coefficients with cluster-robust (CRV1) standard errors,
+        t statistics and p-values (t with G-1 degrees of freedom).
+        Without fixed effects an Intercept is estimated, as in pyfixest.
+        """
+        from scipy import stats
+
+        y_name, terms, fe = parse_formula(formula)
+        design = self._design(terms)
+        if not fe:
+            # nothing is demeaned away, so the constant needs its own column
+            design.insert(0, "Intercept", 1.0)
+        data = pd.concat([self.df[[y_name]].astype(float), design], axis=1)
+        if sample is None:
+            sample = np.ones(len(self.df), dtype=bool)
+        sample = sample & data.notna().all(axis=1).to_numpy()
+
+        yx = self._demeaned([y_name, *design.columns], data, fe, sample)
+        y, X = yx[:, 0], yx[:, 1:]
+        xtx_inv = np.linalg.pinv(X.T @ X)
+        beta = xtx_inv @ X.T @ y
+        resid = y - X @ beta
+
+        clusters = pd.factorize(self.df.loc[sample, self.cluster])[0]
+        G = clusters.max() + 1
+        scores = np.zeros((G, X.shape[1]))
+        np.add.at(scores, clusters, X * resid[:, None])
+        n, k = X.shape
+        k += self._fe_dof(fe, sample, clusters)
+        adj = (G / (G - 1)) * ((n - 1) / (n - k))
+        vcov = adj * xtx_inv @ (scores.T @ scores) @ xtx_inv
+        se = np.sqrt(np.diag(vcov))
+        t = beta / se
+        p = 2 * stats.t.sf(np.abs(t), df=G - 1)
+
+        result = pd.DataFrame(
+            {"coef": beta, "se": se, "t": t, "p": p},
+            index=pd.Index(design.columns, name="term"),
+        )
+        result.attrs.update({"formula": formula, "nobs": n, "clusters": G})
+        self._last = (X, y, beta, resid, clusters, xtx_inv)
+        return result
+
+    def wild_bootstrap(
+        self,
+        formula: str,
+        sample: np.ndarray | None = None,
+        n_boot: int = 999,
+        seed: int = 0,
+    ) -> pd.DataFrame:
+        """
+        Wild cluster bootstrap (Rademacher weights per cluster). The
+        sample is fixed, so the cached demeaned data are reused and each
+        draw is a single matrix product.
+        """
+        result = self.fit(formula, sample)
+        X, y, beta, resid, clusters, xtx_inv = self._last
+        rng = np.random.default_rng(seed)
+        weights = rng.choice([-1.0, 1.0], size=(n_boot, clusters.max() + 1))
+        y_star = (X @ beta)[None, :] + resid[None, :] * weights[:, clusters]
+        draws = y_star @ (X @ xtx_inv.T)
+        dev = np.abs(draws - beta)
+        result["boot_se"] = draws.std(axis=0, ddof=1)
+        result["boot_p"] = (dev >= np.abs(beta)).mean(axis=0)
+        return result
+
+    def sweep(
+        self,
+        formulas: list[str],
+        trims: list[tuple[float, float] | None] = (None,),
+        trim_column: str | None = None,
+    ) -> pd.DataFrame:
+        """
+        Fit every formula on every trimmed sample; demeaning is shared
+        between formulas on the same sample. `trim_column` defaults to
+        each formula's outcome.
+        """
+        rows = []
+        for trim in trims:
+            for formula in formulas:
+                y_name = parse_formula(formula)[0]
+                sample = self.trim(trim_column or y_name, *trim) if trim else None
+                res = self.fit(formula, sample).reset_index()
+                res.insert(0, "trim", "none" if trim is None else f"{trim[0]}-{trim[1]}")
+                res.insert(0, "formula", formula)
+                res["nobs"] = res.attrs["nobs"]
+                rows.append(res)
+        return pd.concat(rows, ignore_index=True)
@@ -0,0 +1,165 @@
+"""
+Headless figure rendering from precomputed portfolio curves.
+
+`compute_curves` turns strategy returns into cumulative-return curves and
+metrics once; `strategy_figure` packs curves into a picklable
+`FigureSpec`; `render_figures` draws many specs on the Agg backend in a
+process pool without touching pyplot's global state.
+"""
+import os
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .performance import summary_metrics
+
+SELF_FINANCING = {"GPT", "Only long GPT", "Only short GPT", "Random"}
+COLORS = ['red', 'green', 'orange', 'purple', 'brown', 'pink']
+
+RC = {
+    "text.usetex": False,
+    "font.family": "serif",
+    "axes.labelsize": 14,
+    "xtick.labelsize": 12,
+    "ytick.labelsize": 12,
+    "legend.fontsize": 12
+}
+
+
+@dataclass
+class Line:
+    label: str
+    x: np.ndarray
+    y: np.ndarray
+    color: str
+    linestyle: str
+
+
+@dataclass
+class FigureSpec:
+    output_prefix: str
+    title: str
+    lines: list[Line] = field(default_factory=list)
+    formats: tuple[str, ...] = ("png",)
+    dpi: int = 300
+    figsize: tuple[float, float] = (12, 6)
+
+
+def compute_curves(pr, portfolios: dict[str, pd.DataFrame]) -> tuple[dict[str, pd.DataFrame], dict[str, dict]]:
+    """
+    Cumulative-return curves (news_time, cumulative_return) per label and
+    their metrics, computed once so figures and tables can reuse them.
+    Self-financing strategies use long+short daily returns, others the
+    average return per day.
+    """
+    curves: dict[str, pd.DataFrame] = {}
+    daily_returns: dict[str, pd.Series] = {}
+    for label, df in portfolios.items():
+        if df.empty:
+            continue
+        if label in SELF_FINANCING:
+            res = pr.calculate_self_financing_cum_return(df, with_metrics=False)
+            daily_returns[label] = res.set_index("news_time")["daily_ret"]
+        else:
+            res = pr.calculate_cumulative_return(df, with_metrics=False)
+            daily_returns[label] = res.set_index("news_time")["avg_return"]
+        curves[label] = res[["news_time", "cumulative_return"]]
+
+    metrics = summary_metrics(pr.metrics_table(daily_returns)) if daily_returns else {}
+    return curves, metrics
+
+
+def strategy_figure(
+    curves: dict[str, pd.DataFrame],
+    mean_random: pd.Series | None,
+    output_prefix: str,
+    title: str,
+    pgf: bool = False,
+    dpi: int = 300,
+    labels: list[str] | None = None,
+) -> FigureSpec:
+    """
+    Figure of strategy curves plus the expected random benchmark.
+    Colors follow the position in `labels` (all portfolios, including
+    empty ones without a curve; defaults to the curves).
+    """
+    colors = dict(zip(labels or list(curves), COLORS))
+    lines = []
+    for label, curve in curves.items():
+        if label not in colors:
+            continue  # more portfolios than colors, as in the original plot
+        lines.append(Line(
+            label,
+            curve["news_time"].to_numpy(),
+            curve["cumulative_return"].to_numpy(),
+            colors[label],
+            "dashed" if label in SELF_FINANCING else "solid",
+        ))
+    if mean_random is not None:
+        lines.append(Line(
+            "Expected Random",
+            mean_random.index.to_numpy(),
+            mean_random.to_numpy(),
+            "black",
+            "dotted",
+        ))
+    formats = ("pgf", "png") if pgf else ("png",)
+    return FigureSpec(output_prefix, title, lines, formats=formats, dpi=dpi)
+
+
+def draw_figure(spec: FigureSpec, fig):
+    """
+    Draw `spec` onto an existing matplotlib Figure.
+    """
+    ax = fig.add_subplot()
+    for line in spec.lines:
+        ax.plot(line.x, line.y, label=line.label, color=line.color, linestyle=line.linestyle)
+    ax.set_title(spec.title)
+    ax.set_xlabel("Date")
+    ax.legend()
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
+
+
+def _style() -> dict:
+    import seaborn as sns
+
+    return {**sns.axes_style("whitegrid"), **RC}
+
+
+def render_figure(spec: FigureSpec) -> list[str]:
+    """
+    Render one figure with the Agg canvas and save every requested format.
+    Returns the written paths.
+    """
+    import matplotlib
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    paths = []
+    with matplotlib.rc_context(_style()):
+        fig = Figure(figsize=spec.figsize, dpi=spec.dpi)
+        FigureCanvasAgg(fig)
+        draw_figure(spec, fig)
+        for fmt in spec.formats:
+            path = f"{spec.output_prefix}.{fmt}"
+            fig.savefig(path)
+            paths.append(path)
+    return paths
+
+
+def render_figures(specs: list[FigureSpec], max_workers: int | None = None) -> list[list[str]]:
+    """
+    Render a batch of figures concurrently in worker processes
+    (in-process when `max_workers` is 1 or there is a single spec).
+    """
+    for spec in specs:
+        folder = os.path.dirname(spec.output_prefix)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+    if max_workers == 1 or len(specs) <= 1:
+        return [render_figure(spec) for spec in specs]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(render_figure, specs))
@@ -1,14 +1,34 @@
+import logging
 import pandas as pd
 from datetime import timedelta
-from .config import TRADING_START, TRADING_END
+from .config import TRADING_START, TRADING_END, INDEX_TICKER
+from .db import local_trading_days, load_coverage
+
+logger = logging.getLogger(__name__)
 
 def trading_days_index(start, end):
     """
-    Return a DatetimeIndex of IMOEX trading days (24h candles).
+    Return a Series of IMOEX trading days. Uses the local market data
+    when the coverage index accounts for every calendar day of
+    [start, end] (IMOEX bars stored, or requested and empty), otherwise
+    asks MOEX for 24h candles.
     """
+    calendar = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize())
+    if len(calendar) and load_coverage().known(INDEX_TICKER, calendar).all():
+        return local_trading_days(start, end)
+    logger.info("Local market data does not cover %s … %s, asking MOEX for trading days", start, end)
     from moexalgo import Index
     return Index("IMOEX").candles(start=start, end=end, period=24)["begin"]
 
+def extend_trading_days(days: pd.Series, n_days: int = 10) -> pd.Series:
+    """
+    Append `n_days` business days after the last known trading day, so
+    news published after today's close can be mapped to the next session.
+    """
+    last = pd.Timestamp(days.iloc[-1])
+    future = pd.bdate_range(last + timedelta(days=1), periods=n_days)
+    return pd.concat([days, pd.Series(future)], ignore_index=True)
+
 def find_next_trading_day(days: pd.DatetimeIndex, dt: pd.Timestamp):
     return days[days.dt.date > dt.date()].iloc[0]
 
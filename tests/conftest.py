@@ -0,0 +1,42 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "src"), ROOT]
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmark", action="store_true",
+                     help="Also run wall-clock checks (unreliable on loaded machines)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: wall-clock check, run with --benchmark")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="wall-clock check; run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def market_db(tmp_path, monkeypatch):
+    """
+    Synthetic market_data.db (3 tickers + IMOEX, 5 trading days from
+    2024-01-08) that both the loader and the backtest read.
+    """
+    from benchmarks import synthetic
+    from market_data_loader import db as loader_db
+    from portfolio_backtest import db as backtest_db
+
+    path = str(tmp_path / "market_data.db")
+    monkeypatch.setattr(loader_db, "DB_PATH", path)
+    monkeypatch.setattr(backtest_db, "DB_PATH", path)
+    synthetic.build_market_db(path, n_tickers=3, n_days=5)
+    return path
@@ -0,0 +1,44 @@
+import sys
+import types
+import asyncio
+
+import pytest
+
+from chatgpt_news_label.backends import LLMBackend, LlamaCppBackend, get_backend
+
+
+def test_base_backend_is_abstract():
+    with pytest.raises(TypeError):
+        LLMBackend()
+
+
+def test_complete_batch_defaults_to_complete():
+    class Echo(LLMBackend):
+        async def complete(self, prompt, model=None, response_format=None):
+            return prompt.upper()
+
+    assert asyncio.run(Echo().complete_batch(["a", "b"])) == ["A", "B"]
+
+
+def test_get_backend_rejects_unknown_name():
+    with pytest.raises(ValueError):
+        get_backend("nope")
+
+
+def test_llamacpp_backend_translates_schema_and_keeps_order(monkeypatch):
+    calls = []
+
+    class Llama:
+        def __init__(self, **kwargs):
+            pass
+
+        def create_chat_completion(self, messages, response_format=None, **kwargs):
+            calls.append(response_format)
+            return {"choices": [{"message": {"content": messages[0]["content"] + "!"}}]}
+
+    monkeypatch.setitem(sys.modules, "llama_cpp", types.SimpleNamespace(Llama=Llama))
+    backend = LlamaCppBackend("model.gguf")
+    schema = {"type": "object"}
+    fmt = {"type": "json_schema", "json_schema": {"name": "x", "schema": schema}}
+    assert asyncio.run(backend.complete_batch(["a", "b", "c"], response_format=fmt)) == ["a!", "b!", "c!"]
+    assert calls == [{"type": "json_object", "schema": schema}] * 3
@@ -0,0 +1,41 @@
+import asyncio
+
+import pandas as pd
+
+from chatgpt_news_label.chatgpt_label import (
+    pack_groups,
+    parse_packed_signal,
+    _run_packed,
+)
+from benchmarks.fakes import make_llm_backend
+
+
+def _group(ticker, day, text="новость"):
+    return pd.DataFrame({
+        "ticker": [ticker],
+        "shortname": [ticker.lower()],
+        "date_only_trading": [pd.Timestamp(day).date()],
+        "title": ["заголовок"],
+        "text": [text],
+    })
+
+
+def test_pack_groups_splits_by_day_and_limits():
+    groups = [_group(t, "2024-01-08") for t in ("A", "B", "C")] + [_group("A", "2024-01-09")]
+    assert pack_groups(groups, max_tickers=2, max_tokens=10_000) == [[0, 1], [2], [3]]
+    # a token budget smaller than two groups gives every group its own pack
+    assert pack_groups(groups, max_tickers=8, max_tokens=1) == [[0], [1], [2], [3]]
+
+
+def test_parse_packed_signal_keeps_only_clear_answers():
+    response = 'Ответ: {"sber": "ВВЕРХ", "GAZP": "**вниз**", "LKOH": "может быть"}'
+    parsed = parse_packed_signal(response, ["SBER", "GAZP", "LKOH", "YNDX"])
+    assert {t: s for t, (s, _) in parsed.items()} == {"SBER": 1, "GAZP": -1}
+    assert parse_packed_signal("нет json", ["SBER"]) == {}
+
+
+def test_run_packed_falls_back_to_single_prompts():
+    # the fake backend never answers with JSON, so every packed group is re-asked alone
+    groups = [_group(t, "2024-01-08") for t in ("A", "B", "C")]
+    results = asyncio.run(_run_packed(groups, "model", backend=make_llm_backend()))
+    assert [signal for signal, _ in results] == [1, 1, 1]
@@ -0,0 +1,31 @@
+import sys
+
+import pytest
+
+from benchmarks import coldstart
+from _lazy import lazy_exports
+
+
+@pytest.mark.parametrize("name", list(coldstart.CHECKS))
+def test_entry_point_imports_no_heavy_package(name):
+    assert coldstart.heavy_imports(coldstart.CHECKS[name]) == []
+
+
+@pytest.mark.benchmark
+def test_entry_points_start_within_budget(capsys):
+    ok = coldstart.check(budget=0.3, repeat=3)
+    assert ok, capsys.readouterr().out
+
+
+def test_lazy_exports_resolve_on_first_access(monkeypatch):
+    import types
+
+    package = types.ModuleType("lazy_pkg")
+    monkeypatch.setitem(sys.modules, "lazy_pkg", package)
+    monkeypatch.setitem(sys.modules, "lazy_pkg.sub", types.SimpleNamespace(value=42))
+    package.__getattr__, package.__dir__, package.__all__ = lazy_exports("lazy_pkg", {"value": ".sub"})
+    assert "value" not in vars(package)
+    assert package.value == 42 and vars(package)["value"] == 42
+    assert package.__all__ == ["value"] and "value" in package.__dir__()
+    with pytest.raises(AttributeError):
+        package.missing
@@ -0,0 +1,93 @@
+import sqlite3
+import logging
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from market_data_loader.coverage import CoverageIndex
+
+DAYS = pd.date_range("2024-01-08", "2024-01-14")
+
+
+def _index():
+    index = CoverageIndex()
+    index.record("SBER", [f"2024-01-{d:02d} {t}" for d in (8, 9, 10) for t in ("10:00:00", "18:45:00")])
+    index.record("SBER", ["2024-01-11 10:00:00", "2024-01-11 12:30:00"])
+    index.record_empty("SBER", ["2024-01-13", "2024-01-14"])
+    return index
+
+
+def test_missing_skips_stored_and_empty_days():
+    index = _index()
+    # 2024-01-11 stopped at 12:30 but is older than yesterday, so it is not asked again
+    assert index.missing("SBER", list(DAYS.date), today=date(2024, 2, 1)) == [date(2024, 1, 12)]
+    assert index.missing("SBER", [date(2024, 1, 15)], today=date(2024, 2, 1)) == [date(2024, 1, 15)]
+    assert index.missing("GAZP", [date(2024, 1, 8)]) == [date(2024, 1, 8)]
+
+
+def test_partial_recent_day_is_requested_again():
+    missing = _index().missing("SBER", [date(2024, 1, 11)], today=date(2024, 1, 12))
+    assert missing == [date(2024, 1, 11)]
+
+
+def test_covered_checks_session_window():
+    index = _index()
+    tickers = ["SBER", "SBER", "SBER", "GAZP"]
+    days = ["2024-01-08", "2024-01-11", "2024-01-13", "2024-01-08"]
+    assert index.covered(tickers, days, "10:01", "18:39").tolist() == [True, True, False, False]
+    assert index.covered(tickers, days, "13:00", "18:39").tolist() == [True, False, False, False]
+
+
+def test_known_counts_empty_days():
+    known = _index().known("SBER", pd.date_range("2024-01-07", "2024-01-15"))
+    assert known.tolist() == [False] + [True] * 4 + [False] + [True] * 2 + [False]
+    assert _index().missing("SBER", ["2024-01-13"]) == []
+    assert not CoverageIndex().known("SBER", DAYS).any()
+
+
+def test_save_load_round_trip(tmp_path, monkeypatch):
+    from market_data_loader import db
+
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "market_data.db"))
+    db.init_db()
+    conn = db.get_conn()
+    index = _index()
+    index.save(conn)
+    loaded = CoverageIndex.load(conn)
+    for name in ("days", "empty", "first", "last"):
+        np.testing.assert_array_equal(getattr(loaded.tickers["SBER"], name), getattr(index.tickers["SBER"], name))
+    assert loaded.tickers["SBER"].start == index.tickers["SBER"].start
+
+
+def test_init_db_rebuilds_empty_index(market_db, caplog):
+    from market_data_loader import db
+
+    conn = sqlite3.connect(market_db)
+    expected = CoverageIndex.load(conn).covered(["T000"], ["2024-01-09"]).tolist()
+    conn.execute("DELETE FROM coverage")
+    conn.commit()
+
+    with caplog.at_level(logging.WARNING):
+        db.init_db()
+    assert "rebuilding" in caplog.text
+    rebuilt = CoverageIndex.load(conn)
+    assert len(rebuilt) == 4 and rebuilt.covered(["T000"], ["2024-01-09"]).tolist() == expected
+    conn.close()
+
+
+def test_uncovered_rows_are_dropped_with_a_warning(market_db, caplog):
+    from portfolio_backtest import PortfolioReturn
+
+    signals = pd.DataFrame({
+        "ticker": ["T000", "T001"],
+        "trading_date": ["2024-01-09", "2024-01-20"],
+        "signal": [1, -1],
+        "combined_prompt": "",
+        "explanation": "",
+    })
+    pr = PortfolioReturn(None, None, trading_days=pd.Series(pd.bdate_range("2024-01-08", periods=10)))
+    with caplog.at_level(logging.WARNING):
+        returns = pr.calculate_return(signals)
+    assert returns["ticker"].tolist() == ["T000"]
+    assert "1 of 2 rows have no market data" in caplog.text
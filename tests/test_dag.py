@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+from orchestrator.dag import Stage, Pipeline
+from orchestrator.stages import build_pipeline, scrape_window, write_market_manifest
+
+
+def _copier(log, name):
+    def copy(src, dst):
+        log.append(name)
+        with open(src) as f, open(dst, "w") as g:
+            g.write(f.read())
+    return copy
+
+
+def _pipeline(tmp_path, log, fail=False):
+    a, b, c, d = (str(tmp_path / n) for n in ("a.txt", "b.txt", "c.txt", "d.txt"))
+
+    def broken(**kwargs):
+        raise RuntimeError("boom")
+
+    stages = [
+        Stage("first", _copier(log, "first"), inputs=[a], outputs=[b],
+              params={"src": a, "dst": b}),
+        Stage("second", broken if fail else _copier(log, "second"),
+              inputs=[b], outputs=[c], deps=["first"], params={"src": b, "dst": c}),
+        Stage("third", _copier(log, "third"),
+              inputs=[c], outputs=[d], deps=["second"], params={"src": c, "dst": d}),
+    ]
+    return Pipeline(stages, str(tmp_path / "state.json")), a
+
+
+def test_pipeline_skips_fresh_stages_and_reruns_changed_inputs(tmp_path):
+    log = []
+    pipeline, a = _pipeline(tmp_path, log)
+    with open(a, "w") as f:
+        f.write("1")
+    assert pipeline.run() == {"first": "ran", "second": "ran", "third": "ran"}
+    assert set(_pipeline(tmp_path, log)[0].run().values()) == {"skipped"}
+    with open(a, "w") as f:
+        f.write("2")
+    assert _pipeline(tmp_path, log)[0].stale() == ["first"]
+    assert _pipeline(tmp_path, log)[0].run() == {"first": "ran", "second": "ran", "third": "ran"}
+    assert log == ["first", "second", "third"] * 2
+
+
+def test_failed_stage_blocks_dependents(tmp_path):
+    log = []
+    pipeline, a = _pipeline(tmp_path, log, fail=True)
+    with open(a, "w") as f:
+        f.write("1")
+    status = pipeline.run()
+    assert status == {"first": "ran", "second": "failed", "third": "blocked"}
+    assert log == ["first"]
+
+
+def test_cycle_is_rejected(tmp_path):
+    stages = [Stage("x", print, deps=["y"]), Stage("y", print, deps=["x"])]
+    with pytest.raises(ValueError):
+        Pipeline(stages, str(tmp_path / "state.json"))
+
+
+def test_market_manifest_ignores_coverage_rebuilds(market_db, tmp_path):
+    import sqlite3
+    from market_data_loader.coverage import CoverageIndex
+
+    first, second = str(tmp_path / "m1.json"), str(tmp_path / "m2.json")
+    write_market_manifest(market_db, first)
+    conn = sqlite3.connect(market_db)
+    CoverageIndex.rebuild(conn)
+    conn.commit()
+    conn.close()
+    write_market_manifest(market_db, second)
+    with open(first) as f, open(second) as g:
+        assert f.read() == g.read()
+
+
+def test_scrape_goes_stale_once_per_ttl(tmp_path, monkeypatch):
+    assert scrape_window(0) is None
+    assert scrape_window(3600, now=7200) == scrape_window(3600, now=10799)
+    assert scrape_window(3600, now=7200) != scrape_window(3600, now=10800)
+
+    url = "https://www.finam.ru/publications/section/companies/"
+    state = str(tmp_path / "state.json")
+
+    def scrape_key(now):
+        monkeypatch.setattr(time, "time", lambda: now)
+        pipeline = build_pipeline(url, "2025-03-30", "2025-04-04", state_path=state, scrape_ttl=3600)
+        return pipeline.fingerprint(pipeline.stages["scrape"])
+
+    assert scrape_key(7200) == scrape_key(9000) != scrape_key(10800)
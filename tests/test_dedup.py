@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from chatgpt_news_label.dedup import NearDuplicateIndex, dedup_frame, _bands
+
+STORY = ("Сбербанк объявил о рекордной чистой прибыли за первый квартал и пообещал "
+         "направить половину прибыли на дивиденды акционерам по итогам года ") * 3
+OTHER = ("Газпром сократил добычу газа из-за теплой погоды и снижения экспорта "
+         "в Европу, аналитики ждут падения выручки ") * 3
+
+
+def test_bands_cover_num_perm_and_stay_below_threshold():
+    b, r = _bands(0.8, 128)
+    assert b * r == 128 and (1 / b) ** (1 / r) <= 0.8
+
+
+def test_index_matches_light_rewrites_only():
+    index = NearDuplicateIndex(threshold=0.8)
+    first = index.add(STORY)
+    assert index.add(STORY.replace("рекордной", "рекордно высокой", 1)) == first
+    assert index.add(OTHER) != first
+    assert len(index) == 2
+
+
+def test_evict_before_forgets_old_articles():
+    index = NearDuplicateIndex()
+    index.add(STORY, stamp=1)
+    index.evict_before(2)
+    assert len(index) == 0 and index.add(STORY, stamp=3) == 1
+
+
+def test_dedup_frame_keeps_earliest_per_scope_and_window():
+    df = pd.DataFrame({
+        "ticker": ["SBER", "SBER", "SBER", "GAZP", "SBER"],
+        "title": ["a", "b", "c", "d", "e"],
+        "text": [STORY, STORY + " источник", OTHER, STORY, STORY],
+        "date": pd.to_datetime([
+            "2024-01-08 12:00", "2024-01-08 11:00", "2024-01-08 13:00",
+            "2024-01-08 12:00", "2024-01-11 12:00",
+        ]),
+    })
+    kept, stats = dedup_frame(df, threshold=0.8)
+    # 'b' is the earlier copy of the SBER story; 'e' comes after the 1-day window
+    assert sorted(kept["title"]) == ["b", "c", "d", "e"]
+    assert kept.set_index("title").loc["b", "duplicates"] == 1
+    assert stats["duplicates"] == 1 and stats["tokens_saved"] > 0
+    assert dedup_frame(df, window=None)[1]["duplicates"] == 2
+
+
+def test_missing_text_is_treated_as_empty():
+    df = pd.DataFrame({"ticker": ["A", "A"], "title": ["x", "y"], "text": [None, np.nan],
+                       "date": ["2024-01-08", "2024-01-08"]})
+    kept, stats = dedup_frame(df)
+    assert stats["articles"] == 2
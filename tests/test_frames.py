@@ -0,0 +1,34 @@
+import pandas as pd
+
+from dataset_io import read_frame, write_frame
+
+
+def _news():
+    return pd.DataFrame({
+        "title": ["a", "b"],
+        "ticker": ["SBER", "GAZP"],
+        "date": ["31.03.25 09:15", "01.04.25 19:40"],
+        "text": ["x", "y"],
+    })
+
+
+def test_round_trip_types_known_columns(tmp_path):
+    path = write_frame(_news(), str(tmp_path / "news"))
+    assert path.endswith(".parquet")
+    df = read_frame(str(tmp_path / "news"))
+    assert isinstance(df["ticker"].dtype, pd.CategoricalDtype)
+    assert df["date"].dtype == "datetime64[ns]"
+    assert df["date"].iloc[1] == pd.Timestamp("2025-04-01 19:40")
+    assert df["title"].dtype == object
+
+
+def test_unparseable_dates_stay_text(tmp_path):
+    df = _news().assign(date=["вчера", "сегодня"])
+    out = read_frame(write_frame(df, str(tmp_path / "news.feather")))
+    assert out["date"].tolist() == ["вчера", "сегодня"]
+
+
+def test_excel_is_export_only_and_readable(tmp_path):
+    path = write_frame(_news(), str(tmp_path / "news.xlsx"))
+    df = read_frame(path)
+    assert df["date"].iloc[0] == pd.Timestamp("2025-03-31 09:15")
@@ -0,0 +1,50 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from portfolio_backtest.intraday import event_study
+
+
+def _bar(conn, ticker, stamp, column):
+    return conn.execute(
+        f"SELECT {column} FROM ticker_data WHERE ticker=? AND date=?", (ticker, stamp)
+    ).fetchone()[0]
+
+
+def test_returns_match_direct_bar_lookups(market_db):
+    events = pd.DataFrame({
+        "ticker": ["T001", "T002", "MISSING"],
+        "trading_date": ["2024-01-09", "2024-01-10", "2024-01-09"],
+        "signal": [1, -1, 1],
+    })
+    result = event_study(events, minutes=[5], sessions=1)
+    assert result.horizons == ["+5m", "+0d", "+1d"]
+
+    conn = sqlite3.connect(market_db)
+
+    def raw(ticker, day, next_day):
+        entry = _bar(conn, ticker, f"{day} 09:51:00", "open")
+        return np.array([
+            _bar(conn, ticker, f"{day} 09:56:00", "close"),
+            _bar(conn, ticker, f"{day} 18:49:00", "close"),
+            _bar(conn, ticker, f"{next_day} 18:49:00", "close"),
+        ]) / entry - 1
+
+    expected = raw("T001", "2024-01-09", "2024-01-10")
+    index = raw("IMOEX", "2024-01-09", "2024-01-10")
+    assert np.allclose(result.raw[0], expected, atol=1e-6)
+    assert np.allclose(result.abnormal[0], expected - index, atol=1e-6)
+    assert np.isnan(result.raw[2]).all()
+
+    summary = result.summary()
+    assert set(summary["signal"]) == {-1, 1}
+    down = summary[(summary["signal"] == -1) & (summary["horizon"] == "+0d")].iloc[0]
+    assert np.isclose(down["mean_signed_abnormal_pct"], -down["mean_abnormal_pct"])
+
+
+def test_no_bars_gives_nan_returns(market_db):
+    events = pd.DataFrame({"ticker": ["T001"], "trading_date": ["2023-06-01"], "signal": [1]})
+    result = event_study(events, minutes=[5], sessions=1)
+    assert result.raw.shape == (1, 3) and np.isnan(result.abnormal).all()
+    assert result.summary()["count"].tolist() == [0, 0, 0]
@@ -0,0 +1,122 @@
+import time
+import asyncio
+
+import pandas as pd
+import pytest
+
+from orchestrator import worker
+from orchestrator.jobs import JobQueue, READY, LEASED, DONE, DEAD
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = JobQueue(str(tmp_path / "jobs.db"), max_attempts=2, retry_delay=0)
+    yield q
+    q.close()
+
+
+def test_enqueue_skips_known_keys(queue):
+    assert queue.enqueue("scrape", [{"n": 1}, {"n": 2}], "b1", keys=["a", "b"]) == 2
+    assert queue.enqueue("scrape", [{"n": 1}, {"n": 3}], "b1", keys=["a", "c"]) == 1
+    assert queue.progress("b1") == {("b1", "scrape"): {READY: 3, LEASED: 0, DONE: 0, DEAD: 0}}
+
+
+def test_enqueue_max_attempts_is_per_job(queue):
+    queue.enqueue("scrape", [{}], "b1", keys=["a"], max_attempts=7)
+    assert queue.lease(["scrape"], 60, "w1").max_attempts == 7
+    assert queue.max_attempts == 2
+
+
+def test_lease_hides_job_until_it_expires(queue):
+    queue.enqueue("scrape", [{"n": 1}], "b1", keys=["a"])
+    first = queue.lease(["scrape"], 60, "w1")
+    assert first.attempts == 1
+    assert queue.lease(["scrape"], 60, "w2") is None
+
+    queue.conn.execute("UPDATE jobs SET lease_until=0")
+    second = queue.lease(["scrape"], 60, "w2")
+    assert (second.id, second.attempts) == (first.id, 2)
+    # the first worker lost its lease: its result is fenced off
+    assert not queue.complete(first, {"late": True})
+    assert queue.complete(second, {"ok": True})
+    assert queue.results("b1", "scrape") == [("a", {"n": 1}, DONE, {"ok": True})]
+
+
+def test_failures_retry_then_dead_letter(queue):
+    queue.enqueue("label", [{}], "b1", keys=["a"])
+    assert queue.fail(queue.lease(["label"], 60, "w1"), "boom") == READY
+    assert queue.fail(queue.lease(["label"], 60, "w1"), "boom") == DEAD
+    assert queue.lease(["label"], 60, "w1") is None
+    assert queue.results("b1", "label")[0][2:] == (DEAD, "boom")
+
+    assert queue.requeue_dead("b1") == 1
+    assert queue.lease(["label"], 60, "w1").attempts == 1
+
+
+class LoopBoundBackend:
+    """Like an async HTTP client: usable only on the loop it first ran on."""
+
+    def __init__(self):
+        self.loop = None
+        self.calls = 0
+
+    async def complete(self, prompt, model=None, response_format=None):
+        loop = asyncio.get_running_loop()
+        assert self.loop in (None, loop), "backend used on a second event loop"
+        self.loop = loop
+        self.calls += 1
+        return "ВВЕРХ. Хорошие новости."
+
+
+def _label_payloads(n):
+    return [
+        {"ticker": f"T{i:03d}", "date_only_trading": "2024-01-09", "prompt": "p",
+         "model": "m", "structured": False}
+        for i in range(n)
+    ]
+
+
+def test_worker_reuses_one_event_loop(queue, tmp_path):
+    backend = LoopBoundBackend()
+    queue.enqueue("label", _label_payloads(3), "b1", keys=["a", "b", "c"])
+    context = {"backend": backend}
+
+    counts = worker.work(queue, ["label"], drain=True, context=context)
+    assert counts == {"done": 3, "retried": 0, "dead": 0}
+    assert backend.calls == 3 and "loop" not in context
+
+    output = str(tmp_path / "signals.parquet")
+    worker.collect_label(queue, "b1", output)
+    signals = pd.read_parquet(output)
+    assert signals["signal"].tolist() == [1, 1, 1]
+
+
+def test_collect_refuses_unfinished_batch(queue, tmp_path):
+    queue.enqueue("label", _label_payloads(2), "b1", keys=["a", "b"])
+    worker.work(queue, ["label"], drain=True, max_jobs=1, context={"backend": LoopBoundBackend()})
+
+    output = str(tmp_path / "signals.parquet")
+    with pytest.raises(worker.BatchPending):
+        worker.collect_label(queue, "b1", output)
+    worker.collect_label(queue, "b1", output, partial=True)
+    assert pd.read_parquet(output)["ticker"].tolist() == ["T000"]
+
+
+def test_heartbeat_keeps_a_long_job_leased(queue, monkeypatch):
+    stolen = []
+
+    def slow(payload, context):
+        # well past the visibility timeout, another worker looks for work
+        time.sleep(0.9)
+        other = JobQueue(queue.path)
+        stolen.append(other.lease(["slow"], 0.3, "w2"))
+        other.close()
+        time.sleep(0.2)
+        return {"ok": True}
+
+    monkeypatch.setitem(worker.HANDLERS, "slow", slow)
+    queue.enqueue("slow", [{}], "b1", keys=["a"])
+    counts = worker.work(queue, ["slow"], visibility=0.3, drain=True)
+    assert stolen == [None]
+    assert counts == {"done": 1, "retried": 0, "dead": 0}
+    assert queue.results("b1", "slow")[0][2:] == (DONE, {"ok": True})
@@ -0,0 +1,172 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic, fakes
+from orchestrator import live
+
+
+@pytest.fixture(autouse=True)
+def signals_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(live, "LIVE_SIGNALS_DIR", str(tmp_path / "live_signals"))
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    import chatgpt_news_label.config as label_config
+
+    monkeypatch.setattr(label_config, "_default_backend", fakes.make_llm_backend())
+
+
+def _news(titles, when):
+    return pd.DataFrame({
+        "title": titles,
+        "short_info": "",
+        "shortname": "Сбербанк",
+        "ticker": "T000",
+        "link": [f"https://example.invalid/{t}" for t in titles],
+        "date": when,
+        "text": "дивиденды выросли",
+    })
+
+
+def test_poll_labels_new_news_then_settles_it(tmp_path, market_db, fake_llm):
+    source = str(tmp_path / "news.parquet")
+    calendar = pd.Series(synthetic.trading_days(5))
+    state = live.LiveState(str(tmp_path / "state.json"))
+
+    _news(["a", "b"], "08.01.24 20:00").to_parquet(source)
+    evening = pd.Timestamp("2024-01-08 21:00")
+    summary = live.poll_once(state, source, calendar, now=evening)
+    assert summary == {"new_articles": 2, "labeled": 1, "settled": 0}
+    assert live.poll_once(state, source, calendar, now=evening)["new_articles"] == 0
+
+    summary = live.poll_once(state, source, calendar, now=pd.Timestamp("2024-01-09 19:00"))
+    assert summary["settled"] == 1 and state.positions == []
+    assert state.portfolio.metrics()["n_days"] == 1
+
+    reloaded = live.LiveState(str(tmp_path / "state.json"))
+    assert set(reloaded.seen) == {"a", "b"}
+
+
+def test_later_articles_relabel_the_session(tmp_path, market_db, fake_llm):
+    source = str(tmp_path / "news.parquet")
+    calendar = pd.Series(synthetic.trading_days(5))
+    state = live.LiveState(str(tmp_path / "state.json"))
+
+    _news(["a"], "08.01.24 20:00").to_parquet(source)
+    live.poll_once(state, source, calendar, now=pd.Timestamp("2024-01-08 20:30"))
+    _news(["a", "b"], "08.01.24 20:00").to_parquet(source)
+    summary = live.poll_once(state, source, calendar, now=pd.Timestamp("2024-01-08 21:00"))
+
+    assert summary["new_articles"] == 1 and summary["labeled"] == 1
+    [position] = state.positions
+    assert "Новость 1 : a" in position["combined_prompt"] and "Новость 2 : b" in position["combined_prompt"]
+    assert len(live.LiveState(str(tmp_path / "state.json")).news) == 2
+    # each poll adds a part; the folder reads as one dataset
+    assert len(pd.read_parquet(tmp_path / "live_signals")) == 2
+
+    live.poll_once(state, source, calendar, now=pd.Timestamp("2024-01-09 19:00"))
+    assert state.positions == [] and state.news.empty
+    assert state.portfolio.n_days == 1
+
+
+def _add_session(db_path, day):
+    from market_data_loader.coverage import CoverageIndex
+
+    conn = sqlite3.connect(db_path)
+    for ticker in ("T000", "IMOEX"):
+        rows = synthetic.bar_rows(ticker, synthetic.minute_bars(ticker, pd.DatetimeIndex([day])))
+        conn.executemany("INSERT INTO ticker_data VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        coverage = CoverageIndex.load(conn)
+        coverage.record(ticker, [r[1] for r in rows])
+        coverage.save(conn)
+    conn.commit()
+    conn.close()
+
+
+def test_uncovered_positions_wait_for_market_data(tmp_path, market_db, fake_llm):
+    source = str(tmp_path / "news.parquet")
+    calendar = pd.Series(synthetic.trading_days(6))
+    state = live.LiveState(str(tmp_path / "state.json"))
+
+    # Friday evening news → Monday 2024-01-15, which has no bars yet
+    _news(["a"], "12.01.24 20:00").to_parquet(source)
+    live.poll_once(state, source, calendar, now=pd.Timestamp("2024-01-12 21:00"))
+    summary = live.poll_once(state, source, calendar, now=pd.Timestamp("2024-01-15 19:00"))
+    assert summary["settled"] == 0 and len(state.positions) == 1
+    assert state.portfolio.n_days == 0
+
+    _add_session(market_db, pd.Timestamp("2024-01-15"))
+    summary = live.poll_once(state, source, calendar, now=pd.Timestamp("2024-01-15 19:05"))
+    assert summary["settled"] == 1 and state.positions == []
+    assert state.portfolio.last_date == "2024-01-15"
+
+
+def test_positions_stay_open_without_any_market_data(tmp_path, monkeypatch, fake_llm):
+    from market_data_loader import db as loader_db
+    from portfolio_backtest import db as backtest_db
+
+    path = str(tmp_path / "empty.db")
+    monkeypatch.setattr(loader_db, "DB_PATH", path)
+    monkeypatch.setattr(backtest_db, "DB_PATH", path)
+    loader_db.init_db()
+
+    source = str(tmp_path / "news.parquet")
+    calendar = pd.Series(synthetic.trading_days(5))
+    state = live.LiveState(str(tmp_path / "state.json"))
+    _news(["a"], "08.01.24 20:00").to_parquet(source)
+    live.poll_once(state, source, calendar, now=pd.Timestamp("2024-01-08 21:00"))
+    summary = live.poll_once(state, source, calendar, now=pd.Timestamp("2024-01-09 19:00"))
+    assert summary["settled"] == 0 and len(state.positions) == 1
+    assert state.portfolio.n_days == 0
+
+
+def test_missing_bars_are_flagged_not_dropped(market_db):
+    from portfolio_backtest import PortfolioReturn
+
+    # the coverage index still lists the day, but its IMOEX bars are gone
+    conn = sqlite3.connect(market_db)
+    conn.execute("DELETE FROM ticker_data WHERE ticker='IMOEX' AND date LIKE '2024-01-09%'")
+    conn.commit()
+    conn.close()
+
+    signals = pd.DataFrame({
+        "ticker": ["T000", "T000"], "trading_date": ["2024-01-09", "2024-01-10"],
+        "signal": [1, 1], "combined_prompt": "", "explanation": "",
+    })
+    pr = PortfolioReturn(None, None, trading_days=pd.Series(synthetic.trading_days(5)))
+    flagged = pr.calculate_return(signals, on_uncovered="flag")
+    assert flagged["covered"].tolist() == [False, True]
+    assert flagged["return"].isna().tolist() == [True, False]
+    assert pr.calculate_return(signals)["news_time"].tolist() == [pd.Timestamp("2024-01-10")]
+
+
+def test_seen_titles_expire_after_lookback(tmp_path):
+    state = live.LiveState(str(tmp_path / "state.json"))
+    state.mark_seen(["old"], pd.Timestamp("2024-01-01"))
+    state.mark_seen(["new"], pd.Timestamp("2024-02-20"))
+    state.trim_seen(pd.Timestamp("2024-02-21"))
+    assert list(state.seen) == ["new"]
+
+
+def test_url_source_scrapes_only_unseen_articles(tmp_path, monkeypatch):
+    from newsparser import parser
+
+    listed = [{"title": t, "link": f"https://example.invalid/{t}"} for t in ("a", "b", "c")]
+    scraped = []
+
+    async def scrape_all(titles_links):
+        scraped.extend(item["title"] for item in titles_links)
+        return [{**item, "date": "08.01.24 20:00", "text": "x"} for item in titles_links]
+
+    reference = pd.DataFrame({"ticker": ["SBER"], "shortname": ["Сбербанк"]})
+    monkeypatch.setattr(parser, "collect_titles", lambda source: (listed, [[0, t, "", "Сбербанк"] for t in "abc"]))
+    monkeypatch.setattr(parser, "scrape_all", scrape_all)
+    monkeypatch.setattr(parser, "load_reference", lambda refresh=False: reference)
+    monkeypatch.setattr(live, "LIVE_NEWS_PATH", str(tmp_path / "live_news.parquet"))
+
+    news = live.load_news("https://www.finam.ru/publications/section/companies/", {"a": "2024-01-08"})
+    assert scraped == ["b", "c"]
+    assert sorted(news["title"]) == ["b", "c"] and set(news["ticker"]) == {"SBER"}
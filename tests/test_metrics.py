@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+import instrumentation as metrics
+from instrumentation.metrics import to_prometheus
+from chatgpt_news_label.backends import _on_backoff
+
+
+@pytest.fixture
+def recording():
+    was = metrics.enabled()
+    metrics.enable()
+    metrics.reset()
+    yield
+    metrics.reset()
+    if not was:
+        metrics.disable()
+
+
+def test_disabled_hooks_record_nothing():
+    was = metrics.enabled()
+    metrics.disable()
+    metrics.count("x")
+    with metrics.timer("t"):
+        pass
+    assert metrics.summary() == {"counters": {}, "histograms": {}}
+    if was:
+        metrics.enable()
+
+
+def test_counters_timers_and_decorators(recording):
+    @metrics.timed("sync")
+    def f():
+        return 1
+
+    @metrics.timed("async")
+    async def g():
+        return 2
+
+    assert f() == 1 and asyncio.run(g()) == 2
+    metrics.count("rows", 3)
+    metrics.count("rows", 2)
+    data = metrics.summary()
+    assert data["counters"] == {"rows": 5}
+    assert data["histograms"]["sync"]["count"] == 1
+    assert data["histograms"]["async"]["count"] == 1
+
+
+def test_prometheus_buckets_are_cumulative(recording):
+    for value in (0.001, 0.2, 100):
+        metrics.observe("llm.request", value)
+    text = to_prometheus()
+    assert 'finam_llm_request_seconds_bucket{le="0.005"} 1' in text
+    assert 'finam_llm_request_seconds_bucket{le="0.25"} 2' in text
+    assert 'finam_llm_request_seconds_bucket{le="+Inf"} 3' in text
+    assert "finam_llm_request_seconds_count 3" in text
+
+
+def test_backoff_records_retry_and_wait(recording):
+    _on_backoff({"wait": 1.5, "tries": 1})
+    data = metrics.summary()
+    assert data["counters"]["llm.retries"] == 1
+    assert data["histograms"]["llm.backoff_wait"]["sum"] == 1.5
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from portfolio_backtest.performance import compute_metrics, return_matrix, rolling_metrics
+
+
+def _reference(series: pd.Series) -> dict:
+    s = series.dropna()
+    cum = (1 + s).cumprod()
+    return {
+        "sharpe_ratio": s.mean() / s.std() * np.sqrt(252),
+        "mean_return_daily_pct": s.mean() * 100,
+        "std_daily_pct": s.std() * 100,
+        "max_drawdown_pct": ((cum - cum.cummax()) / cum.cummax()).min() * 100,
+    }
+
+
+def test_matches_per_series_pandas_metrics():
+    rng = np.random.default_rng(0)
+    days = pd.bdate_range("2024-01-01", periods=40)
+    series = {
+        "a": pd.Series(rng.normal(0.001, 0.01, 40), index=days),
+        "b": pd.Series(rng.normal(0, 0.02, 30), index=days[5:35]),
+    }
+    table = compute_metrics(return_matrix(series))
+    for label, s in series.items():
+        for column, expected in _reference(s).items():
+            assert np.isclose(table.loc[label, column], expected)
+    assert table.loc["b", "n_days"] == 30
+
+
+def test_drawdown_duration_and_degenerate_series():
+    table = compute_metrics(np.array([[0.1, -0.1, -0.1, 0.5, 0.0], [np.nan] * 5]))
+    assert table.loc[0, "max_drawdown_days"] == 2
+    assert table.loc[0, "hit_rate_pct"] == 40
+    assert np.isnan(table.loc[1, "sharpe_ratio"]) and table.loc[1, "n_days"] == 0
+
+
+def test_days_without_position_do_not_lengthen_drawdowns():
+    table = compute_metrics(np.array([[0.1, -0.1, np.nan, np.nan, -0.1, 0.5]]))
+    assert table.loc[0, "max_drawdown_days"] == 2
+
+
+def test_rolling_metrics_window():
+    days = pd.bdate_range("2024-01-01", periods=5)
+    returns = pd.DataFrame([[0.01, 0.02, np.nan, 0.04, 0.00]], index=["a"], columns=days)
+    rolling = rolling_metrics(returns, window=3)
+    mean, std, sharpe = (rolling[k].loc["a"] for k in ("mean_pct", "std_pct", "sharpe_ratio"))
+
+    assert np.isnan(mean.iloc[0]) and np.isnan(std.iloc[0])
+    assert np.isclose(mean.iloc[1], 1.5)
+    # window of day 4: 0.02, (no position), 0.04
+    assert np.isclose(mean.iloc[3], 3.0)
+    assert np.isclose(std.iloc[3], np.sqrt(2 * 0.01 ** 2) * 100)
+    assert np.isclose(sharpe.iloc[3], 0.03 / np.sqrt(2 * 0.01 ** 2) * np.sqrt(252))
+    # window of day 5: (no position), 0.04, 0.00
+    assert np.isclose(mean.iloc[4], 2.0)
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_backtest.regression import FERegression, demean, parse_formula
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(1)
+    n = 600
+    df = pd.DataFrame({
+        "ticker": rng.choice([f"T{i}" for i in range(12)], n),
+        "date": rng.choice(pd.bdate_range("2024-01-01", periods=25), n),
+        "signal": rng.choice([-1, 0, 1], n),
+    })
+    ticker_effect = df["ticker"].map({f"T{i}": i * 0.1 for i in range(12)})
+    df["excess_return"] = 0.3 * df["signal"] + ticker_effect + rng.normal(0, 1, n)
+    return df
+
+
+def test_parse_formula():
+    assert parse_formula("y ~ x1 + C(x2) | fe1 + fe2") == ("y", ["x1", "C(x2)"], ["fe1", "fe2"])
+    with pytest.raises(ValueError):
+        parse_formula("no tilde")
+
+
+def test_demean_removes_group_means():
+    codes = [np.array([0, 0, 1, 1, 1])]
+    out = demean(np.array([[1.0], [3.0], [2.0], [4.0], [6.0]]), codes)
+    assert np.allclose(out.ravel(), [-1, 1, -2, 0, 2])
+
+
+def test_coefficients_match_dummy_variable_ols(panel):
+    res = FERegression(panel).fit("excess_return ~ signal | ticker + date")
+    dummies = pd.get_dummies(panel[["ticker", "date"]].astype(str), drop_first=True, dtype=float)
+    X = np.column_stack([panel["signal"], np.ones(len(panel)), dummies])
+    beta = np.linalg.lstsq(X, panel["excess_return"], rcond=None)[0]
+    assert np.isclose(res.loc["signal", "coef"], beta[0])
+    assert res.attrs["clusters"] == 12 and res.attrs["nobs"] == 600
+
+
+def test_no_fixed_effects_matches_plain_ols(panel):
+    res = FERegression(panel).fit("excess_return ~ signal")
+    X = np.column_stack([np.ones(len(panel)), panel["signal"]])
+    y = panel["excess_return"].to_numpy()
+    beta = np.linalg.solve(X.T @ X, X.T @ y)
+    assert list(res.index) == ["Intercept", "signal"]
+    assert np.allclose(res["coef"].to_numpy(), beta)
+
+    # CRV1 by ticker with the (G/(G-1))((n-1)/(n-k)) correction
+    resid = y - X @ beta
+    bread = np.linalg.inv(X.T @ X)
+    scores = pd.DataFrame(X * resid[:, None]).groupby(panel["ticker"].to_numpy()).sum().to_numpy()
+    G, n, k = len(scores), len(y), X.shape[1]
+    vcov = G / (G - 1) * (n - 1) / (n - k) * bread @ scores.T @ scores @ bread
+    assert np.allclose(res["se"].to_numpy(), np.sqrt(np.diag(vcov)))
+
+
+def test_matches_pyfixest_crv1(panel):
+    pf = pytest.importorskip("pyfixest")
+    formula = "excess_return ~ C(signal) | ticker + date"
+    ours = FERegression(panel).fit(formula)
+    ref = pf.feols(formula, data=panel, vcov={"CRV1": "ticker"})
+    assert np.allclose(ours["coef"].to_numpy(), ref.coef().to_numpy())
+    assert np.allclose(ours["se"].to_numpy(), ref.se().to_numpy())
+
+
+def test_sweep_reuses_demeaning_across_formulas(panel):
+    reg = FERegression(panel)
+    table = reg.sweep(
+        ["excess_return ~ signal | ticker", "excess_return ~ C(signal) | ticker"],
+        trims=[None, (0.05, 0.95)],
+    )
+    assert list(table["trim"].unique()) == ["none", "0.05-0.95"]
+    assert len(reg._cache) == 2  # one per (fixed effects, sample)
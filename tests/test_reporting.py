@@ -0,0 +1,41 @@
+import os
+
+import pandas as pd
+
+from portfolio_backtest.reporting import strategy_figure, render_figures
+
+
+def _curves():
+    days = pd.bdate_range("2024-01-08", periods=5)
+    return {
+        "GPT": pd.DataFrame({"news_time": days, "cumulative_return": [0, 1, 2, 1, 3.0]}),
+        "All long": pd.DataFrame({"news_time": days, "cumulative_return": [0, -1, 0, 1, 0.5]}),
+    }, pd.Series([0, 0.1, 0.2, 0.1, 0.0], index=days)
+
+
+def test_strategy_figure_styles_lines():
+    curves, random = _curves()
+    spec = strategy_figure(curves, random, "out", "title")
+    assert [(l.label, l.linestyle) for l in spec.lines] == [
+        ("GPT", "dashed"), ("All long", "solid"), ("Expected Random", "dotted"),
+    ]
+    assert spec.formats == ("png",)
+
+
+def test_colors_follow_portfolio_order_despite_empty_ones():
+    curves, random = _curves()
+    labels = ["Random", "GPT", "All long"]  # "Random" had no trades, so no curve
+    spec = strategy_figure(curves, random, "out", "title", labels=labels)
+    assert [l.color for l in spec.lines] == ["green", "orange", "black"]
+
+
+def test_render_figures_writes_every_figure(tmp_path):
+    curves, random = _curves()
+    specs = [
+        strategy_figure(curves, random, str(tmp_path / "figs" / f"fig{i}"), "t", dpi=50)
+        for i in range(3)
+    ]
+    paths = render_figures(specs, max_workers=2)
+    assert paths == [[str(tmp_path / "figs" / f"fig{i}.png")] for i in range(3)]
+    assert all(os.path.getsize(p[0]) > 0 for p in paths)
+    assert render_figures(specs[:1], max_workers=1) == paths[:1]
@@ -0,0 +1,52 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from market_data_loader.resample import resample, materialize, missing_days
+
+AGG = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+
+def _minutes():
+    days = synthetic.trading_days(2)
+    frames = [
+        synthetic.minute_bars(t, days, seed=1).rename(columns={"begin": "date"}).assign(ticker=t)
+        for t in ("AAA", "BBB")
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.mark.parametrize("period, rule", [(5, "5min"), (10, "10min"), (60, "60min"), (24, "1D")])
+def test_resample_matches_pandas(period, rule):
+    minutes = _minutes()
+    # shuffled input: the resampler sorts by (ticker, date) itself
+    got = resample(minutes.sample(frac=1, random_state=0), period)
+
+    expected = pd.concat([
+        bars.set_index("date").resample(rule).agg(AGG).dropna().reset_index().assign(ticker=ticker)
+        for ticker, bars in minutes.groupby("ticker")
+    ], ignore_index=True)
+    pd.testing.assert_frame_equal(
+        got.reset_index(drop=True),
+        expected[got.columns].astype({c: float for c in AGG}),
+        check_dtype=False,
+    )
+
+
+def test_resample_rejects_unknown_period():
+    with pytest.raises(ValueError):
+        resample(_minutes(), 15)
+
+
+def test_missing_days_then_materialize(market_db):
+    conn = sqlite3.connect(market_db)
+    assert missing_days(conn, 60) == {}
+    conn.execute("DELETE FROM bars WHERE ticker='T000' AND period=60 AND date LIKE '2024-01-09%'")
+    conn.commit()
+    assert missing_days(conn, 60) == {"T000": ["2024-01-09"]}
+
+    assert materialize("T000", ["2024-01-09"], periods=(60,), conn=conn) > 0
+    assert missing_days(conn, 60) == {}
+    conn.close()
@@ -0,0 +1,28 @@
+from chatgpt_news_label.chatgpt_label import (
+    parse_signal,
+    parse_structured_signal,
+    parse_stats,
+    reset_parse_stats,
+)
+
+
+def test_parse_signal_rules_in_order():
+    reset_parse_stats()
+    assert parse_signal("ВНИЗ. Отчетность слабая")[0] == -1
+    # the anchored word wins over more frequent mentions
+    assert parse_signal("Думаю, вверх или вверх? Сигнал: неизвестно")[0] == 0
+    # no anchor: the most frequent word
+    assert parse_signal("Итог: **вниз**, рост маловероятен, вниз")[0] == -1
+    assert parse_stats() == {"prefix": 1, "anchor": 1, "fallback": 1}
+
+
+def test_parse_signal_only_scans_prefix_when_limited():
+    assert parse_signal("ничего... " + "вниз " * 3, max_chars=5)[0] == 1  # no words: tie -> up
+
+
+def test_parse_structured_signal_falls_back_on_bad_json():
+    reset_parse_stats()
+    assert parse_structured_signal('{"signal": "ВНИЗ"}')[0] == -1
+    assert parse_structured_signal('{"signal": "может"}')[0] == 1
+    assert parse_structured_signal("ВНИЗ")[0] == -1
+    assert parse_stats()["structured"] == 1
@@ -0,0 +1,32 @@
+import sqlite3
+
+import pandas as pd
+
+from benchmarks import synthetic
+
+
+def test_minute_bars_are_consistent_and_reproducible():
+    days = synthetic.trading_days(2)
+    bars = synthetic.minute_bars("T000", days)
+    assert len(bars) == 2 * synthetic.SESSION_MINUTES
+    assert (bars["high"] >= bars[["open", "close"]].max(axis=1)).all()
+    assert (bars["low"] <= bars[["open", "close"]].min(axis=1)).all()
+    assert bars.equals(synthetic.minute_bars("T000", days))
+    assert not bars.equals(synthetic.minute_bars("T001", days))
+
+
+def test_build_market_db_fills_minutes_and_derived_bars(market_db):
+    conn = sqlite3.connect(market_db)
+    tickers = conn.execute("SELECT DISTINCT ticker FROM ticker_data ORDER BY ticker").fetchall()
+    assert [t for (t,) in tickers] == ["IMOEX", "T000", "T001", "T002"]
+    daily = conn.execute("SELECT count(*) FROM bars WHERE period=24").fetchone()[0]
+    assert daily == 4 * 5
+
+
+def test_news_and_labels_have_pipeline_shape():
+    news = synthetic.make_news(3, 4, per_day=2)
+    assert len(news) == 8
+    pd.to_datetime(news["date"], format="%d.%m.%y %H:%M")
+    labeled = synthetic.make_labeled(news)
+    assert set(labeled.columns) >= {"ticker", "trading_date", "signal"}
+    assert set(labeled["signal"]) <= {-1, 0, 1}
@@ -0,0 +1,35 @@
+import json
+
+import pandas as pd
+
+from newsparser.tickers import CompanyMatcher, load_reference, REFERENCE_VERSION
+
+
+REFERENCE = pd.DataFrame({
+    "ticker": ["SBER", "SBERP", "GAZP", "VTBR"],
+    "shortname": ["Сбербанк", "Сбербанк-п", "ГАЗПРОМ ао", "ВТБ ао"],
+})
+
+
+def test_finds_word_bounded_mentions_in_order():
+    matcher = CompanyMatcher(REFERENCE)
+    text = "ГАЗПРОМ ао +1,2%, Сбербанк-п -0,5%, Сбербанк 0,1%. Сбербанка нет"
+    assert matcher.find(text) == [
+        ("GAZP", "ГАЗПРОМ ао"), ("SBERP", "Сбербанк-п"), ("SBER", "Сбербанк"),
+    ]
+
+
+def test_mentions_need_no_percent_suffix():
+    matcher = CompanyMatcher(REFERENCE)
+    assert matcher.find("Набсовет ВТБ ао одобрил дивиденды") == [("VTBR", "ВТБ ао")]
+    assert matcher.find("СберВТБ ао") == []
+    assert matcher.find(None) == []
+
+
+def test_load_reference_uses_cache(tmp_path):
+    path = tmp_path / "ref.json"
+    path.write_text(json.dumps({
+        "version": REFERENCE_VERSION,
+        "rows": REFERENCE.to_dict(orient="records"),
+    }), encoding="utf-8")
+    assert load_reference(path=str(path)).equals(REFERENCE)
@@ -0,0 +1,57 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from portfolio_backtest import utils
+
+
+@pytest.fixture
+def no_moex(monkeypatch):
+    calls = []
+
+    class Index:
+        def __init__(self, ticker):
+            pass
+
+        def candles(self, start, end, period):
+            calls.append((start, end))
+            return pd.DataFrame({"begin": pd.bdate_range(start, end)})
+
+    import types, sys
+    monkeypatch.setitem(sys.modules, "moexalgo", types.SimpleNamespace(Index=Index))
+    return calls
+
+
+def test_local_calendar_used_when_fully_covered(market_db, no_moex):
+    days = utils.trading_days_index("2024-01-08", "2024-01-12")
+    assert list(days) == list(synthetic.trading_days(5))
+    assert no_moex == []
+
+
+def test_range_beyond_local_data_asks_moex(market_db, no_moex):
+    utils.trading_days_index("2024-01-08", "2024-01-16")
+    assert no_moex == [("2024-01-08", "2024-01-16")]
+
+
+def test_gap_in_local_index_asks_moex(market_db, no_moex):
+    from market_data_loader.coverage import CoverageIndex
+
+    conn = sqlite3.connect(market_db)
+    coverage = CoverageIndex.load(conn)
+    cov = coverage.tickers["IMOEX"]
+    i = (pd.Timestamp("2024-01-10") - pd.Timestamp("1970-01-01")).days - cov.start
+    cov.days[i] = cov.empty[i] = False   # a day that was never fetched
+    coverage.save(conn)
+    conn.commit()
+    utils.trading_days_index("2024-01-08", "2024-01-12")
+    assert len(no_moex) == 1
+
+
+def test_determine_trading_time_maps_to_next_open():
+    days = pd.Series(synthetic.trading_days(5))
+    friday_evening = pd.Timestamp("2024-01-12 20:00")
+    extended = utils.extend_trading_days(days)
+    assert utils.determine_trading_time(friday_evening, extended).date() == pd.Timestamp("2024-01-15").date()
+    assert utils.determine_trading_time(pd.Timestamp("2024-01-09 12:00"), days) is None